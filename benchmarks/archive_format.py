@@ -0,0 +1,97 @@
+"""
+Compare the binary game archive with PGN text: file size, full load time and random access.
+
+Seeded random games with headers are written both as PGN (write_pgns) and as
+an archive (write_archive). Both files are then read in full as headers and
+move lists, and single games are fetched by index: from the archive through
+its record table, from the PGN by reading up to the game.
+
+Usage: py -m benchmarks.archive_format [--games 20000] [--lookups 20]
+"""
+import argparse
+import os
+import tempfile
+from random import Random
+from time import perf_counter
+
+from othello.archive import GameArchive, write_archive
+from othello.game import Game, write_pgns
+from othello.pgn import read_pgn, read_game
+from benchmarks.positions import random_games
+
+
+def timed(function, *args):
+    start_time = perf_counter()
+    result = function(*args)
+    return result, perf_counter() - start_time
+
+def load_pgn(path):
+    return sum(1 for _ in read_pgn(path))
+
+def load_archive(path):
+    archive = GameArchive(path)
+    try:
+        return sum(1 for _ in archive)
+    finally:
+        archive.close()
+
+def fetch_pgn(path, indices):
+    for index in indices:
+        read_game(path, index)
+
+def fetch_archive(path, indices):
+    archive = GameArchive(path)
+    try:
+        for index in indices:
+            archive.game(index)
+    finally:
+        archive.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--games', type=int, default=20000)
+    parser.add_argument('--lookups', type=int, default=20, help='Games fetched by index')
+    args = parser.parse_args()
+
+    games = []
+    for number, moves in enumerate(random_games(args.games), start=1):
+        game = Game()
+        game.metadata = {'Event': 'Random games', 'Round': str(number), 'Black': 'random', 'White': 'random'}
+        for move in moves:
+            game.make_move(move)
+        games.append(game)
+    directory = tempfile.mkdtemp()
+    pgn_path = os.path.join(directory, 'games.pgn')
+    archive_path = os.path.join(directory, 'games.oga')
+    try:
+        with open(pgn_path, 'w') as f:
+            _, pgn_write = timed(write_pgns, games, f)
+        _, archive_write = timed(write_archive, games, archive_path)
+        indices = Random(1).sample(range(len(games)), min(args.lookups, len(games)))
+        _, pgn_load = timed(load_pgn, pgn_path)
+        _, archive_load = timed(load_archive, archive_path)
+        _, pgn_fetch = timed(fetch_pgn, pgn_path, indices)
+        _, archive_fetch = timed(fetch_archive, archive_path, indices)
+
+        pgn_size = os.path.getsize(pgn_path)
+        archive_size = os.path.getsize(archive_path)
+        print(f'{len(games)} games, {sum(len(game.board.moves) for game in games)} plies\n')
+        print(f'{"":>22} {"PGN":>12} {"archive":>12} {"ratio":>8}')
+        rows = (
+            ('size (KB)', pgn_size / 1024, archive_size / 1024),
+            ('write (s)', pgn_write, archive_write),
+            ('load all (s)', pgn_load, archive_load),
+            (f'fetch {len(indices)} games (ms)', pgn_fetch * 1000, archive_fetch * 1000),
+        )
+        for name, pgn_value, archive_value in rows:
+            print(f'{name:>22} {pgn_value:>12.3f} {archive_value:>12.3f} {pgn_value / archive_value:>8.1f}')
+    finally:
+        for path in (pgn_path, archive_path):
+            if os.path.exists(path):
+                os.remove(path)
+        os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
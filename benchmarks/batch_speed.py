@@ -0,0 +1,84 @@
+"""
+Compare the scalar bitboard functions with the batched NumPy API, and the
+search with and without batched frontier evaluation.
+
+Usage: py -m benchmarks.batch_speed [--positions 20000] [--depth 5]
+"""
+import argparse
+from time import perf_counter
+
+import numpy as np
+
+from othello.bitboard import find_legal_moves_bitboard, compute_flips, fen_to_bitboard
+from engine import batch
+from engine.patterns import load_default_evaluator
+from engine.search import Search
+from engine.tt import TranspositionTable
+from benchmarks.positions import SEARCH_POSITIONS, random_positions
+
+
+def scalar_children(positions):
+    children = []
+    for player, opponent in positions:
+        legal_moves = find_legal_moves_bitboard(player, opponent, 'b')
+        while legal_moves:
+            move = legal_moves & -legal_moves
+            legal_moves ^= move
+            flips = compute_flips(move, player, opponent)
+            children.append((player | flips | move, opponent & ~flips))
+    return children
+
+def timed(function, *args):
+    start_time = perf_counter()
+    result = function(*args)
+    return result, perf_counter() - start_time
+
+def search_time(evaluator, evaluate_batch, depth):
+    total = 0.0
+    nodes = 0
+    for fen, color in SEARCH_POSITIONS:
+        black, white = fen_to_bitboard(fen)
+        search = Search(TranspositionTable(16), evaluator, evaluate_batch=evaluate_batch)
+        start_time = perf_counter()
+        search.iterative_deepening(black, white, color, depth)
+        total += perf_counter() - start_time
+        nodes += search.nodes
+    return total, nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--positions', type=int, default=20000)
+    parser.add_argument('--depth', type=int, default=5)
+    args = parser.parse_args()
+
+    positions = [
+        (black, white) if color == 'b' else (white, black)
+        for black, white, color in random_positions(args.positions)
+    ]
+    player = np.array([position[0] for position in positions], dtype=np.uint64)
+    opponent = np.array([position[1] for position in positions], dtype=np.uint64)
+    evaluator = load_default_evaluator()
+    count = len(positions)
+
+    print(f'{"operation":>14} {"scalar/s":>12} {"batch/s":>12} {"speedup":>8}')
+    _, scalar = timed(lambda: [find_legal_moves_bitboard(p, o, 'b') for p, o in positions])
+    _, batched = timed(batch.legal_moves, player, opponent)
+    print(f'{"legal moves":>14} {count / scalar:>12.0f} {count / batched:>12.0f} {scalar / batched:>7.1f}x')
+
+    children, scalar = timed(scalar_children, positions)
+    _, batched = timed(batch.expand, player, opponent)
+    print(f'{"children":>14} {len(children) / scalar:>12.0f} {len(children) / batched:>12.0f} {scalar / batched:>7.1f}x')
+
+    _, scalar = timed(lambda: [evaluator(p, o) for p, o in positions])
+    _, batched = timed(batch.evaluate, player, opponent, evaluator)
+    print(f'{"evaluations":>14} {count / scalar:>12.0f} {count / batched:>12.0f} {scalar / batched:>7.1f}x')
+
+    print(f'\nPattern search to depth {args.depth} over {len(SEARCH_POSITIONS)} positions:')
+    for name, evaluate_batch in (('per leaf', None), ('batched frontier', evaluator.evaluate_batch)):
+        total, nodes = search_time(evaluator, evaluate_batch, args.depth)
+        print(f'{name:>18}: {total:.2f}s, {nodes} nodes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+Run the benchmark suite: perft, fixed-depth searches and endgame solves.
+
+Perft counts the leaf positions of the full game tree to a fixed depth (a
+forced pass counts as a move) with both the Board class and the bitboard
+functions, from the start position and the search positions. Results are
+written as JSON; comparing them with an earlier run on the same machine
+flags every timing or node count that got worse by more than the threshold.
+
+Usage: py -m benchmarks.bench [--quick] [--output FILE] [--baseline FILE] [--threshold 0.1]
+"""
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+from time import perf_counter
+
+from othello.board import Board
+from othello.bitboard import find_legal_moves_bitboard, make_move_bitboard, fen_to_bitboard
+from engine.engine import get_evaluator, EVALUATORS
+from engine.endgame import EndgameSolver, count_empties
+from engine.search import Search
+from engine.tt import TranspositionTable
+from benchmarks.positions import SEARCH_POSITIONS, ENDGAME_POSITIONS
+from benchmarks.endgame_suite import parse_board
+
+
+START_FEN = '8/8/8/3Dd3/3dD3/8/8/8'
+# Known perft results from the start position, by depth
+PERFT_START = {1: 4, 2: 12, 3: 56, 4: 244, 5: 1396, 6: 8200, 7: 55092, 8: 390216, 9: 3005288}
+
+SETTINGS = {
+    'full': {'board_depth': 6, 'bitboard_depth': 8, 'position_depth': 4, 'search_depth': 6, 'endgame_empties': 16},
+    'quick': {'board_depth': 4, 'bitboard_depth': 6, 'position_depth': 3, 'search_depth': 4, 'endgame_empties': 12},
+}
+
+# Metrics where a larger value is worse, and the ones where a smaller value is worse
+LOWER_IS_BETTER = ('time', 'nodes')
+HIGHER_IS_BETTER = ('nps',)
+
+
+def perft_bitboard(black, white, color, depth, passed=False):
+    if depth == 0:
+        return 1
+    other = 'w' if color == 'b' else 'b'
+    legal_moves = find_legal_moves_bitboard(black, white, color)
+    if not legal_moves:
+        if passed:
+            return 1  # Game over: the position is a leaf
+        return perft_bitboard(black, white, other, depth - 1, True)
+    nodes = 0
+    while legal_moves:
+        move = legal_moves & -legal_moves
+        legal_moves ^= move
+        new_black, new_white = make_move_bitboard(black, white, color, move)
+        nodes += perft_bitboard(new_black, new_white, other, depth - 1)
+    return nodes
+
+def perft_board(board:Board, color, depth, passed=False):
+    # Only the public Board API: every move is made and taken back
+    if depth == 0:
+        return 1
+    other = 'w' if color == 'b' else 'b'
+    if not board.has_legal_moves(color):
+        if passed:
+            return 1
+        return perft_board(board, other, depth - 1, True)
+    nodes = 0
+    legal_moves = board.get_legal_moves(color)
+    for square in range(64):
+        if legal_moves >> square & 1:
+            board.make_move('abcdefgh'[square % 8] + str(square // 8 + 1), color)
+            nodes += perft_board(board, other, depth - 1)
+            board.undo()
+    return nodes
+
+def timed(function, *args):
+    start_time = perf_counter()
+    result = function(*args)
+    return result, perf_counter() - start_time
+
+def rate(nodes, elapsed):
+    return nodes / elapsed if elapsed > 0 else 0.0
+
+
+def run_perft(settings):
+    results = []
+    positions = [('start', START_FEN, 'b')] + [
+        (f'position-{index}', fen, color) for index, (fen, color) in enumerate(SEARCH_POSITIONS, start=1)
+    ]
+    for name, fen, color in positions:
+        black, white = fen_to_bitboard(fen)
+        start = name == 'start'
+        for implementation in ('bitboard', 'board'):
+            depth = settings[f'{implementation}_depth'] if start else settings['position_depth']
+            if implementation == 'bitboard':
+                nodes, elapsed = timed(perft_bitboard, black, white, color, depth)
+            else:
+                nodes, elapsed = timed(perft_board, Board(fen), color, depth)
+            result = {
+                'name': f'{name}/{implementation}',
+                'depth': depth,
+                'nodes': nodes,
+                'time': elapsed,
+                'nps': rate(nodes, elapsed),
+            }
+            if start and PERFT_START.get(depth, nodes) != nodes:
+                result['error'] = f'expected {PERFT_START[depth]} nodes'
+            results.append(result)
+    return results
+
+def run_search(settings, evaluator):
+    evaluate = get_evaluator(evaluator)
+    results = []
+    for index, (fen, color) in enumerate(SEARCH_POSITIONS, start=1):
+        black, white = fen_to_bitboard(fen)
+        table = TranspositionTable(16)
+        search = Search(table, evaluate, evaluate_batch=getattr(evaluate, 'evaluate_batch', None))
+        result, elapsed = timed(search.iterative_deepening, black, white, color, settings['search_depth'])
+        time_to_depth = []
+        total = 0.0
+        for iteration in result['iterations']:
+            total += iteration['time']
+            time_to_depth.append(round(total, 6))
+        results.append({
+            'name': f'position-{index}',
+            'depth': result['depth'],
+            'nodes': search.nodes,
+            'time': elapsed,
+            'nps': rate(search.nodes, elapsed),
+            'tt_hit_rate': table.stats()['hit_rate'],
+            'time_to_depth': time_to_depth,
+        })
+    return results
+
+def run_endgame(settings):
+    results = []
+    for name, board, color, expected in ENDGAME_POSITIONS:
+        black, white = parse_board(board)
+        if count_empties(black, white) > settings['endgame_empties']:
+            continue
+        solver = EndgameSolver()
+        (_, score), elapsed = timed(solver.solve, black, white, color)
+        result = {
+            'name': name,
+            'empties': count_empties(black, white),
+            'nodes': solver.nodes,
+            'time': elapsed,
+            'nps': rate(solver.nodes, elapsed),
+            'tt_hit_rate': solver.tt.stats()['hit_rate'],
+        }
+        if score != expected:
+            result['error'] = f'solved as {score}, expected {expected}'
+        results.append(result)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare every benchmark with the baseline entry of the same name.
+    Returns:
+        A list of (section, name, metric, baseline value, new value, relative change)
+        for the metrics that got worse by more than threshold.
+    """
+    regressions = []
+    for section, entries in results['benchmarks'].items():
+        old_entries = {entry['name']: entry for entry in baseline.get('benchmarks', {}).get(section, [])}
+        for entry in entries:
+            old = old_entries.get(entry['name'])
+            if old is None or old.get('depth') != entry.get('depth'):
+                continue  # Not comparable
+            for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+                if metric not in entry or not old.get(metric):
+                    continue
+                change = (entry[metric] - old[metric]) / old[metric]
+                worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+                if worse:
+                    regressions.append((section, entry['name'], metric, old[metric], entry[metric], change))
+    return regressions
+
+def print_section(name, entries):
+    print(f'\n{name}')
+    print(f'{"name":>20} {"depth":>6} {"nodes":>10} {"time (s)":>9} {"nodes/s":>10} {"tt hits":>8}')
+    for entry in entries:
+        depth = entry.get('depth', entry.get('empties'))
+        tt_hit_rate = f'{entry["tt_hit_rate"]:.1%}' if 'tt_hit_rate' in entry else ''
+        error = f'  ERROR: {entry["error"]}' if 'error' in entry else ''
+        print(f'{entry["name"]:>20} {depth:>6} {entry["nodes"]:>10} {entry["time"]:>9.3f} '
+              f'{entry["nps"]:>10.0f} {tt_hit_rate:>8}{error}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--quick', action='store_true', help='Shallower depths for a fast check')
+    parser.add_argument('--eval', default='classic', choices=EVALUATORS, help='Evaluation for the searches')
+    parser.add_argument('--output', help='Write the results as JSON to this file ("-" for stdout)')
+    parser.add_argument('--baseline', help='Compare with the JSON results of an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Relative change counted as a regression')
+    args = parser.parse_args()
+    mode = 'quick' if args.quick else 'full'
+    settings = SETTINGS[mode]
+
+    results = {
+        'mode': mode,
+        'eval': args.eval,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'machine': platform.platform(),
+        'benchmarks': {
+            'perft': run_perft(settings),
+            'search': run_search(settings, args.eval),
+            'endgame': run_endgame(settings),
+        },
+    }
+    for section, entries in results['benchmarks'].items():
+        print_section(section, entries)
+
+    if args.output == '-':
+        print(json.dumps(results, indent=2))
+    elif args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    errors = sum('error' in entry for entries in results['benchmarks'].values() for entry in entries)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline.get('mode'), baseline.get('eval')) != (mode, args.eval):
+            print(f'\nBaseline was run with mode={baseline.get("mode")} eval={baseline.get("eval")}; only matching entries are compared')
+        regressions = compare(results, baseline, args.threshold)
+        print(f'\n{len(regressions)} regressions against {args.baseline} (threshold {args.threshold:.0%})')
+        for section, name, metric, old, new, change in regressions:
+            print(f'\tREGRESSION {section}/{name} {metric}: {old:.6g} -> {new:.6g} ({change:+.1%})')
+    if errors:
+        print(f'\n{errors} benchmarks gave wrong results')
+    if errors or regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Solve the endgame test positions and check the results against their known values.
+
+Usage: py -m benchmarks.endgame_suite [--max-empties 18] [-wld]
+"""
+import argparse
+from time import time
+
+from othello.bitboard import move_to_notation
+from engine.endgame import EndgameSolver, EXACT_MODE, WLD_MODE, count_empties
+from benchmarks.positions import ENDGAME_POSITIONS
+
+
+def parse_board(text):
+    # One character per square from a1 to h8: X for black, O for white, - for empty
+    black = white = 0
+    for square, char in enumerate(text):
+        if char == 'X':
+            black |= 1 << square
+        elif char == 'O':
+            white |= 1 << square
+    return black, white
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--max-empties', type=int, default=18)
+    parser.add_argument('-wld', action='store_true', help='Only solve for win/loss/draw.')
+    args = parser.parse_args()
+    mode = WLD_MODE if args.wld else EXACT_MODE
+
+    print(f'{"name":>10} {"empties":>8} {"move":>5} {"score":>6} {"expected":>9} {"nodes":>10} {"time (s)":>9}')
+    failures = 0
+    for name, board, color, expected in ENDGAME_POSITIONS:
+        black, white = parse_board(board)
+        empties = count_empties(black, white)
+        if empties > args.max_empties:
+            continue
+        solver = EndgameSolver()
+        start_time = time()
+        move, score = solver.solve(black, white, color, mode)
+        elapsed = time() - start_time
+        if mode == EXACT_MODE:
+            correct = score == expected
+        else:
+            correct = (score > 0) == (expected > 0) and (score < 0) == (expected < 0)
+        failures += not correct
+        print(f'{name:>10} {empties:>8} {move_to_notation(move):>5} {score:>6} {expected:>9} '
+              f'{solver.nodes:>10} {elapsed:>9.2f}{"" if correct else "  WRONG"}')
+    print('All positions solved correctly.' if failures == 0 else f'{failures} positions solved incorrectly.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Play two evaluators against each other at a fixed search depth to compare playing strength.
+
+Every opening (a few seeded random moves from the start) is played twice, once
+with each evaluator as black. Both sides solve the last empties exactly, so
+the games are decided by the middlegame.
+
+Usage: py -m benchmarks.eval_match [--first pattern] [--second classic] [--openings 10] [--depth 3] [--endgame 8]
+"""
+import argparse
+from random import Random
+from time import time
+
+from othello.bitboard import START_BLACK, START_WHITE, find_legal_moves_bitboard, make_move_bitboard
+from engine.engine import get_evaluator, EVALUATORS
+from engine.endgame import EndgameSolver, count_empties
+from engine.search import Search
+from engine.tt import TranspositionTable
+
+
+def random_opening(rng, moves):
+    black, white, color = START_BLACK, START_WHITE, 'b'
+    for _ in range(moves):
+        legal_moves = find_legal_moves_bitboard(black, white, color)
+        choices = [1 << square for square in range(64) if legal_moves >> square & 1]
+        black, white = make_move_bitboard(black, white, color, rng.choice(choices))
+        color = 'w' if color == 'b' else 'b'
+    return black, white, color
+
+def play_game(black, white, color, players, depth, endgame_empties):
+    """
+    Play a game out.
+    Args:
+        players: Dict of color -> evaluation function.
+    Returns:
+        The final disc difference from black's point of view.
+    """
+    tables = {'b': TranspositionTable(4), 'w': TranspositionTable(4)}
+    while True:
+        legal_moves = find_legal_moves_bitboard(black, white, color)
+        if not legal_moves:
+            color = 'w' if color == 'b' else 'b'
+            if not find_legal_moves_bitboard(black, white, color):
+                return black.bit_count() - white.bit_count()
+            continue
+        if count_empties(black, white) <= endgame_empties:
+            move, _ = EndgameSolver().solve(black, white, color)
+        else:
+            tables[color].new_search()
+            move = Search(tables[color], players[color]).iterative_deepening(black, white, color, depth)['move']
+        black, white = make_move_bitboard(black, white, color, move)
+        color = 'w' if color == 'b' else 'b'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--first', default='pattern', choices=EVALUATORS)
+    parser.add_argument('--second', default='classic', choices=EVALUATORS)
+    parser.add_argument('--openings', type=int, default=10)
+    parser.add_argument('--opening-moves', type=int, default=6)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--endgame', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    first, second = get_evaluator(args.first), get_evaluator(args.second)
+    rng = Random(args.seed)
+    wins = draws = losses = discs = 0
+    start_time = time()
+    for index in range(args.openings):
+        black, white, color = random_opening(rng, args.opening_moves)
+        for first_color in 'bw':
+            players = {first_color: first, 'bw'.replace(first_color, ''): second}
+            difference = play_game(black, white, color, players, args.depth, args.endgame)
+            if first_color == 'w':
+                difference = -difference
+            discs += difference
+            if difference > 0:
+                wins += 1
+            elif difference < 0:
+                losses += 1
+            else:
+                draws += 1
+        print(f'opening {index + 1}: {args.first} {wins}W {draws}D {losses}L against {args.second}')
+    games = 2 * args.openings
+    print(f'{args.first} scored {(wins + draws / 2) / games:.1%} over {games} games, '
+          f'average disc difference {discs / games:+.1f} ({time() - start_time:.0f}s)')
+
+
+if __name__ == '__main__':
+    main()
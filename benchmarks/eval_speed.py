@@ -0,0 +1,62 @@
+"""
+Compare evaluations per second of the evaluators (the pattern evaluator needs
+NumPy and its weights file), one position at a time and, for the pattern
+evaluator, in batches.
+
+Usage: py -m benchmarks.eval_speed [--positions 2000] [--repeat 3]
+"""
+import argparse
+from time import perf_counter
+
+from engine.engine import get_evaluator, EVALUATORS
+from benchmarks.positions import random_positions
+
+
+def evals_per_second(evaluate_function, positions, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start_time = perf_counter()
+        for black, white, _ in positions:
+            evaluate_function(black, white)
+        best = min(best, perf_counter() - start_time)
+    return len(positions) / best
+
+
+def batch_evals_per_second(evaluator, positions, repeat):
+    import numpy as np
+    black = np.array([position[0] for position in positions], dtype=np.uint64)
+    white = np.array([position[1] for position in positions], dtype=np.uint64)
+    best = float('inf')
+    for _ in range(repeat):
+        start_time = perf_counter()
+        evaluator.evaluate_batch(black, white)
+        best = min(best, perf_counter() - start_time)
+    return len(positions) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--positions', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    positions = random_positions(args.positions)
+    baseline = None
+    print(f'{"evaluator":>20} {"evals/s":>10} {"speedup":>8}')
+    for name in EVALUATORS:
+        try:
+            evaluate_function = get_evaluator(name)
+        except (ImportError, OSError) as e:
+            print(f'{name:>20} skipped: {e}')
+            continue
+        rate = evals_per_second(evaluate_function, positions, args.repeat)
+        if baseline is None:
+            baseline = rate
+        print(f'{name:>20} {rate:>10.0f} {rate / baseline:>7.2f}x')
+        if hasattr(evaluate_function, 'evaluate_batch'):
+            rate = batch_evals_per_second(evaluate_function, positions, args.repeat)
+            print(f'{name + " (batch)":>20} {rate:>10.0f} {rate / baseline:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
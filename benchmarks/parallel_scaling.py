@@ -0,0 +1,55 @@
+"""
+Measure how the Lazy SMP search scales with the number of worker processes.
+
+Usage: py -m benchmarks.parallel_scaling [--depth 6] [--workers 1 2 4 8] [--hash 16]
+"""
+import argparse
+from time import time
+
+from othello.game import Game
+from engine.engine import TranspositionTable, eval_bitboard
+from engine.search import Search
+from engine.parallel import lazy_smp_search
+
+
+# A quiet middlegame position reached from a common opening
+OPENING = ['f5', 'd6', 'c3', 'd3', 'c4', 'f4', 'f6', 'f3', 'e6', 'e7']
+
+
+def serial_search(black, white, color, depth, hash_size):
+    table = TranspositionTable(hash_size)
+    search = Search(table, eval_bitboard)
+    start_time = time()
+    score = None
+    for d in range(1, depth + 1):
+        table.new_search()
+        move, score = search.search_root(black, white, color, d, guess=score)
+    return {'depth': depth, 'nodes': search.nodes, 'time': time() - start_time, 'workers': 1}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--hash', type=float, default=16)
+    args = parser.parse_args()
+
+    game = Game()
+    for move in OPENING:
+        game.make_move(move)
+    black, white, color = game.board.black, game.board.white, game.color
+
+    print(f'{"workers":>8} {"depth":>6} {"time (s)":>10} {"nodes":>10} {"nodes/s":>10} {"speedup":>8}')
+    baseline = None
+    for workers in args.workers:
+        if workers == 1:
+            info = serial_search(black, white, color, args.depth, args.hash)
+        else:
+            _, _, info = lazy_smp_search(black, white, color, args.depth, workers, args.hash)
+        baseline = baseline or info['time']
+        print(f'{workers:>8} {info["depth"]:>6} {info["time"]:>10.3f} {info["nodes"]:>10} '
+              f'{info["nodes"] / info["time"]:>10.0f} {baseline / info["time"]:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Measure how many games per second the streaming PGN reader gets through a large archive.
+
+The archive is a file of seeded random games with headers, written with
+write_pgns (or any PGN file given with --file). It is read by splitting the
+whole text into games and calling create_board on each, as loading one game
+with Game did, then with read_pgn (buffered and memory mapped, move lists and
+played Games) and with read_pgn_parallel.
+
+Usage: py -m benchmarks.pgn_reader [--games 20000] [--file FILE] [--workers 4] [--chunk 1048576]
+"""
+import argparse
+import os
+import tempfile
+from time import perf_counter
+
+from othello.game import Game, create_board, write_pgns
+from othello.pgn import read_pgn, read_pgn_parallel
+from benchmarks.positions import random_games
+
+
+def write_archive(path, count):
+    games = []
+    for number, moves in enumerate(random_games(count), start=1):
+        game = Game()
+        game.metadata = {'Event': 'Random games', 'Round': str(number), 'Black': 'random', 'White': 'random'}
+        for move in moves:
+            game.make_move(move)
+        games.append(game)
+    with open(path, 'w') as f:
+        write_pgns(games, f)
+
+def read_whole(path):
+    # Every game's text is cut out of the whole file and replayed on a Board
+    with open(path) as f:
+        text = f.read()
+    games = []
+    lines = []
+    in_moves = False
+    for line in text.splitlines():
+        is_header = '[' in line and ']' in line
+        if is_header and in_moves:
+            games.append(create_board('\n'.join(lines)))
+            lines = []
+        in_moves = not is_header
+        lines.append(line)
+    if lines:
+        games.append(create_board('\n'.join(lines)))
+    return len(games)
+
+def count(games) -> int:
+    return sum(1 for _ in games)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--games', type=int, default=20000)
+    parser.add_argument('--file', help='Read this PGN file instead of generating one')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk', type=int, default=1 << 20, help='Bytes per parallel task')
+    args = parser.parse_args()
+
+    path = args.file
+    if path is None:
+        handle, path = tempfile.mkstemp(suffix='.pgn')
+        os.close(handle)
+        write_archive(path, args.games)
+    try:
+        size = os.path.getsize(path)
+        print(f'{path}: {size / 2**20:.1f} MB\n')
+        print(f'{"reader":>28} {"games":>8} {"time (s)":>10} {"games/s":>10} {"MB/s":>8}')
+        readers = (
+            ('whole file + create_board', lambda: read_whole(path)),
+            ('read_pgn', lambda: count(read_pgn(path))),
+            ('read_pgn mmap', lambda: count(read_pgn(path, use_mmap=True))),
+            ('read_pgn games', lambda: count(read_pgn(path, as_games=True))),
+            (f'read_pgn_parallel x{args.workers}', lambda: count(read_pgn_parallel(path, args.workers, args.chunk))),
+        )
+        for name, reader in readers:
+            start_time = perf_counter()
+            games = reader()
+            elapsed = perf_counter() - start_time
+            print(f'{name:>28} {games:>8} {elapsed:>10.3f} {games / elapsed:>10.0f} {size / 2**20 / elapsed:>8.1f}')
+    finally:
+        if args.file is None:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Fixed test positions (fen, color to move) used by the benchmarks, from the
+early middlegame to the late middlegame.
+"""
+from random import Random
+
+from othello.bitboard import START_BLACK, START_WHITE, find_legal_moves_bitboard, make_move_bitboard, move_to_notation
+
+
+SEARCH_POSITIONS = [
+    ('8/8/6d1/3DDDD1/2dddD2/3d1D2/2d5/8', 'b'),
+    ('8/4Dd2/3Ddd2/2Ddddd1/3DDd2/2D1ddd1/8/8', 'w'),
+    ('8/3D1d2/2DDd3/2DDdD2/DDDDDdD1/3Dd1d1/5d2/8', 'b'),
+    ('8/5D2/2DDDD2/ddDDddd1/2DdDd2/3DdD2/2DDDd2/4d1d1', 'w'),
+    ('6D1/2d1DD2/2d1D3/1dddDD2/2DdDD1d/1DDDDDd1/3dDddd/7D', 'b'),
+    ('3d4/3DDDD1/2dDDddd/2dDDdd1/3Dddd1/2DDDdD1/1DDddD2/1D1dD3', 'w'),
+    ('3Dd3/dddD4/1dDD1dd1/2dDDDDD/ddDddddd/1D1Dd1d1/D2Ddd1D/3Dd3', 'b'),
+    ('Dd1D4/DdDDd1d1/DDDDDdd1/DDdDD1d1/DDDdDDD1/DD1dD3/2dDdD2/1d3ddd', 'w'),
+]
+
+# Endgame positions (name, board from a1 to h8 with X black / O white / - empty,
+# color to move, exact final disc difference for the side to move).
+# ffo-40 is position #40 of the FFO endgame suite (a2, +38); the others follow
+# its principal variation, so their values are +-38 as well.
+ENDGAME_POSITIONS = [
+    ('ffo-40', 'O--OOOOX-OOOOOOXOOXXOOOXOOXOOOXXOOOOOOXX---OOOOX----O--X--------', 'b', 38),
+    ('ffo-40+1', 'O--OOOOXXXXXXXXXOXXXOOOXOOXOOOXXOOOOOOXX---OOOOX----O--X--------', 'w', -38),
+    ('ffo-40+2', 'OO-OOOOXXOOXXXXXOOXOOOOXOOXOOOXXOOOOOOXX---OOOOX----O--X--------', 'b', 38),
+    ('ffo-40+4', 'OOXXXXXXXOXXXXXXOOXOOOOXOOXOOOXXOOOOOOXX---OOOOX----O--X--------', 'b', 38),
+    ('ffo-40+5', 'OOXXXXXXXOXXXXXXOOXOXOOXOOXXOOXXOOXOOOXX-X-OOOOX----O--X--------', 'w', -38),
+    ('ffo-40+6', 'OOXXXXXXXOXXXXXXOOXOXOOXOOXXOOXXOOXOOOXX-O-OOOOX--O-O--X--------', 'b', 38),
+    ('ffo-40+7', 'OOXXXXXXXOXXXXXXOOXOXOOXOOXXOOXXOOXOOOXX-X-OOOOXX-O-O--X--------', 'w', -38),
+    ('ffo-40+8', 'OOXXXXXXXOXXXXXXOOXOXOOXOOXXOOXXOOXOOOXX-O-OOOOXXOO-O--X--------', 'b', 38),
+    ('ffo-40+9', 'OOXXXXXXXOXXXXXXOOXOXOXXOOXXOXXXOOXOXOXX-O-XOOOXXOX-O--X-X------', 'w', -38),
+    ('ffo-40+10', 'OOXXXXXXXOXXXXXXOOXOXOXXOOXXOXXXOOXOXOXX-O-OOOOXXOOOO--X-X------', 'b', 38),
+]
+
+
+def random_positions(count, seed=1):
+    """
+    Play seeded random games and collect every position reached.
+    Returns:
+        A list of count (black_bitboard, white_bitboard, color to move) tuples.
+    """
+    rng = Random(seed)
+    positions = []
+    while True:
+        black, white, color = START_BLACK, START_WHITE, 'b'
+        while True:
+            legal_moves = find_legal_moves_bitboard(black, white, color)
+            if not legal_moves:
+                color = 'w' if color == 'b' else 'b'
+                legal_moves = find_legal_moves_bitboard(black, white, color)
+                if not legal_moves:
+                    break
+            positions.append((black, white, color))
+            if len(positions) == count:
+                return positions
+            moves = [1 << square for square in range(64) if legal_moves >> square & 1]
+            black, white = make_move_bitboard(black, white, color, rng.choice(moves))
+            color = 'w' if color == 'b' else 'b'
+
+def random_games(count, seed=1):
+    """
+    Play seeded random games to the end.
+    Returns:
+        A list of count games, each a list of moves in lowercase notation (passes left out).
+    """
+    rng = Random(seed)
+    games = []
+    for _ in range(count):
+        black, white, color = START_BLACK, START_WHITE, 'b'
+        moves = []
+        while True:
+            legal_moves = find_legal_moves_bitboard(black, white, color)
+            if not legal_moves:
+                color = 'w' if color == 'b' else 'b'
+                legal_moves = find_legal_moves_bitboard(black, white, color)
+                if not legal_moves:
+                    break
+            move = rng.choice([1 << square for square in range(64) if legal_moves >> square & 1])
+            moves.append(move_to_notation(move).lower())
+            black, white = make_move_bitboard(black, white, color, move)
+            color = 'w' if color == 'b' else 'b'
+        games.append(moves)
+    return games
@@ -0,0 +1,72 @@
+"""
+Measure how fast recorded games are replayed, in plies per second.
+
+Seeded random games are replayed move by move three ways: through
+Game.make_move (with its disc counts, side to move and game over state), through
+Board.make_move alone, and from PGN text through othello.game.create_board.
+
+Usage: py -m benchmarks.replay [--games 2000] [--repeat 3] [--seed 1]
+"""
+import argparse
+from time import perf_counter
+
+from othello.board import Board
+from othello.game import Game, create_board, create_pgn
+from benchmarks.positions import random_games
+
+
+def replay_games(games):
+    for moves in games:
+        game = Game()
+        for move in moves:
+            game.make_move(move)
+
+def replay_boards(games):
+    for moves in games:
+        board = Board()
+        color = 'b'
+        for move in moves:
+            if not board.has_legal_moves(color):
+                color = 'w' if color == 'b' else 'b'
+            board.make_move(move, color)
+            color = 'w' if color == 'b' else 'b'
+
+def replay_pgns(pgns):
+    for pgn in pgns:
+        create_board(pgn)
+
+def best_time(function, argument, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start_time = perf_counter()
+        function(argument)
+        best = min(best, perf_counter() - start_time)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    games = random_games(args.games, args.seed)
+    plies = sum(len(moves) for moves in games)
+    pgns = []
+    for moves in games:
+        game = Game()
+        for move in moves:
+            game.make_move(move)
+        pgns.append(create_pgn({}, game.board.moves))
+
+    print(f'{len(games)} games, {plies} plies')
+    print(f'{"replay":>18} {"time (s)":>10} {"plies/s":>10} {"games/s":>10}')
+    for name, function, argument in (('Game.make_move', replay_games, games), ('Board.make_move', replay_boards, games),
+                                     ('create_board', replay_pgns, pgns)):
+        elapsed = best_time(function, argument, args.repeat)
+        print(f'{name:>18} {elapsed:>10.3f} {plies / elapsed:>10.0f} {len(games) / elapsed:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare the nodes searched by the minimax search and the PVS search at a fixed depth.
+
+Usage: py -m benchmarks.search_nodes [--depth 5] [--hash 16]
+"""
+import argparse
+from time import time
+
+from othello.bitboard import fen_to_bitboard, find_legal_moves_bitboard, make_move_bitboard
+from engine.engine import TranspositionTable, eval_bitboard, minimax_ab_bitboard_tt, opponent_color
+from engine.search import Search
+from benchmarks.positions import SEARCH_POSITIONS
+
+
+def minimax_nodes(black, white, color, depth, hash_size):
+    # Every minimax node probes the table exactly once
+    table = TranspositionTable(hash_size)
+    maximizing_player = color == 'b'
+    for d in range(1, depth + 1):
+        table.new_search()
+        legal_moves = find_legal_moves_bitboard(black, white, color)
+        alpha, beta = float('-inf'), float('inf')
+        while legal_moves:
+            move = legal_moves & -legal_moves
+            legal_moves ^= move
+            new_black, new_white = make_move_bitboard(black, white, color, move)
+            score = minimax_ab_bitboard_tt(new_black, new_white, d - 1, alpha, beta,
+                                           not maximizing_player, opponent_color(color), table)
+            if maximizing_player:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+    return table.probes
+
+
+def pvs_nodes(black, white, color, depth, hash_size):
+    table = TranspositionTable(hash_size)
+    search = Search(table, eval_bitboard)
+    score = None
+    for d in range(1, depth + 1):
+        table.new_search()
+        _, score = search.search_root(black, white, color, d, guess=score)
+    return search.nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--hash', type=float, default=16)
+    args = parser.parse_args()
+
+    print(f'{"position":>8} {"minimax":>10} {"pvs":>10} {"ratio":>7}')
+    totals = [0, 0]
+    start_time = time()
+    for index, (fen, color) in enumerate(SEARCH_POSITIONS, start=1):
+        black, white = fen_to_bitboard(fen)
+        minimax = minimax_nodes(black, white, color, args.depth, args.hash)
+        pvs = pvs_nodes(black, white, color, args.depth, args.hash)
+        totals[0] += minimax
+        totals[1] += pvs
+        print(f'{index:>8} {minimax:>10} {pvs:>10} {pvs / minimax:>7.2f}')
+    print(f'{"total":>8} {totals[0]:>10} {totals[1]:>10} {totals[1] / totals[0]:>7.2f}')
+    print(f'Finished in {time() - start_time:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
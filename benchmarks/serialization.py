@@ -0,0 +1,88 @@
+"""
+Measure the cost of producing PGN text while games are played and when they are exported in bulk.
+
+The display test plays seeded random games and asks for the pgn after every
+move, as the interface does with auto_display_pgn on: once rendering every
+move again with create_pgn, once through the board's cached movetext. The
+export test writes every game to a stream, once as one create_pgn string per
+game and once piece by piece with write_pgns.
+
+Usage: py -m benchmarks.serialization [--games 1000] [--repeat 3] [--output FILE]
+"""
+import argparse
+import io
+import os
+from time import perf_counter
+
+from othello.game import Game, create_pgn, write_pgns
+from benchmarks.positions import random_games
+
+
+def display_rendered(games):
+    for moves in games:
+        game = Game()
+        for move in moves:
+            game.make_move(move)
+            create_pgn({}, game.board.moves)
+
+def display_cached(games):
+    for moves in games:
+        game = Game()
+        for move in moves:
+            game.make_move(move)
+            game.board.pgn
+
+def export_strings(games, stream):
+    for game in games:
+        stream.write(create_pgn(game.metadata, game.board.moves))
+        stream.write('\n')
+
+def export_stream(games, stream):
+    write_pgns(games, stream)
+
+def best_time(function, repeat, *args):
+    best = float('inf')
+    for _ in range(repeat):
+        start_time = perf_counter()
+        function(*args)
+        best = min(best, perf_counter() - start_time)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='File to export to (default: memory)')
+    args = parser.parse_args()
+
+    games = random_games(args.games)
+    plies = sum(len(moves) for moves in games)
+    print(f'{len(games)} games, {plies} plies\n')
+    print(f'{"pgn after every move":>24} {"time (s)":>10} {"plies/s":>10}')
+    for name, function in (('create_pgn', display_rendered), ('Board.pgn', display_cached)):
+        elapsed = best_time(function, args.repeat, games)
+        print(f'{name:>24} {elapsed:>10.3f} {plies / elapsed:>10.0f}')
+
+    played = []
+    for moves in games:
+        game = Game()
+        game.metadata = {'Black': 'random', 'White': 'random'}
+        for move in moves:
+            game.make_move(move)
+        played.append(game)
+    print(f'\n{"export":>24} {"time (s)":>10} {"games/s":>10}')
+    for name, function in (('create_pgn per game', export_strings), ('write_pgns', export_stream)):
+        best = float('inf')
+        for _ in range(args.repeat):
+            with (open(args.output, 'w') if args.output else io.StringIO()) as stream:
+                start_time = perf_counter()
+                function(played, stream)
+                best = min(best, perf_counter() - start_time)
+        print(f'{name:>24} {best:>10.3f} {len(played) / best:>10.0f}')
+    if args.output:
+        print(f'\nWrote {os.path.getsize(args.output)} bytes to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
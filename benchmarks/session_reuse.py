@@ -0,0 +1,72 @@
+"""
+Measure what keeping the engine's tables between moves saves over starting every move from scratch.
+
+A game is played from a common opening with fixed depth searches. Every
+position is searched twice: by ai_move_iterative, which starts with an empty
+table and cache (and with several workers starts new processes), and by an
+Engine kept for the whole game. The fresh search's move is played, so both see
+the same positions.
+
+Usage: py -m benchmarks.session_reuse [--depth 6] [--moves 16] [--workers 1] [--hash 16]
+"""
+import argparse
+from time import perf_counter
+
+from othello.game import Game
+from engine.engine import ai_move_iterative
+from engine.session import Engine
+
+
+OPENING = ['f5', 'd6', 'c3', 'd3', 'c4', 'f4']
+
+
+def report_nodes(report) -> int:
+    # Parallel searches report a total, serial ones the nodes of every iteration
+    return report.get('nodes', sum(iteration['nodes'] for iteration in report.get('iterations', [])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--moves', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--hash', type=float, default=16)
+    args = parser.parse_args()
+
+    game = Game()
+    for move in OPENING:
+        game.make_move(move)
+    engine = Engine(args.hash, args.workers)
+    totals = {'fresh': [0.0, 0], 'session': [0.0, 0]}
+    print(f'{"ply":>4} {"move":>5} {"fresh (s)":>10} {"nodes":>9} {"session (s)":>12} {"nodes":>9} {"speedup":>8}')
+    try:
+        for _ in range(args.moves):
+            if game.game_over:
+                break
+            board, color = game.board, game.color
+            start_time = perf_counter()
+            move, _, fresh = ai_move_iterative(board, color, args.depth, None, args.hash, args.workers,
+                                               endgame_empties=0, book=None)
+            fresh_time = perf_counter() - start_time
+            start_time = perf_counter()
+            _, _, session = engine.search(board, color, args.depth, endgame_empties=0, book=None)
+            session_time = perf_counter() - start_time
+
+            totals['fresh'][0] += fresh_time
+            totals['fresh'][1] += report_nodes(fresh)
+            totals['session'][0] += session_time
+            totals['session'][1] += report_nodes(session)
+            print(f'{len(game.board.moves) + 1:>4} {move:>5} {fresh_time:>10.3f} {report_nodes(fresh):>9} '
+                  f'{session_time:>12.3f} {report_nodes(session):>9} {fresh_time / session_time:>8.2f}')
+            game.make_move(move)
+    finally:
+        engine.close()
+
+    fresh_time, fresh_nodes = totals['fresh']
+    session_time, session_nodes = totals['session']
+    print(f'{"total":>10} {fresh_time:>10.3f} {fresh_nodes:>9} {session_time:>12.3f} {session_nodes:>9} '
+          f'{fresh_time / session_time:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Measure what keying the transposition table and evaluation cache on the
+canonical (symmetry-reduced) position gains: hit rates, nodes and time.
+
+Usage: py -m benchmarks.symmetry_hits [--depth 6] [--eval table]
+"""
+import argparse
+from time import perf_counter
+
+from othello.bitboard import START_BLACK, START_WHITE, fen_to_bitboard
+from engine.cache import EvalCache
+from engine.engine import get_evaluator, SYMMETRIC_EVALUATORS
+from engine.search import Search
+from engine.tt import TranspositionTable
+from benchmarks.positions import SEARCH_POSITIONS
+
+
+def run(positions, depth, evaluate, symmetry):
+    totals = {'tt_probes': 0, 'tt_hits': 0, 'cache_lookups': 0, 'cache_hits': 0, 'nodes': 0, 'time': 0.0}
+    for black, white, color in positions:
+        table = TranspositionTable(16)
+        cache = EvalCache()
+        search = Search(table, evaluate, eval_cache=cache, symmetry=symmetry)
+        start_time = perf_counter()
+        search.iterative_deepening(black, white, color, depth)
+        totals['time'] += perf_counter() - start_time
+        totals['nodes'] += search.nodes
+        totals['tt_probes'] += table.probes
+        totals['tt_hits'] += table.hits
+        totals['cache_lookups'] += cache.hits + cache.misses
+        totals['cache_hits'] += cache.hits
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--eval', default='table', choices=SYMMETRIC_EVALUATORS)
+    args = parser.parse_args()
+    evaluate = get_evaluator(args.eval)
+
+    suites = {
+        'start': [(START_BLACK, START_WHITE, 'b')],
+        'middlegame': [fen_to_bitboard(fen) + (color,) for fen, color in SEARCH_POSITIONS],
+    }
+    print(f'{"positions":>10} {"symmetry":>8} {"tt hits":>8} {"cache hits":>10} {"nodes":>9} {"time":>7}')
+    for name, positions in suites.items():
+        for symmetry in (False, True):
+            totals = run(positions, args.depth, evaluate, symmetry)
+            tt_rate = totals['tt_hits'] / max(totals['tt_probes'], 1)
+            cache_rate = totals['cache_hits'] / max(totals['cache_lookups'], 1)
+            print(f'{name:>10} {"on" if symmetry else "off":>8} {tt_rate:>8.1%} {cache_rate:>10.1%} '
+                  f'{totals["nodes"]:>9} {totals["time"]:>6.2f}s')
+
+
+if __name__ == '__main__':
+    main()
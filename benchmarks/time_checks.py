@@ -0,0 +1,98 @@
+"""
+Measure the cost of checking the clock during the search and how late an aborted search stops.
+
+The check is timed in a loop that does nothing else, once reading the clock
+at every node (the old behaviour) and once every TIME_CHECK_INTERVAL nodes,
+and set against the time a node of a real search takes (the difference is far
+below the run-to-run noise of timing whole searches). Then deep searches get
+a short hard limit to measure how long after it they return.
+
+Usage: py -m benchmarks.time_checks [--depth 5] [--repeat 3] [--limit 0.2]
+"""
+import argparse
+from time import time, perf_counter
+
+from othello.bitboard import fen_to_bitboard
+from engine.engine import eval_bitboard
+from engine.search import Search
+from engine.settings import TIME_CHECK_INTERVAL
+from engine.tt import TranspositionTable
+from benchmarks.positions import SEARCH_POSITIONS
+
+
+FAR_FUTURE = 1e6  # Seconds: a deadline that never passes
+
+
+def check_cost(check_interval, count=10**6):
+    """
+    Return the seconds per node of the search's clock check alone.
+    """
+    time_limit = time() + FAR_FUTURE
+    countdown = check_interval
+    start_time = perf_counter()
+    for _ in range(count):
+        countdown -= 1
+        if not countdown:
+            countdown = check_interval
+            if time_limit is not None and time() > time_limit:
+                break
+    return (perf_counter() - start_time) / count
+
+def node_time(depth, repeat):
+    """
+    Return the seconds per node of searching every position, the fastest of repeat runs.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        nodes = 0
+        start_time = perf_counter()
+        for fen, color in SEARCH_POSITIONS:
+            black, white = fen_to_bitboard(fen)
+            search = Search(TranspositionTable(16), eval_bitboard, time() + FAR_FUTURE)
+            search.iterative_deepening(black, white, color, depth)
+            nodes += search.nodes
+        best = min(best, (perf_counter() - start_time) / nodes)
+    return best
+
+def abort_latency(limit, check_interval):
+    """
+    Give a search of every position limit seconds and measure how late each one returns.
+    Returns:
+        The mean and worst delay past the limit in seconds.
+    """
+    delays = []
+    for fen, color in SEARCH_POSITIONS:
+        black, white = fen_to_bitboard(fen)
+        start_time = time()
+        # The first iteration always completes, but at depth 1 it takes no time
+        search = Search(TranspositionTable(16), eval_bitboard, start_time + limit, check_interval=check_interval)
+        search.iterative_deepening(black, white, color, 64)
+        delays.append(max(0.0, time() - start_time - limit))
+    return sum(delays) / len(delays), max(delays)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--limit', type=float, default=0.2, help='Hard limit in seconds for the abort test')
+    args = parser.parse_args()
+
+    per_node = node_time(args.depth, args.repeat)
+    print(f'Search at depth {args.depth}: {per_node * 1e9:.0f} ns/node\n')
+    print(f'{"clock checks":>24} {"check ns/node":>14} {"share of node":>14}')
+    for check_interval in (1, TIME_CHECK_INTERVAL):
+        label = f'every {check_interval} nodes'
+        cost = check_cost(check_interval)
+        print(f'{label:>24} {cost * 1e9:>14.1f} {cost / per_node:>14.3%}')
+
+    print(f'\nAbort {args.limit}s into a deep search')
+    print(f'{"clock checks":>24} {"mean delay (ms)":>16} {"worst (ms)":>11}')
+    for check_interval in (1, TIME_CHECK_INTERVAL):
+        mean, worst = abort_latency(args.limit, check_interval)
+        label = f'every {check_interval} nodes'
+        print(f'{label:>24} {mean * 1000:>16.2f} {worst * 1000:>11.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Vectorized move generation and evaluation over NumPy arrays of positions.
+
+Positions are given as uint64 arrays of bitboards from the side to move's
+point of view (player, opponent), like the search uses them. Every function
+handles the whole array with a fixed number of array operations, so the
+per-position cost is a small fraction of the scalar functions in
+othello.bitboard when the arrays are large.
+
+NumPy is an optional dependency: this module raises ImportError without it.
+"""
+import numpy as np
+
+
+FULL = np.uint64(0xFFFFFFFFFFFFFFFF)
+INNER_FILES = np.uint64(0x7E7E7E7E7E7E7E7E)  # Every file except A and H
+ZERO = np.uint64(0)
+
+# (shift, mask applied to the opponent's discs) for the four line directions
+DIRECTIONS = (
+    (np.uint64(1), INNER_FILES),
+    (np.uint64(8), FULL),
+    (np.uint64(7), INNER_FILES),
+    (np.uint64(9), INNER_FILES),
+)
+SQUARES = [np.uint64(1 << square) for square in range(64)]
+
+
+def as_bitboards(bitboards):
+    return np.asarray(bitboards, dtype=np.uint64)
+
+def popcount(bitboards):
+    """
+    Count the set bits of every bitboard.
+    """
+    bitboards = as_bitboards(bitboards)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bitboards)
+    return np.unpackbits(bitboards.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1, dtype=np.uint8)
+
+def legal_moves(player, opponent):
+    """
+    Find the legal moves of every position.
+    Args:
+        player: uint64 array of the side to move's bitboards.
+        opponent: uint64 array of the other side's bitboards.
+    Returns:
+        A uint64 array with a bit set for every legal move.
+    """
+    player = as_bitboards(player)
+    opponent = as_bitboards(opponent)
+    empty = ~(player | opponent)
+    moves = np.zeros_like(player)
+    for shift, mask in DIRECTIONS:
+        masked = opponent & mask
+        # A move can bracket at most six opponent discs
+        left = masked & (player << shift)
+        right = masked & (player >> shift)
+        for _ in range(5):
+            left |= masked & (left << shift)
+            right |= masked & (right >> shift)
+        moves |= (left << shift) | (right >> shift)
+    return moves & empty
+
+def make_moves(player, opponent, moves):
+    """
+    Play one move in every position.
+    Args:
+        player: uint64 array of the side to move's bitboards.
+        opponent: uint64 array of the other side's bitboards.
+        moves: uint64 array with one bit set per position (0 to pass).
+    Returns:
+        The new (player, opponent) arrays, still from the point of view of the
+        side that moved. The moves aren't checked for legality.
+    """
+    player = as_bitboards(player)
+    opponent = as_bitboards(opponent)
+    moves = as_bitboards(moves)
+    flips = np.zeros_like(player)
+    for shift, mask in DIRECTIONS:
+        masked = opponent & mask
+        for step in (lambda bitboards: bitboards << shift, lambda bitboards: bitboards >> shift):
+            run = step(moves) & masked
+            for _ in range(5):
+                run |= step(run) & masked
+            # The run only flips when the square after it holds one of the player's discs
+            end = step(moves | run) & ~run & player
+            flips |= np.where(end != ZERO, run, ZERO)
+    return player | flips | moves, opponent & ~flips
+
+def expand(player, opponent, moves=None):
+    """
+    Generate every child of every position.
+    Args:
+        player: uint64 array of the side to move's bitboards.
+        opponent: uint64 array of the other side's bitboards.
+        moves: The legal moves, if already known.
+    Returns:
+        The index of each child's parent, the move played (a single-bit
+        bitboard) and the child's (player, opponent) arrays from the point of
+        view of the side that moved. Positions without moves have no children.
+    """
+    player = as_bitboards(player)
+    opponent = as_bitboards(opponent)
+    if moves is None:
+        moves = legal_moves(player, opponent)
+    parents = []
+    played = []
+    for square in SQUARES:
+        has_move = np.flatnonzero(moves & square)
+        if len(has_move):
+            parents.append(has_move)
+            played.append(np.full(len(has_move), square, dtype=np.uint64))
+    if not parents:
+        empty = np.zeros(0, dtype=np.uint64)
+        return np.zeros(0, dtype=np.intp), empty, empty, empty
+    parents = np.concatenate(parents)
+    played = np.concatenate(played)
+    order = np.argsort(parents, kind='stable')
+    parents, played = parents[order], played[order]
+    new_player, new_opponent = make_moves(player[parents], opponent[parents], played)
+    return parents, played, new_player, new_opponent
+
+def evaluate(black, white, evaluator=None):
+    """
+    Evaluate every position from black's point of view.
+    Args:
+        black: uint64 array of black bitboards.
+        white: uint64 array of white bitboards.
+        evaluator: An object with an evaluate_batch method, or a scalar
+            evaluation function (black_bitboard, white_bitboard) -> score,
+            which is applied position by position. Defaults to the pattern evaluator.
+    Returns:
+        A float array of scores.
+    """
+    if evaluator is None:
+        from engine.patterns import load_default_evaluator
+        evaluator = load_default_evaluator()
+    black = as_bitboards(black)
+    white = as_bitboards(white)
+    if hasattr(evaluator, 'evaluate_batch'):
+        return evaluator.evaluate_batch(black, white)
+    return np.array([evaluator(int(b), int(w)) for b, w in zip(black, white)], dtype=np.float64)
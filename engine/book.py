@@ -0,0 +1,272 @@
+"""
+Opening book stored as a sorted binary file and read through mmap.
+
+The builder streams PGN files game by game (see othello.pgn), replays the
+moves like othello.game.create_board does and, for the first plies of every
+game, counts black wins, draws and white wins per position. Positions are keyed on
+the Zobrist hash of their canonical (symmetry-reduced) form and the side to
+move, so all 8 orientations of an opening share one record. Positions seen
+often enough can also get a deep search score.
+
+Usage:
+    py -m engine.book build GAMES.pgn [GAMES.pgn ...] [--output book.bin] [--plies 20] [--search-depth 0]
+    py -m engine.book show [--book book.bin] [--fen FEN] [--color b]
+"""
+import argparse
+import mmap
+import os
+import struct
+from math import isnan
+
+from othello.bitboard import (
+    START_BLACK, START_WHITE, find_legal_moves_bitboard, make_move_bitboard, move_to_notation,
+    fen_to_bitboard
+)
+from othello.pgn import read_pgn
+from othello.symmetry import canonical
+from engine.zobrist import zobrist_hash
+
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'book.bin')
+BOOK_PLIES = 20
+MIN_GAMES = 2  # Moves played in fewer games than this are ignored
+
+MAGIC = b'OBK1'
+HEADER = struct.Struct('<4sIQ')        # Magic, record size, record count
+RECORD = struct.Struct('<QIIIfB3x')    # Key, black wins, draws, white wins, search score, search depth
+NO_SCORE = float('nan')
+
+
+def position_key(black_bitboard:int, white_bitboard:int, color) -> int:
+    black, white, _ = canonical(black_bitboard, white_bitboard)
+    return zobrist_hash(black, white, color)
+
+
+class OpeningBook:
+    """
+    Read-only view of a book file. The file is mapped, not loaded: a lookup
+    is a binary search over the fixed-size records.
+    """
+    def __init__(self, path:str=BOOK_FILE):
+        """
+        Raises:
+            OSError: If the file can't be opened.
+            ValueError: If the file isn't a book.
+        """
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, record_size, count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or record_size != RECORD.size or HEADER.size + count * RECORD.size > len(self.map):
+            self.map.close()
+            raise ValueError(f'{path} is not an opening book')
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.map.close()
+
+    def find(self, key:int):
+        """
+        Binary search for a key.
+        Returns:
+            (black wins, draws, white wins, score, depth) or None.
+        """
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            record_key = struct.unpack_from('<Q', self.map, HEADER.size + middle * RECORD.size)[0]
+            if record_key < key:
+                low = middle + 1
+            elif record_key > key:
+                high = middle
+            else:
+                return RECORD.unpack_from(self.map, HEADER.size + middle * RECORD.size)[1:]
+        return None
+
+    def probe(self, black_bitboard:int, white_bitboard:int, color):
+        return self.find(position_key(black_bitboard, white_bitboard, color))
+
+    def moves(self, black_bitboard:int, white_bitboard:int, color, min_games:int=MIN_GAMES):
+        """
+        List the book moves of a position, best first.
+        A move's value comes from the search score of the position it leads
+        to when there is one, otherwise from its results (wins plus half the
+        draws, as a share of the games), both from the mover's point of view.
+        Returns:
+            A list of (move bitboard, value, games, score or None).
+        """
+        other = 'w' if color == 'b' else 'b'
+        legal_moves = find_legal_moves_bitboard(black_bitboard, white_bitboard, color)
+        candidates = []
+        while legal_moves:
+            move = legal_moves & -legal_moves
+            legal_moves ^= move
+            black, white = make_move_bitboard(black_bitboard, white_bitboard, color, move)
+            # The side to move after a pass is the same color again
+            next_color = other if find_legal_moves_bitboard(black, white, other) else color
+            record = self.probe(black, white, next_color)
+            if record is None:
+                continue
+            black_wins, draws, white_wins, score, _ = record
+            games = black_wins + draws + white_wins
+            if games < min_games:
+                continue
+            wins = black_wins if color == 'b' else white_wins
+            score = None if isnan(score) else (score if color == 'b' else -score)
+            # Scored moves rank above unscored ones
+            value = (1, score) if score is not None else (0, (wins + draws / 2) / games)
+            candidates.append((move, value, games, score))
+        candidates.sort(key=lambda candidate: (candidate[1], candidate[2]), reverse=True)
+        return candidates
+
+    def best_move(self, black_bitboard:int, white_bitboard:int, color, min_games:int=MIN_GAMES):
+        """
+        Return the best book move as (move bitboard, value, games, score), or None if the position is out of book.
+        """
+        moves = self.moves(black_bitboard, white_bitboard, color, min_games)
+        return moves[0] if moves else None
+
+
+_open_books = {}
+
+def open_book(path:str=BOOK_FILE):
+    """
+    Return the OpeningBook for path, mapping it on first use, or None if there is no usable book there.
+    """
+    if path not in _open_books:
+        try:
+            _open_books[path] = OpeningBook(path)
+        except (OSError, ValueError):
+            return None
+    return _open_books[path]
+
+
+def replay(moves:bytes):
+    """
+    Replay a compact move list (see othello.pgn) from the start position,
+    stopping at the first illegal move, like create_board.
+    Returns:
+        The positions before every move as (black, white, color) and the final (black, white, finished).
+    """
+    black, white, color = START_BLACK, START_WHITE, 'b'
+    positions = []
+    for square in moves:
+        if not find_legal_moves_bitboard(black, white, color):
+            color = 'w' if color == 'b' else 'b'
+        move = 1 << square
+        if not find_legal_moves_bitboard(black, white, color) & move:
+            break
+        positions.append((black, white, color))
+        black, white = make_move_bitboard(black, white, color, move)
+        color = 'w' if color == 'b' else 'b'
+    if not find_legal_moves_bitboard(black, white, color):
+        color = 'w' if color == 'b' else 'b'
+    finished = not find_legal_moves_bitboard(black, white, color)
+    positions.append((black, white, color))
+    return positions, (black, white, finished)
+
+def game_result(metadata:dict, final):
+    """
+    Return black's final disc difference: from the final position when the game
+    was played out, else from a 'Result' header like '33-31', else None.
+    """
+    black, white, finished = final
+    if finished:
+        return black.bit_count() - white.bit_count()
+    result = metadata.get('Result')
+    if result:
+        try:
+            black_discs, white_discs = result.split('-')
+            return int(black_discs) - int(white_discs)
+        except ValueError:
+            return None
+    return None
+
+def build_book(paths, output:str=BOOK_FILE, plies:int=BOOK_PLIES, search_depth:int=0, min_games:int=MIN_GAMES):
+    """
+    Build a book file from PGN files.
+    Args:
+        paths: PGN files, each holding any number of games.
+        output: The book file to write.
+        plies: Positions after this many moves aren't stored.
+        search_depth: Search positions seen in at least min_games games to this
+            depth and store the score (0 to skip searching).
+        min_games: See search_depth.
+    Returns:
+        The number of games used and the number of positions written.
+    """
+    statistics = {}
+    games = 0
+    for path in paths:
+        for metadata, moves in read_pgn(path):
+            positions, final = replay(moves)
+            difference = game_result(metadata, final)
+            if difference is None:
+                continue
+            games += 1
+            outcome = 0 if difference > 0 else 1 if difference == 0 else 2
+            seen = set()
+            for black, white, color in positions[:plies + 1]:
+                key = position_key(black, white, color)
+                if key in seen:
+                    continue  # A transposition within the game only counts once
+                seen.add(key)
+                entry = statistics.get(key)
+                if entry is None:
+                    entry = statistics[key] = [0, 0, 0, black, white, color]
+                entry[outcome] += 1
+
+    scores = {}
+    if search_depth > 0:
+        from engine.engine import eval_tables
+        from engine.search import Search
+        from engine.tt import TranspositionTable
+        table = TranspositionTable(16)
+        for key, (black_wins, draws, white_wins, black, white, color) in statistics.items():
+            if black_wins + draws + white_wins < min_games or not find_legal_moves_bitboard(black, white, color):
+                continue
+            table.new_search()
+            result = Search(table, eval_tables).iterative_deepening(black, white, color, search_depth)
+            scores[key] = (result['score'] if color == 'b' else -result['score'], result['depth'])
+
+    with open(output, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, RECORD.size, len(statistics)))
+        for key in sorted(statistics):
+            black_wins, draws, white_wins = statistics[key][:3]
+            score, depth = scores.get(key, (NO_SCORE, 0))
+            f.write(RECORD.pack(key, black_wins, draws, white_wins, score, depth))
+    return games, len(statistics)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help='Build a book from PGN files')
+    build.add_argument('pgn', nargs='+')
+    build.add_argument('--output', default=BOOK_FILE)
+    build.add_argument('--plies', type=int, default=BOOK_PLIES)
+    build.add_argument('--search-depth', type=int, default=0)
+    build.add_argument('--min-games', type=int, default=MIN_GAMES)
+    show = subparsers.add_parser('show', help='List the book moves of a position')
+    show.add_argument('--book', default=BOOK_FILE)
+    show.add_argument('--fen')
+    show.add_argument('--color', default='b')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        games, positions = build_book(args.pgn, args.output, args.plies, args.search_depth, args.min_games)
+        print(f'Wrote {positions} positions from {games} games to {args.output}')
+        return
+
+    book = OpeningBook(args.book)
+    black, white = fen_to_bitboard(args.fen) if args.fen else (START_BLACK, START_WHITE)
+    print(f'{len(book)} positions in book')
+    for move, value, games, score in book.moves(black, white, args.color, 1):
+        score = '' if score is None else f' score={score:.2f}'
+        print(f'{move_to_notation(move)}: games={games} value={value[1]:.3f}{score}')
+
+
+if __name__ == '__main__':
+    main()
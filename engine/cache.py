@@ -0,0 +1,66 @@
+import threading
+from collections import OrderedDict
+
+from engine.settings import EVAL_CACHE_SIZE
+
+
+class EvalCache:
+    """
+    Bounded least-recently-used cache of leaf evaluations, keyed on the position hash.
+    It is separate from the transposition table, so an evaluation is reused
+    whatever bounds or depth the position was searched with. A lock keeps it
+    consistent when threads share it; worker processes each get their own.
+    """
+    def __init__(self, max_size:int=EVAL_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def get(self, key:int):
+        """
+        Return the cached evaluation for key, or None.
+        """
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key:int, value:float):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)  # Drop the least recently used entry
+
+    def resize(self, max_size:int):
+        with self.lock:
+            self.max_size = max_size
+            while len(self.entries) > max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.reset_stats()
@@ -0,0 +1,380 @@
+from time import time
+
+from othello.bitboard import FULL_MASK, find_legal_moves_bitboard, compute_flips
+from engine.search import SearchAbort
+from engine.tt import TranspositionTable, EXACT, LOWER, UPPER, NO_MOVE
+from engine.zobrist import zobrist_hash
+from engine.settings import TIME_CHECK_INTERVAL
+from engine.evaluation import stable_discs
+
+
+EXACT_MODE = 'exact'  # Solve for the final disc difference
+WLD_MODE = 'wld'      # Only solve for win, loss or draw
+
+FASTEST_FIRST_EMPTIES = 6  # Order moves and use the transposition table above this many empties
+ETC_EMPTIES = 9  # Probe the children in the transposition table before searching them from this many empties
+ENDGAME_TT_SIZE_MB = 8
+
+
+def create_neighbour_masks():
+    masks = []
+    for square in range(64):
+        x, y = square % 8, square // 8
+        mask = 0
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if (dx or dy) and 0 <= x + dx < 8 and 0 <= y + dy < 8:
+                    mask |= 1 << (x + dx + (y + dy) * 8)
+        masks.append(mask)
+    return masks
+
+# A move has to touch an opponent disc, which rules out most empty squares cheaply
+NEIGHBOURS = create_neighbour_masks()
+
+CORNERS = 0x8100000000000081
+
+# Quadrants used for parity ordering
+QUADRANTS = (0x0F0F0F0F, 0xF0F0F0F0, 0x0F0F0F0F00000000, 0xF0F0F0F000000000)
+QUADRANT_OF = [(square % 8 >= 4) + 2 * (square // 8 >= 4) for square in range(64)]
+
+# Static square priority used to break ties: corners first, squares next to corners last
+SQUARE_PRIORITY = [
+    9, 2, 8, 6, 6, 8, 2, 9,
+    2, 1, 3, 4, 4, 3, 1, 2,
+    8, 3, 7, 5, 5, 7, 3, 8,
+    6, 4, 5, 0, 0, 5, 4, 6,
+    6, 4, 5, 0, 0, 5, 4, 6,
+    8, 3, 7, 5, 5, 7, 3, 8,
+    2, 1, 3, 4, 4, 3, 1, 2,
+    9, 2, 8, 6, 6, 8, 2, 9,
+]
+
+
+class EndgameSolver:
+    """
+    Exact alpha-beta solver for positions with few empty squares.
+    Scores are final disc differences from the side to move's point of view,
+    with empty squares going to the winner. In WLD mode the search runs with a
+    (-1, 1) window, so only the sign of the score is exact.
+    Above FASTEST_FIRST_EMPTIES moves are sorted by the opponent's mobility and
+    results are kept in a transposition table; a node is cut off early when the
+    opponent's stable discs already cap the score, or (from ETC_EMPTIES) when a
+    child's table entry refutes the window. Below it the empty squares are
+    tried straight from a list ordered by parity (squares in regions with an odd
+    number of empties first), and the last three empties have dedicated functions.
+    In pure Python 12 empties take about 0.1s, 16 a few seconds and 20 several minutes.
+    """
+    def __init__(self, transposition_table=None, time_limit=None, check_interval=TIME_CHECK_INTERVAL):
+        """
+        Args:
+            transposition_table: The TranspositionTable to use (a separate one from
+                the heuristic search, since the scores mean something else).
+            time_limit: Absolute time (as returned by time()) at which to stop.
+            check_interval: Nodes searched between checks of the time limit.
+        """
+        if transposition_table is None:
+            transposition_table = TranspositionTable(ENDGAME_TT_SIZE_MB)
+        self.tt = transposition_table
+        self.time_limit = time_limit
+        self.check_interval = check_interval
+        self.check_countdown = check_interval
+        self.nodes = 0
+
+    def solve(self, black_bitboard, white_bitboard, color, mode=EXACT_MODE):
+        """
+        Solve a position.
+        Args:
+            black_bitboard: Black's bitboard.
+            white_bitboard: White's bitboard.
+            color: The color to move.
+            mode: EXACT_MODE or WLD_MODE.
+        Raises:
+            SearchAbort: If the time limit passes.
+        Returns:
+            The best move as a single-bit bitboard (0 for a pass or a finished
+            game) and the score from the side to move's point of view.
+        """
+        if color == 'b':
+            player, opponent = black_bitboard, white_bitboard
+        else:
+            player, opponent = white_bitboard, black_bitboard
+        alpha, beta = (-65, 65) if mode == EXACT_MODE else (-1, 1)
+        empties = ordered_empties(player, opponent)
+
+        legal_moves = find_legal_moves_bitboard(player, opponent, 'b')
+        if not legal_moves:
+            return 0, self.search(player, opponent, alpha, beta, empties)
+
+        best_move, best_score = 0, -65
+        for _, move, new_player, new_opponent in self.order_moves(player, opponent, legal_moves):
+            remaining = [square for square in empties if 1 << square != move]
+            if best_move == 0:
+                score = -self.search(new_opponent, new_player, -beta, -alpha, remaining)
+            else:
+                score = -self.search(new_opponent, new_player, -alpha - 1, -alpha, remaining)
+                if alpha < score < beta:
+                    score = -self.search(new_opponent, new_player, -beta, -alpha, remaining)
+            if best_move == 0 or score > best_score:
+                best_move, best_score = move, score
+                alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        return best_move, best_score
+
+    def search(self, player, opponent, alpha, beta, empties, passed=False):
+        n = len(empties)
+        if n <= FASTEST_FIRST_EMPTIES:
+            if n > 3:
+                return self.solve_small(player, opponent, alpha, beta, empties, passed)
+            if n == 3:
+                return self.solve_3(player, opponent, alpha, beta, *empties)
+            if n == 2:
+                return self.solve_2(player, opponent, alpha, beta, empties[0], empties[1])
+            if n == 1:
+                return solve_1(player, opponent, empties[0])
+            return final_difference(player, opponent)
+        self.nodes += 1
+        self.check_countdown -= 1
+        if not self.check_countdown:
+            self.check_countdown = self.check_interval
+            if self.time_limit is not None and time() > self.time_limit:
+                raise SearchAbort()
+
+        # Stability cutoff: the opponent keeps its stable discs, which caps the score
+        # (only worth computing when it has enough discs to cut)
+        if 2 * opponent.bit_count() >= 64 - alpha:
+            upper = 64 - 2 * stable_discs(opponent, player).bit_count()
+            if upper <= alpha:
+                return upper
+
+        key = zobrist_hash(player, opponent, 'b')
+        entry = self.tt.probe(key)
+        tt_move = NO_MOVE
+        if entry is not None:
+            tt_score, _, tt_bound, tt_move = entry
+            if tt_bound == EXACT:
+                return tt_score
+            if tt_bound == LOWER:
+                alpha = max(alpha, tt_score)
+            else:
+                beta = min(beta, tt_score)
+            if alpha >= beta:
+                return tt_score
+        original_alpha = alpha
+
+        best_move = 0
+        best_score = -65
+        legal_moves = find_legal_moves_bitboard(player, opponent, 'b')
+        children = self.order_moves(player, opponent, legal_moves, tt_move)
+        if n >= ETC_EMPTIES:
+            # Enhanced transposition cutoff: a child already known to refute the window ends the search
+            for _, move, new_player, new_opponent in children:
+                entry = self.tt.probe(zobrist_hash(new_opponent, new_player, 'b'))
+                if entry is not None and entry[2] != LOWER and -entry[0] >= beta:
+                    self.tt.store(key, n, -entry[0], LOWER, move.bit_length() - 1)
+                    return -entry[0]
+        for _, move, new_player, new_opponent in children:
+            remaining = [square for square in empties if 1 << square != move]
+            if best_move == 0:
+                score = -self.search(new_opponent, new_player, -beta, -alpha, remaining)
+            else:
+                score = -self.search(new_opponent, new_player, -alpha - 1, -alpha, remaining)
+                if alpha < score < beta:
+                    score = -self.search(new_opponent, new_player, -beta, -alpha, remaining)
+            if best_move == 0 or score > best_score:
+                best_move, best_score = move, score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_move == 0:
+            if passed:
+                return final_difference(player, opponent)
+            return -self.search(opponent, player, -beta, -alpha, empties, True)
+
+        if best_score <= original_alpha:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.tt.store(key, n, best_score, bound, best_move.bit_length() - 1)
+        return best_score
+
+    def order_moves(self, player, opponent, legal_moves, tt_move=NO_MOVE):
+        """
+        Make every legal move and sort the children: the transposition table move,
+        then fewest opponent replies (fastest-first), then odd parity regions and
+        the static square priority.
+        Returns:
+            A list of (ordering key, move, new player bitboard, new opponent bitboard).
+        """
+        empty = ~(player | opponent) & FULL_MASK
+        odd_quadrants = 0
+        for quadrant, mask in enumerate(QUADRANTS):
+            if (empty & mask).bit_count() & 1:
+                odd_quadrants |= 1 << quadrant
+        children = []
+        while legal_moves:
+            move = legal_moves & -legal_moves
+            legal_moves ^= move
+            square = move.bit_length() - 1
+            flips = compute_flips(move, player, opponent)
+            new_player = player | flips | move
+            new_opponent = opponent & ~flips
+            if square == tt_move:
+                key = 1 << 20
+            else:
+                key = SQUARE_PRIORITY[square]
+                if odd_quadrants >> QUADRANT_OF[square] & 1:
+                    key += 16
+                # Fastest-first: fewest replies, counting corner replies twice
+                replies = find_legal_moves_bitboard(new_opponent, new_player, 'b')
+                key -= (replies.bit_count() + (replies & CORNERS).bit_count()) << 5
+            children.append((key, move, new_player, new_opponent))
+        children.sort(key=lambda child: child[0], reverse=True)
+        return children
+
+    def solve_small(self, player, opponent, alpha, beta, empties, passed=False):
+        """
+        Plain alpha-beta for the last few empties: the squares are tried in the
+        parity order of the list, with no move generation, sorting or table lookups.
+        """
+        self.nodes += 1
+        best_score = -65
+        moved = False
+        for square in empties:
+            if not NEIGHBOURS[square] & opponent:
+                continue
+            move = 1 << square
+            flips = compute_flips(move, player, opponent)
+            if not flips:
+                continue
+            moved = True
+            remaining = [other for other in empties if other != square]
+            score = -self.search(opponent & ~flips, player | flips | move, -beta, -alpha, remaining)
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        return best_score
+        if moved:
+            return best_score
+        if passed:
+            return final_difference(player, opponent)
+        return -self.solve_small(opponent, player, -beta, -alpha, empties, True)
+
+    def solve_3(self, player, opponent, alpha, beta, first, second, third, passed=False):
+        """
+        Alpha-beta for the last three empties, calling solve_2 directly instead of
+        building the remaining list and going through search.
+        """
+        self.nodes += 1
+        best_score = -65
+        moved = False
+        for square, other, last in ((first, second, third), (second, first, third), (third, first, second)):
+            if not NEIGHBOURS[square] & opponent:
+                continue
+            move = 1 << square
+            flips = compute_flips(move, player, opponent)
+            if not flips:
+                continue
+            moved = True
+            score = -self.solve_2(opponent & ~flips, player | flips | move, -beta, -alpha, other, last)
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        return best_score
+        if moved:
+            return best_score
+        if passed:
+            return final_difference(player, opponent)
+        return -self.solve_3(opponent, player, -beta, -alpha, first, second, third, True)
+
+    def solve_2(self, player, opponent, alpha, beta, first, second):
+        self.nodes += 1
+        best_score = -65
+        moved = False
+        for square, last in ((first, second), (second, first)):
+            if not NEIGHBOURS[square] & opponent:
+                continue
+            move = 1 << square
+            flips = compute_flips(move, player, opponent)
+            if not flips:
+                continue
+            moved = True
+            score = -solve_1(opponent & ~flips, player | flips | move, last)
+            if score > best_score:
+                best_score = score
+                if score >= beta:
+                    return best_score
+        if moved:
+            return best_score
+
+        # Pass: the opponent plays both squares if it can
+        best_score = 65
+        moved = False
+        for square, last in ((first, second), (second, first)):
+            if not NEIGHBOURS[square] & player:
+                continue
+            move = 1 << square
+            flips = compute_flips(move, opponent, player)
+            if not flips:
+                continue
+            moved = True
+            score = solve_1(player & ~flips, opponent | flips | move, last)
+            best_score = min(best_score, score)
+            if best_score <= alpha:
+                return best_score
+        if moved:
+            return best_score
+        return final_difference(player, opponent)
+
+
+def solve_1(player, opponent, square):
+    """
+    Score the position with one empty square left.
+    """
+    move = 1 << square
+    difference = player.bit_count() - opponent.bit_count()
+    flips = compute_flips(move, player, opponent).bit_count()
+    if flips:
+        return difference + 2 * flips + 1
+    flips = compute_flips(move, opponent, player).bit_count()
+    if flips:
+        return difference - 2 * flips - 1
+    # Nobody can move: the empty square goes to the winner
+    if difference > 0:
+        return difference + 1
+    if difference < 0:
+        return difference - 1
+    return 0
+
+def final_difference(player, opponent):
+    """
+    Score a finished game, giving the empty squares to the winner.
+    """
+    difference = player.bit_count() - opponent.bit_count()
+    empty = 64 - (player | opponent).bit_count()
+    if difference > 0:
+        return difference + empty
+    if difference < 0:
+        return difference - empty
+    return 0
+
+def ordered_empties(player, opponent):
+    """
+    List the empty squares, odd parity regions first and then by static priority.
+    """
+    empty = ~(player | opponent) & FULL_MASK
+    squares = [square for square in range(64) if empty >> square & 1]
+    odd = [(empty & mask).bit_count() & 1 for mask in QUADRANTS]
+    squares.sort(key=lambda square: (odd[QUADRANT_OF[square]], SQUARE_PRIORITY[square]), reverse=True)
+    return squares
+
+def count_empties(black_bitboard, white_bitboard):
+    return 64 - (black_bitboard | white_bitboard).bit_count()
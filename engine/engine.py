@@ -1,255 +1,312 @@
 from time import time
 from othello.board import Board
+from othello.bitboard import (
+    FULL_MASK, board_to_bitboard, find_legal_moves_bitboard, make_move_bitboard, compute_flips, move_to_notation
+)
 from typing import Literal
-from concurrent.futures import ThreadPoolExecutor
-from engine.settings import WEIGHTS
-
-import threading
-
-
-transposition_lock = threading.Lock()
-
-def ai_move_iterative(board, color, max_depth, time_limit=5.0):
-    best_move = None
-    if time_limit is not None:
-        time_limit += time()
-    for depth in range(1, max_depth + 1):
-        best_move = ai_move(board, color, depth, {}, time_limit)
-        if time_limit is not None and time() > time_limit:
-            break
-    return best_move
-
-def ai_move(board: Board, color, depth=3, transposition_table={}, time_limit=None):
-    best_score = float('-inf')
-    best_move = None
-    black_bitboard, white_bitboard = board_to_bitboard(board.board)
-    legal_moves = find_legal_moves_bitboard(black_bitboard, white_bitboard, color)
+from engine.settings import WEIGHTS, TT_SIZE_MB, ENDGAME_EMPTIES, EVAL_CACHE_SIZE, DEFAULT_EVALUATOR
+from engine.tt import TranspositionTable, EXACT, LOWER, UPPER, NO_MOVE
+from engine.zobrist import zobrist_hash
+from engine.search import Search, SearchAbort
+from engine.cache import EvalCache
+from engine.stats import InstrumentedSearch, SearchStats
+from engine.time_manager import TimeManager
+from engine.evaluation import evaluate as eval_tables
+from engine.book import open_book, BOOK_FILE
+from engine.endgame import EndgameSolver, EXACT_MODE, WLD_MODE, count_empties
+
+
+EVALUATORS = ('classic', 'table', 'pattern')
+# Evaluators that score a position and its rotations and mirror images the
+# same, so table and cache entries can be keyed on the canonical position
+# (tests/test_symmetry.py checks every one listed here)
+SYMMETRIC_EVALUATORS = ('table', 'pattern')
+
+
+def get_evaluator(name:str=DEFAULT_EVALUATOR):
+    """
+    Return the evaluation function called name:
+    'classic' (eval_bitboard), 'table' (engine.evaluation) or 'pattern' (engine.patterns).
+    Raises:
+        ValueError: If there is no evaluator called name.
+        ImportError: For 'pattern' without NumPy installed.
+        OSError: For 'pattern' if the weights file can't be read.
+    """
+    if name == 'classic':
+        return eval_bitboard
+    if name == 'table':
+        return eval_tables
+    if name == 'pattern':
+        # NumPy is only needed for this evaluator
+        from engine.patterns import load_default_evaluator
+        return load_default_evaluator()
+    raise ValueError(f'Unknown evaluator {name}, expected one of {", ".join(EVALUATORS)}')
+
+def ai_move_iterative(board, color, max_depth, time_limit=5.0, hash_size=TT_SIZE_MB, workers=1,
+                      endgame_empties=ENDGAME_EMPTIES, endgame_mode=EXACT_MODE, eval_cache_size=EVAL_CACHE_SIZE,
+                      evaluator=DEFAULT_EVALUATOR, symmetry=False, book=BOOK_FILE, stats=False, clock=None):
+    """
+    Play from the opening book at book (None to skip it) if the position is in
+    it, else search the position with iterative deepening, or solve it exactly
+    when at most endgame_empties squares are empty. The solver gets part of the
+    time limit (see engine.time_manager.ENDGAME_SHARE) and the search takes over
+    with the rest if it can't finish.
+    Leaf evaluations use the evaluator named evaluator (see get_evaluator) and
+    are memoized in an LRU cache of eval_cache_size entries (0 disables it);
+    with several workers each process keeps its own cache. With symmetry the
+    table and cache are keyed on the canonical form of each position; it is
+    ignored for evaluators outside SYMMETRIC_EVALUATORS. With
+    stats the search is instrumented (see engine.stats) and the report gets
+    a SearchStats object under 'stats'; book moves and solved endgames have none.
+    time_limit is a hard limit in seconds (None for none): the iteration in
+    progress when it passes is discarded. With clock, a (remaining, increment)
+    pair of seconds on the side to move's game clock, time_limit is ignored and
+    soft and hard limits are budgeted from the clock and the empty squares
+    (see engine.time_manager). Every call starts with empty tables and caches;
+    engine.session.Engine keeps them from one move to the next.
+    Returns:
+        The best move of the deepest completed iteration in notation, its score
+        from black's point of view, and a dict with the depth reached, the
+        principal variation, the result and timing of every iteration and the
+        evaluation cache statistics.
+    """
+    if book is not None:
+        result = book_move(board, color, book)
+        if result is not None:
+            return result
+
+    evaluate = get_evaluator(evaluator)
+    symmetry = symmetry and evaluator in SYMMETRIC_EVALUATORS
+    time_manager = plan_time(board, time_limit, clock, endgame_empties)
+    if count_empties(board.black, board.white) <= endgame_empties:
+        result = solve_endgame(board, color, endgame_mode, time_manager.endgame_deadline())
+        if result is not None:
+            return result
+        # The solver ran out of its share of the time; the search gets the rest
+        time_manager = time_manager.remainder()
+
+    if workers > 1:
+        # Imported here because the parallel search builds on this module
+        from engine.parallel import lazy_smp_search
+        return lazy_smp_search(board.black, board.white, color, max_depth, workers, hash_size,
+                               time_manager.remaining(), eval_cache_size, evaluator, symmetry, stats,
+                               time_manager.soft_remaining())
+
+    eval_cache = EvalCache(eval_cache_size) if eval_cache_size > 0 else None
+    return search_position(board, color, max_depth, TranspositionTable(hash_size), evaluate, time_manager, eval_cache,
+                           symmetry, stats)
+
+def plan_time(board: Board, time_limit=None, clock=None, endgame_empties=ENDGAME_EMPTIES) -> TimeManager:
+    """
+    Set the limits of a move: a hard limit of time_limit seconds, or soft and
+    hard limits budgeted from a (remaining, increment) clock when there is one.
+    """
+    if clock is not None:
+        return TimeManager.for_clock(*clock, count_empties(board.black, board.white), endgame_empties)
+    return TimeManager(hard_limit=time_limit)
 
-    # Function to evaluate a single move
-    def evaluate_move(move):
-        new_black_bitboard, new_white_bitboard = make_move_bitboard(black_bitboard, white_bitboard, color, move)
-        score = minimax_ab_bitboard_tt(
-            new_black_bitboard, new_white_bitboard,
-            depth-1, float('-inf'), float('inf'),
-            False, opponent_color(color),
-            transposition_table, time_limit
-        )
-        return move, score
-
-    # Multithreaded evaluation
-    with ThreadPoolExecutor() as executor:
-        futures = []
-        while legal_moves:
-            move = legal_moves & -legal_moves  # Isolate the least significant bit (a single move)
-            legal_moves &= legal_moves - 1  # Remove the LSB from the bitboard
-            futures.append(executor.submit(evaluate_move, move))
-
-        # Process results as threads complete
-        for future in futures:
-            if time_limit is not None and time() > time_limit:
-                break
-            move, score = future.result()
-            if score > best_score:
-                best_score = score
-                best_move = move
+def search_position(board: Board, color, max_depth, transposition_table, evaluate, time_manager=None, eval_cache=None,
+                    symmetry=False, stats=False):
+    """
+    Run one iterative deepening search in this process, starting a new
+    generation of the transposition table.
+    Returns:
+        The move in notation, its score from black's point of view and the
+        search report, as ai_move_iterative does.
+    """
+    if time_manager is None:
+        time_manager = TimeManager()
+    transposition_table.new_search()
+    if eval_cache is not None:
+        eval_cache.reset_stats()
+    # Evaluators with a batch method score the children of depth 1 nodes together
+    search = (InstrumentedSearch if stats else Search)(
+        transposition_table, evaluate, time_manager.hard_deadline, eval_cache, getattr(evaluate, 'evaluate_batch', None),
+        symmetry, time_manager.soft_deadline
+    )
+    result = search.iterative_deepening(board.black, board.white, color, max_depth)
+    report = search_report(result, color)
+    if eval_cache is not None:
+        report['eval_cache'] = eval_cache.stats()
+    if stats:
+        report['stats'] = search.stats
+    return move_to_notation(result['move']), black_score(result['score'], color), report
+
+def ai_move(board: Board, color, depth=3, transposition_table=None, time_limit=None,
+            endgame_empties=ENDGAME_EMPTIES, endgame_mode=EXACT_MODE, eval_cache=None, evaluator=DEFAULT_EVALUATOR,
+            symmetry=False, book=BOOK_FILE, stats:SearchStats=None):
+    # A stats object, when given, is filled in by the search (see engine.stats)
+    if book is not None:
+        result = book_move(board, color, book)
+        if result is not None:
+            return result[:2]
+    if count_empties(board.black, board.white) <= endgame_empties:
+        result = solve_endgame(board, color, endgame_mode, time_limit)
+        if result is not None:
+            return result[:2]
+    if transposition_table is None:
+        transposition_table = TranspositionTable(TT_SIZE_MB)
+    evaluate = get_evaluator(evaluator)
+    if stats is None:
+        search = Search(transposition_table, evaluate, time_limit, eval_cache, getattr(evaluate, 'evaluate_batch', None),
+                        symmetry)
+    else:
+        search = InstrumentedSearch(transposition_table, evaluate, time_limit, eval_cache,
+                                    getattr(evaluate, 'evaluate_batch', None), symmetry, stats=stats)
+    result = search.iterative_deepening(board.black, board.white, color, depth)
+    return move_to_notation(result['move']), black_score(result['score'], color)
 
-    return move_to_notation(best_move), best_score
+def book_move(board: Board, color, path=BOOK_FILE):
+    """
+    Look the position up in the opening book.
+    Returns:
+        The best book move in notation, its search score from black's point of
+        view (None if the book has no score for it) and a report with the
+        number of games and the move's value, or None if the position isn't in
+        the book or there is no book at path.
+    """
+    book = open_book(path)
+    if book is None:
+        return None
+    entry = book.best_move(board.black, board.white, color)
+    if entry is None:
+        return None
+    move, value, games, score = entry
+    notation = move_to_notation(move)
+    report = {
+        'depth': 0,
+        'pv': [notation],
+        'book': {'games': games, 'value': value[1], 'scored': value[0] == 1},
+        'iterations': [],
+    }
+    return notation, None if score is None else black_score(score, color), report
+
+def solve_endgame(board: Board, color, mode=EXACT_MODE, time_limit=None):
+    """
+    Solve the position exactly.
+    Args:
+        board: The board to solve.
+        color: The color to move.
+        mode: EXACT_MODE for the final disc difference, WLD_MODE for win/loss/draw only.
+        time_limit: Absolute time (as returned by time()) at which to give up.
+    Returns:
+        The best move in notation, the final disc difference from black's point of
+        view (only its sign in WLD mode) and a search report, or None if the time
+        limit passed first.
+    """
+    start_time = time()
+    solver = EndgameSolver(time_limit=time_limit)
+    try:
+        move, score = solver.solve(board.black, board.white, color, mode)
+    except SearchAbort:
+        return None
+    empties = count_empties(board.black, board.white)
+    notation = move_to_notation(move)
+    score = black_score(score, color)
+    report = {
+        'depth': empties,
+        'pv': [notation],
+        'endgame': mode,
+        'iterations': [{'depth': empties, 'move': notation, 'score': score, 'nodes': solver.nodes, 'time': time() - start_time}],
+    }
+    return notation, score, report
+
+def black_score(score, color):
+    # Search scores are from the side to move; results are reported from black's point of view
+    return score if color == 'b' else -score
+
+def search_report(result, color):
+    """
+    Convert an iterative deepening result to notation and black's point of view.
+    """
+    return {
+        'depth': result['depth'],
+        'pv': [move_to_notation(move) for move in result['pv']],
+        'iterations': [
+            {
+                'depth': iteration['depth'],
+                'move': move_to_notation(iteration['move']),
+                'score': black_score(iteration['score'], color),
+                'nodes': iteration['nodes'],
+                'time': iteration['time'],
+            }
+            for iteration in result['iterations']
+        ],
+    }
 
 def minimax_ab_bitboard_tt(black_bitboard, white_bitboard, depth, alpha, beta, maximizing_player, color, transposition_table, time_limit=None):
+    # Raises SearchAbort when time_limit passes: a static evaluation is no substitute for the subtree's result
     # Transposition Table
-    board_hash = hash_bitboards(black_bitboard, white_bitboard)
-    if board_hash in transposition_table:
-        return get_from_tt(board_hash, transposition_table)
-    
-    if depth == 0 or game_over(black_bitboard, white_bitboard) or (time_limit is not None and time() > time_limit):
+    board_hash = zobrist_hash(black_bitboard, white_bitboard, color)
+    entry = transposition_table.probe(board_hash)
+    tt_move = NO_MOVE
+    if entry is not None:
+        tt_score, tt_depth, tt_bound, tt_move = entry
+        if tt_depth >= depth:
+            if tt_bound == EXACT:
+                return tt_score
+            if tt_bound == LOWER:
+                alpha = max(alpha, tt_score)
+            else:
+                beta = min(beta, tt_score)
+            if beta <= alpha:
+                return tt_score
+    original_alpha, original_beta = alpha, beta
+
+    if time_limit is not None and time() > time_limit:
+        raise SearchAbort()
+    if depth == 0 or game_over(black_bitboard, white_bitboard):
         return eval_bitboard(black_bitboard, white_bitboard)
     
     legal_moves = find_legal_moves_bitboard(black_bitboard, white_bitboard, color)
+    if legal_moves == 0:# Pass to other player
+        return minimax_ab_bitboard_tt(black_bitboard, white_bitboard, depth-1, alpha, beta, not maximizing_player, opponent_color(color), transposition_table, time_limit)
+
+    # Try the stored best move first
+    if tt_move != NO_MOVE and legal_moves >> tt_move & 1:
+        move = 1 << tt_move
+    else:
+        move = legal_moves & -legal_moves
+    best_move = move
     if maximizing_player:
-        if legal_moves == 0:# Pass to other player
-            score = minimax_ab_bitboard_tt(black_bitboard, white_bitboard, depth-1, alpha, beta, False, opponent_color(color), transposition_table, time_limit)
-            alpha = max(alpha, score)
-            return score
-        max_score = float('-inf')
-        while legal_moves:
-            move = legal_moves & - legal_moves
-            legal_moves &= legal_moves - 1
+        best_score = float('-inf')
+        while move:
+            legal_moves ^= move
             new_black_bitboard, new_white_bitboard = make_move_bitboard(black_bitboard, white_bitboard, color, move)
             score = minimax_ab_bitboard_tt(new_black_bitboard, new_white_bitboard, depth-1, alpha, beta, False, opponent_color(color), transposition_table, time_limit)
-            max_score = max(max_score, score)
+            if score > best_score:
+                best_score = score
+                best_move = move
             alpha = max(alpha, score)
             if beta <= alpha:
                 break
-        store_in_tt(board_hash, max_score, transposition_table)
-        return max_score
+            move = legal_moves & -legal_moves
     else:
-        if legal_moves == 0:# Pass to other player
-            score = minimax_ab_bitboard_tt(black_bitboard, white_bitboard, depth-1, alpha, beta, True, opponent_color(color), transposition_table, time_limit)
-            beta = min(beta, score)
-            return score
-        min_score = float('inf')
-        while legal_moves:
-            move = legal_moves & - legal_moves
-            legal_moves &= legal_moves - 1
+        best_score = float('inf')
+        while move:
+            legal_moves ^= move
             new_black_bitboard, new_white_bitboard = make_move_bitboard(black_bitboard, white_bitboard, color, move)
             score = minimax_ab_bitboard_tt(new_black_bitboard, new_white_bitboard, depth-1, alpha, beta, True, opponent_color(color), transposition_table, time_limit)
-            min_score = min(min_score, score)
+            if score < best_score:
+                best_score = score
+                best_move = move
             beta = min(beta, score)
             if beta <= alpha:
                 break
-        store_in_tt(board_hash, min_score, transposition_table)
-        return min_score
-    
-def get_from_tt(board_hash, transposition_table):
-    with transposition_lock:
-        return transposition_table.get(board_hash)
-
-def store_in_tt(board_hash, value, transposition_table):
-    with transposition_lock:
-        transposition_table[board_hash] = value
+            move = legal_moves & -legal_moves
 
-def hash_bitboards(board1, board2):
-    prime = 0x9e3779b97f4a7c15  # A large 64-bit prime number
-    hash_value = board1 + prime
-    hash_value ^= board2 * prime
-    return hash_value
+    if best_score <= original_alpha:
+        bound = UPPER
+    elif best_score >= original_beta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    transposition_table.store(board_hash, depth, best_score, bound, best_move.bit_length() - 1)
+    return best_score
 
 def opponent_color(color):
     return 'w' if color == 'b' else 'b'
 
-def board_to_bitboard(board):
-    black = 0
-    white = 0
-    
-    for x in range(8):
-        for y in range(8):
-            bit_index = x + y * 8  # No need to reverse the coordinates
-            if board[x][y] == 'b':
-                black |= 1 << bit_index  # Set bit for black
-            elif board[x][y] == 'w':
-                white |= 1 << bit_index  # Set bit for white
-    
-    return black, white
-
-def find_legal_moves_bitboard(black_bitboard, white_bitboard, color):
-    if color == 'b':
-        player = black_bitboard
-        opponent = white_bitboard
-    else:
-        player = white_bitboard
-        opponent = black_bitboard
-    legal_moves_bitboard = 0  # Start with an empty bitboard
-    
-    directions = [-1, 1, -8, 8, -7, 7, -9, 9]
-    
-    for i in range(64):  # Iterate over all 64 squares
-        if (player | opponent) & (1 << i):  # Skip occupied squares
-            continue
-        
-        for direction in directions:
-            flip = False
-            pos = i + direction
-            
-            # Check boundaries for left-right moves and row wrapping
-            jumping = False
-            while 0 <= pos < 64:
-                if direction == -1 and pos % 8 == 7:  # If we're at the rightmost column
-                    break
-                if direction == 1 and pos % 8 == 0:   # If we're at the leftmost column
-                    break
-
-                if direction == -7 and pos % 8 == 0:
-                    break
-                if direction == 7 and pos % 8 == 7:
-                    break
-
-                if direction == -9 and pos % 8 == 7:
-                    break
-                if direction == 9 and pos % 8 == 0:
-                    break
-
-                # If we encounter the opponent's piece, continue checking
-                if (opponent >> pos) & 1:
-                    pos += direction
-                    jumping = True
-                # If we encounter the player's own piece, it's a valid move in this direction
-                elif (player >> pos) & 1:
-                    if jumping:
-                        flip = True
-                    break
-                else:  # An empty square or boundary, break out
-                    break
-            
-            if flip:
-                legal_moves_bitboard |= (1 << i)  # Mark this square as a legal move
-
-    return legal_moves_bitboard
-
-def shift_board(bitboard, shift):
-    """
-    Shifts the bitboard in the specified direction while avoiding illegal board wrapping.
-    Args:
-        bitboard: The current player's bitboard.
-        shift: The direction and distance to shift (positive or negative).
-    Returns:
-        The shifted bitboard.
-    """
-    if shift > 0:  # Shifting downwards or rightwards
-        if shift % 8 == 0:  # Vertical shift (up/down)
-            return bitboard >> shift
-        elif shift == 1:  # Right shift
-            return (bitboard >> shift) & 0x7F7F7F7F7F7F7F7F  # Mask to avoid wrapping
-        elif shift == -1:  # Left shift
-            return (bitboard << -shift) & 0xFEFEFEFEFEFEFEFE  # Mask to avoid wrapping
-    else:  # Shifting upwards or leftwards
-        shift = -shift
-        if shift % 8 == 0:  # Vertical shift (up/down)
-            return bitboard << shift
-        elif shift == 1:  # Left shift
-            return (bitboard << shift) & 0xFEFEFEFEFEFEFEFE  # Mask to avoid wrapping
-        elif shift == -1:  # Right shift
-            return (bitboard >> -shift) & 0x7F7F7F7F7F7F7F7F  # Mask to avoid wrapping
-    return 0  # Return 0 if no valid shift is applied
-
-def make_move_bitboard(black, white, color, move):
-    if color == 'b':
-        player = black
-        opponent = white
-    else:
-        player = white
-        opponent = black
-    # Directions: [±1, ±8, ±7, ±9] (left, right, up, down, diagonals)
-    DIRECTIONS = [-1, 1, -8, 8, -7, -9, 7, 9]
-    flips = 0
-
-    # Compute flips for all directions
-    for direction in DIRECTIONS:
-        flips |= compute_flips(move, player, opponent, direction)
-
-    # Update bitboards
-    player |= flips | move  # Add flipped pieces and the move to the player
-    opponent &= ~flips      # Remove flipped pieces from the opponent
-
-    if color == 'b':
-        return player, opponent
-    else:
-        return opponent, player
-
-def compute_flips(move, player, opponent, direction):
-    """
-    Compute the pieces flipped in a specific direction.
-    """
-    mask = 0
-    potential = shift_board(move, direction) & opponent  # Check the first step
-    while potential:
-        mask |= potential  # Accumulate potential flips
-        potential = shift_board(potential, direction) & opponent
-    # Check if flips are valid (bracketed by a player piece)
-    if shift_board(mask, direction) & player:
-        return mask
-    return 0
-
-
 def eval_bitboard(black_bitboard:int, white_bitboard:int):
     # Each heuristic value scales from -100 to 100
     # Individual values are weighted at the end of the evaluation
@@ -351,24 +408,6 @@ def game_over(black_bitboard, white_bitboard):
         return False
     return True
 
-def move_to_notation(move:int):
-    """
-    Convert a single-bit bitboard move to Othello notation (e.g., A1, H8).
-    Args:
-        move: A single-bit bitboard representing the move.
-    Returns:
-        A string in Othello notation (e.g., "E3").
-    """
-    if move == 0:
-        return "Pass"  # If no move is made
-
-    index = move.bit_length() - 1  # Get the index of the single '1' bit
-    row = index // 8               # Calculate 0-indexed row
-    col = index % 8                # Calculate 0-indexed column
-
-    # Convert to Othello notation
-    return f"{chr(col + ord('A'))}{row + 1}"
-
 def create_unstable_bitmap(black_bitmap, white_bitmap, color:Literal['b', 'w'], legal_moves) -> int:
     unstable_bitmap = (1 << 64) - 1
     while legal_moves:
@@ -0,0 +1,271 @@
+from othello.bitboard import find_legal_moves_bitboard
+from engine.settings import WEIGHTS, CORNER_CLOSENESS_WEIGHTS
+
+
+HEATMAP = (
+    120, -20,  20,  10,  10,  20, -20, 120,
+    -20, -40,  -5,  -5,  -5,  -5, -40, -20,
+    20,  -5,  15,   3,   3,  15,  -5,  20,
+    10,  -5,   3,   3,   3,   3,  -5,  10,
+    10,  -5,   3,   3,   3,   3,  -5,  10,
+    20,  -5,  15,   3,   3,  15,  -5,  20,
+    -20, -40,  -5,  -5,  -5,  -5, -40, -20,
+    120, -20,  20,  10,  10,  20, -20, 120,
+)
+
+CORNERS = 0x8100000000000081  # a1, h1, a8, h8
+CENTRAL = 0x007E7E7E7E7E7E00  # Every square off the edges
+FILE_A = 0x0101010101010101
+COLUMN_MAGIC = 0x0102040810204080  # Gathers file A into the top byte, a1 in bit 0
+
+
+def create_heatmap_tables(heatmap=HEATMAP):
+    """
+    Fold a heatmap into one table per row, mapping the row's byte to the summed weights of its set squares.
+    """
+    tables = []
+    for row in range(8):
+        table = [0] * 256
+        for value in range(1, 256):
+            low = value & -value
+            table[value] = table[value ^ low] + heatmap[row * 8 + low.bit_length() - 1]
+        tables.append(tuple(table))
+    return tuple(tables)
+
+def create_corner_closeness_table():
+    """
+    Map the 4-bit set of empty corners (a1, h1, a8, h8) to the X and C squares
+    next to them. Occupying one of those squares hands the corner to the opponent.
+    """
+    regions = (
+        (1 << 1) | (1 << 8) | (1 << 9),       # a1: b1, a2, b2
+        (1 << 6) | (1 << 15) | (1 << 14),     # h1: g1, h2, g2
+        (1 << 57) | (1 << 48) | (1 << 49),    # a8: b8, a7, b7
+        (1 << 62) | (1 << 55) | (1 << 54),    # h8: g8, h7, g7
+    )
+    table = []
+    for empty_corners in range(16):
+        mask = 0
+        for corner in range(4):
+            if empty_corners >> corner & 1:
+                mask |= regions[corner]
+        table.append(mask)
+    return tuple(table)
+
+def edge_flips(move, player, opponent):
+    """
+    Return the discs flipped along an 8-square line when player places a disc at bit move.
+    """
+    flips = 0
+    for step in (1, -1):
+        run = 0
+        square = move
+        while True:
+            square = square << 1 if step > 0 else square >> 1
+            if not square & 255:
+                break
+            if square & opponent:
+                run |= square
+            elif square & player:
+                flips |= run
+                break
+            else:
+                break
+    return flips
+
+def create_edge_stability_table():
+    """
+    Solve every edge configuration for the discs that can never be flipped by
+    moves along the edge. Any empty square can be taken by either color (a move
+    may flip elsewhere on the board without flipping on the edge), so a disc is
+    stable when it survives every sequence of edge moves.
+    Returns:
+        A list indexed by player_byte << 8 | opponent_byte with the stable player discs.
+    """
+    table = [0] * 65536
+    memo = {}
+
+    def stable(player, opponent):
+        key = player << 8 | opponent
+        if key in memo:
+            return memo[key]
+        result = player
+        empty = ~(player | opponent) & 255
+        while empty and result:
+            move = empty & -empty
+            empty ^= move
+            # Player takes the square: its flipped discs are still its own
+            flips = edge_flips(move, player, opponent)
+            result &= stable(player | flips | move, opponent & ~flips)
+            # Opponent takes the square: the discs it flips are lost
+            flips = edge_flips(move, opponent, player)
+            result &= stable(player & ~flips, opponent | flips | move) & ~flips
+        memo[key] = result
+        return result
+
+    for value in range(6561):
+        player = opponent = 0
+        for square in range(8):
+            value, state = divmod(value, 3)
+            if state == 1:
+                player |= 1 << square
+            elif state == 2:
+                opponent |= 1 << square
+        table[player << 8 | opponent] = stable(player, opponent)
+    return table
+
+def create_column_table():
+    """
+    Map a gathered file A byte (as produced by COLUMN_MAGIC) back to the file A bitboard.
+    """
+    table = [0] * 256
+    for value in range(256):
+        column = 0
+        for square in range(8):
+            if value >> square & 1:
+                column |= 1 << (8 * square)
+        table[value] = column
+    return table
+
+HEATMAP_TABLES = create_heatmap_tables()
+ABSOLUTE_HEATMAP_TABLES = create_heatmap_tables([abs(weight) for weight in HEATMAP])
+CORNER_CLOSENESS = create_corner_closeness_table()
+EDGE_STABILITY = create_edge_stability_table()
+COLUMN_BITS = create_column_table()
+_H0, _H1, _H2, _H3, _H4, _H5, _H6, _H7 = HEATMAP_TABLES
+_A0, _A1, _A2, _A3, _A4, _A5, _A6, _A7 = ABSOLUTE_HEATMAP_TABLES
+
+
+def heatmap_score(bitboard:int) -> int:
+    return (_H0[bitboard & 255] + _H1[bitboard >> 8 & 255] + _H2[bitboard >> 16 & 255] + _H3[bitboard >> 24 & 255]
+            + _H4[bitboard >> 32 & 255] + _H5[bitboard >> 40 & 255] + _H6[bitboard >> 48 & 255] + _H7[bitboard >> 56])
+
+def absolute_heatmap_score(bitboard:int) -> int:
+    return (_A0[bitboard & 255] + _A1[bitboard >> 8 & 255] + _A2[bitboard >> 16 & 255] + _A3[bitboard >> 24 & 255]
+            + _A4[bitboard >> 32 & 255] + _A5[bitboard >> 40 & 255] + _A6[bitboard >> 48 & 255] + _A7[bitboard >> 56])
+
+def edge_stable_discs(player:int, opponent:int) -> int:
+    """
+    Return the player's discs on the four edges that can never be flipped.
+    """
+    stable = EDGE_STABILITY[(player & 255) << 8 | opponent & 255]
+    stable |= EDGE_STABILITY[(player >> 56) << 8 | opponent >> 56] << 56
+    column_player = ((player & FILE_A) * COLUMN_MAGIC >> 56) & 255
+    column_opponent = ((opponent & FILE_A) * COLUMN_MAGIC >> 56) & 255
+    stable |= COLUMN_BITS[EDGE_STABILITY[column_player << 8 | column_opponent]]
+    column_player = ((player >> 7 & FILE_A) * COLUMN_MAGIC >> 56) & 255
+    column_opponent = ((opponent >> 7 & FILE_A) * COLUMN_MAGIC >> 56) & 255
+    stable |= COLUMN_BITS[EDGE_STABILITY[column_player << 8 | column_opponent]] << 7
+    return stable
+
+def full_lines(occupied:int):
+    """
+    Find the squares whose horizontal, vertical and two diagonal lines are completely filled.
+    Returns:
+        Four bitboards: horizontal, vertical, a1-h8 diagonal and h1-a8 diagonal.
+    """
+    horizontal = 0
+    columns = 255
+    for row in range(0, 64, 8):
+        value = occupied >> row & 255
+        columns &= value
+        if value == 255:
+            horizontal |= 255 << row
+    vertical = columns * FILE_A
+
+    # Fill towards both ends of each diagonal; the edges stop the fill
+    up = occupied & ((occupied >> 9 & 0x007F7F7F7F7F7F7F) | 0xFF80808080808080)
+    down = occupied & ((occupied << 9 & 0xFEFEFEFEFEFEFE00) | 0x01010101010101FF)
+    up &= (up >> 18 & 0x00003F3F3F3F3F3F) | 0xFFFFC0C0C0C0C0C0
+    down &= (down << 18 & 0xFCFCFCFCFCFC0000) | 0x030303030303FFFF
+    up &= (up >> 36 & 0x000000000F0F0F0F) | 0xFFFFFFFFF0F0F0F0
+    down &= (down << 36 & 0xF0F0F0F000000000) | 0x0F0F0F0FFFFFFFFF
+    diagonal = up & down
+
+    up = occupied & ((occupied >> 7 & 0x00FEFEFEFEFEFEFE) | 0xFF01010101010101)
+    down = occupied & ((occupied << 7 & 0x7F7F7F7F7F7F7F00) | 0x80808080808080FF)
+    up &= (up >> 14 & 0x0000FCFCFCFCFCFC) | 0xFFFF030303030303
+    down &= (down << 14 & 0x3F3F3F3F3F3F0000) | 0xC0C0C0C0C0C0FFFF
+    up &= (up >> 28 & 0x00000000F0F0F0F0) | 0xFFFFFFFF0F0F0F0F
+    down &= (down << 28 & 0x0F0F0F0F00000000) | 0xF0F0F0F0FFFFFFFF
+    anti_diagonal = up & down
+    return horizontal, vertical, diagonal, anti_diagonal
+
+def stable_discs(player:int, opponent:int, lines=None) -> int:
+    """
+    Find discs that can never be flipped. Edge discs come from the edge table;
+    an inner disc is stable when on each of its four lines the line is full or
+    it touches one of the player's stable discs, repeated until nothing changes.
+    Args:
+        player: The player's bitboard.
+        opponent: The opponent's bitboard.
+        lines: The result of full_lines, if already known.
+    """
+    if lines is None:
+        lines = full_lines(player | opponent)
+    horizontal, vertical, diagonal, anti_diagonal = lines
+    central = player & CENTRAL
+    stable = edge_stable_discs(player, opponent) | (central & horizontal & vertical & diagonal & anti_diagonal)
+    while True:
+        new_stable = stable | (
+            central
+            & ((stable >> 1) | (stable << 1) | horizontal)
+            & ((stable >> 8) | (stable << 8) | vertical)
+            & ((stable >> 9) | (stable << 9) | diagonal)
+            & ((stable >> 7) | (stable << 7) | anti_diagonal)
+        )
+        if new_stable == stable:
+            return stable
+        stable = new_stable
+
+def evaluate(black_bitboard:int, white_bitboard:int) -> float:
+    """
+    Table-driven static evaluation from black's point of view.
+    It uses the terms and phase weights of eval_bitboard (disc parity, mobility,
+    corners, stability and the square heatmap), plus corner closeness: discs
+    on X and C squares next to an empty corner. Each term is a difference over
+    a total that bounds it, so it scales from -100 to 100 before its weight and
+    the evaluation stays within 100 times the sum of the phase's weights (about 300).
+    """
+    black_discs = black_bitboard.bit_count()
+    white_discs = white_bitboard.bit_count()
+    total_discs = black_discs + white_discs
+    if total_discs < 20:
+        game_phase = 'opening'
+    elif total_discs < 40:
+        game_phase = 'middlegame'
+    else:
+        game_phase = 'endgame'
+    weights = WEIGHTS[game_phase]
+
+    evaluation = 100 * (black_discs - white_discs) / total_discs * weights['coin_parity']
+
+    black_moves = find_legal_moves_bitboard(black_bitboard, white_bitboard, 'b').bit_count()
+    white_moves = find_legal_moves_bitboard(black_bitboard, white_bitboard, 'w').bit_count()
+    if black_moves + white_moves:
+        evaluation += 100 * (black_moves - white_moves) / (black_moves + white_moves) * weights['mobility']
+
+    black_corners = (black_bitboard & CORNERS).bit_count()
+    white_corners = (white_bitboard & CORNERS).bit_count()
+    if black_corners + white_corners:
+        evaluation += 100 * (black_corners - white_corners) / (black_corners + white_corners) * weights['corners']
+
+    occupied = black_bitboard | white_bitboard
+    lines = full_lines(occupied)
+    black_stable = stable_discs(black_bitboard, white_bitboard, lines).bit_count()
+    white_stable = stable_discs(white_bitboard, black_bitboard, lines).bit_count()
+    if black_stable + white_stable:
+        evaluation += 100 * (black_stable - white_stable) / (black_stable + white_stable) * weights['stability']
+
+    # Square weights can be negative, so they are scaled by the absolute weights of every occupied square
+    total_weights = absolute_heatmap_score(occupied)
+    if total_weights:
+        evaluation += 100 * (heatmap_score(black_bitboard) - heatmap_score(white_bitboard)) / total_weights * weights['weights']
+
+    empty_corners = ~occupied & CORNERS
+    region = CORNER_CLOSENESS[(empty_corners & 1) | (empty_corners >> 6 & 2) | (empty_corners >> 54 & 4) | (empty_corners >> 60 & 8)]
+    black_close = (black_bitboard & region).bit_count()
+    white_close = (white_bitboard & region).bit_count()
+    if black_close + white_close:
+        evaluation -= 100 * (black_close - white_close) / (black_close + white_close) * CORNER_CLOSENESS_WEIGHTS[game_phase]
+    return evaluation
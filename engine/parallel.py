@@ -0,0 +1,196 @@
+from time import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, resource_tracker
+
+from othello.bitboard import move_to_notation
+from engine.engine import get_evaluator, black_score
+from engine.search import Search
+from engine.stats import InstrumentedSearch, combine
+from engine.tt import TranspositionTable, table_entries, ENTRY_SIZE
+from engine.cache import EvalCache
+from engine.settings import EVAL_CACHE_SIZE, DEFAULT_EVALUATOR
+
+
+STOP_FLAG_SIZE = 8  # A stop flag byte and the table generation byte, padded to keep the table aligned
+
+# Per-process state set up by attach_shared_table
+_shared_memory = None
+_shared_table = None
+_eval_cache = None
+_evaluate = None
+
+
+def lazy_smp_search(black_bitboard, white_bitboard, color, max_depth, workers, hash_size, time_limit=None,
+                    eval_cache_size=EVAL_CACHE_SIZE, evaluator=DEFAULT_EVALUATOR, symmetry=False, stats=False,
+                    soft_limit=None):
+    """
+    Search a position with several worker processes sharing one transposition table (Lazy SMP).
+    The processes and the table only last for this search; see WorkerPool to keep them.
+    Args:
+        black_bitboard: Black's bitboard.
+        white_bitboard: White's bitboard.
+        color: The color to move.
+        max_depth: The deepest iteration to search.
+        workers: The number of worker processes.
+        hash_size: The size of the shared transposition table in MB.
+        time_limit: Seconds after which the workers abort their iteration in progress, or None for no limit.
+        eval_cache_size: Entries in each worker's own evaluation cache (0 disables it).
+        evaluator: The name of the evaluation function (see engine.engine.get_evaluator).
+        symmetry: Key the shared table on the canonical form of each position.
+        stats: Instrument the workers' searches and combine their SearchStats.
+        soft_limit: Seconds after which the workers start no new iteration, or None.
+    Returns:
+        See WorkerPool.search.
+    """
+    pool = WorkerPool(workers, hash_size, eval_cache_size, evaluator)
+    try:
+        return pool.search(black_bitboard, white_bitboard, color, max_depth, time_limit, symmetry, stats, soft_limit)
+    finally:
+        pool.close()
+
+
+class WorkerPool:
+    """
+    Worker processes attached to one transposition table in shared memory,
+    kept alive (with their evaluation caches and the table's contents) from one
+    search to the next.
+    Every worker runs its own iterative deepening search of the whole tree; the
+    workers only cooperate through the shared table, and they start on different
+    root moves so they fill it with different subtrees. The result of the worker
+    that completed the deepest iteration is used.
+    """
+    def __init__(self, workers, hash_size, eval_cache_size=EVAL_CACHE_SIZE, evaluator=DEFAULT_EVALUATOR):
+        """
+        Args:
+            workers: The number of worker processes.
+            hash_size: The size of the shared transposition table in MB.
+            eval_cache_size: Entries in each worker's own evaluation cache (0 disables it).
+            evaluator: The name of the evaluation function (see engine.engine.get_evaluator).
+        """
+        self.workers = workers
+        self.size = table_entries(hash_size) * ENTRY_SIZE
+        self.shm = shared_memory.SharedMemory(create=True, size=self.size + STOP_FLAG_SIZE)
+        # This process's own view of the table, to ponder on or clear it
+        self.table = TranspositionTable(hash_size, buffer=self.shm.buf)
+        self.executor = ProcessPoolExecutor(workers, initializer=attach_shared_table,
+                                            initargs=(self.shm.name, hash_size, eval_cache_size, evaluator))
+
+    def new_search(self):
+        """
+        Start a new table generation, for this process's view and for the workers.
+        """
+        self.table.new_search()
+        self.shm.buf[self.size + 1] = self.table.generation
+
+    def clear(self):
+        self.table.clear()
+        self.shm.buf[self.size + 1] = self.table.generation
+
+    def close(self):
+        self.executor.shutdown()
+        self.table.close()
+        self.shm.close()
+        self.shm.unlink()
+
+    def search(self, black_bitboard, white_bitboard, color, max_depth, time_limit=None, symmetry=False, stats=False,
+               soft_limit=None):
+        """
+        Search a position with all the workers.
+        Args:
+            black_bitboard: Black's bitboard.
+            white_bitboard: White's bitboard.
+            color: The color to move.
+            max_depth: The deepest iteration to search.
+            time_limit: Seconds after which the workers abort their iteration in progress, or None for no limit.
+            symmetry: Key the shared table on the canonical form of each position.
+            stats: Instrument the workers' searches and combine their SearchStats.
+            soft_limit: Seconds after which the workers start no new iteration, or None.
+        Returns:
+            The best move in notation, its score and a dict with the depth reached,
+            the total number of nodes searched, the elapsed time, the combined
+            evaluation cache statistics and, with stats, the combined SearchStats.
+        """
+        start_time = time()
+        deadline = start_time + time_limit if time_limit is not None else None
+        soft_deadline = start_time + soft_limit if soft_limit is not None else None
+        self.new_search()
+        self.shm.buf[self.size] = 0
+        futures = [
+            self.executor.submit(lazy_smp_worker, black_bitboard, white_bitboard, color, max_depth, deadline, worker_id,
+                                 symmetry, stats, soft_deadline)
+            for worker_id in range(self.workers)
+        ]
+        # Once the main worker is done the helpers are told to stop
+        main_result = futures[0].result()
+        self.shm.buf[self.size] = 1
+        results = [main_result] + [future.result() for future in futures[1:]]
+
+        move, score, depth, _, _, _ = max(results, key=lambda result: result[2])
+        info = {
+            'depth': depth,
+            'nodes': sum(result[3] for result in results),
+            'time': time() - start_time,
+            'workers': self.workers,
+        }
+        cache_stats = [result[4] for result in results if result[4] is not None]
+        if cache_stats:
+            hits = sum(stats['hits'] for stats in cache_stats)
+            lookups = hits + sum(stats['misses'] for stats in cache_stats)
+            info['eval_cache'] = {
+                'size': sum(stats['size'] for stats in cache_stats),
+                'max_size': sum(stats['max_size'] for stats in cache_stats),
+                'hits': hits,
+                'misses': lookups - hits,
+                'hit_rate': hits / lookups if lookups else 0.0,
+            }
+        if stats:
+            info['stats'] = combine([result[5] for result in results])
+        return move_to_notation(move), score, info
+
+def attach_shared_table(name, hash_size, eval_cache_size=EVAL_CACHE_SIZE, evaluator=DEFAULT_EVALUATOR):
+    global _shared_memory, _shared_table, _eval_cache, _evaluate
+    _shared_memory = open_shared_memory(name)
+    _shared_table = TranspositionTable(hash_size, buffer=_shared_memory.buf)
+    # The cache isn't shared: a per-process dict needs no locking across processes
+    _eval_cache = EvalCache(eval_cache_size) if eval_cache_size > 0 else None
+    _evaluate = get_evaluator(evaluator)
+
+def open_shared_memory(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the block with the resource
+        # tracker, which would unlink it when this worker exits
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+def lazy_smp_worker(black_bitboard, white_bitboard, color, max_depth, deadline, worker_id, symmetry=False, stats=False,
+                    soft_deadline=None):
+    """
+    Run one worker's iterative deepening search on the shared table.
+    Returns:
+        The best move, its score, the deepest completed iteration, the nodes
+        searched, the evaluation cache statistics (or None) and the SearchStats (or None).
+    """
+    table = _shared_table
+    table.reset_stats()
+    if _eval_cache is not None:
+        _eval_cache.reset_stats()
+    stop_index = table.entries * ENTRY_SIZE
+    # A process may run several searches' tasks or none, so the generation is read, not counted
+    table.generation = _shared_memory.buf[stop_index + 1]
+    # Helpers also stop as soon as the main worker has finished
+    should_stop = None if worker_id == 0 else (lambda: _shared_memory.buf[stop_index] != 0)
+
+    search = (InstrumentedSearch if stats else Search)(
+        table, _evaluate, deadline, _eval_cache, getattr(_evaluate, 'evaluate_batch', None), symmetry, soft_deadline
+    )
+    # Odd helpers start one iteration deeper to spread the workers across depths
+    result = search.iterative_deepening(
+        black_bitboard, white_bitboard, color, max_depth,
+        start_depth=min(1 + worker_id % 2, max_depth), rotation=worker_id, should_stop=should_stop
+    )
+    cache_stats = None if _eval_cache is None else _eval_cache.stats()
+    search_stats = search.stats if stats else None
+    return result['move'], black_score(result['score'], color), result['depth'], search.nodes, cache_stats, search_stats
@@ -0,0 +1,177 @@
+"""
+Pattern-based evaluation. Each pattern is a fixed set of squares; every
+configuration of those squares (empty, black or white, read as a base 3
+number) has its own weight, learned offline by engine.train_patterns.
+Every pattern is read in each of its orientations with one shared weight
+table; a pattern that maps onto itself, like an edge, is read once in each
+direction. A symmetry of the board then only swaps which orientation reads
+which configuration, so rotated and mirrored positions score the same.
+There is a separate set of tables for every game phase (by number of empty squares).
+
+NumPy is an optional dependency: this module raises ImportError without it.
+"""
+import os
+
+import numpy as np
+
+
+PATTERN_WEIGHTS_FILE = os.path.join(os.path.dirname(__file__), 'pattern_weights.npz')
+PHASE_COUNT = 6
+PHASE_EMPTIES = 10  # Empty squares per phase
+
+# Base patterns as (x, y) squares; the order of the squares fixes the table index
+PATTERNS = {
+    'edge_2x': ((1, 1), (0, 0), (1, 0), (2, 0), (3, 0), (4, 0), (5, 0), (6, 0), (7, 0), (6, 1)),
+    'corner_3x3': ((0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1), (0, 2), (1, 2), (2, 2)),
+    'corner_2x5': ((0, 0), (1, 0), (2, 0), (3, 0), (4, 0), (0, 1), (1, 1), (2, 1), (3, 1), (4, 1)),
+    'diagonal_8': tuple((i, i) for i in range(8)),
+    'diagonal_7': tuple((i + 1, i) for i in range(7)),
+    'diagonal_6': tuple((i + 2, i) for i in range(6)),
+    'diagonal_5': tuple((i + 3, i) for i in range(5)),
+    'diagonal_4': tuple((i + 4, i) for i in range(4)),
+}
+
+
+def symmetries(x, y):
+    """
+    Return the square (x, y) under each of the 8 rotations and reflections of the board.
+    """
+    return (
+        (x, y), (7 - x, y), (x, 7 - y), (7 - x, 7 - y),
+        (y, x), (7 - y, x), (y, 7 - x), (7 - y, 7 - x),
+    )
+
+def create_instances():
+    """
+    Place every pattern on the board in each distinct orientation. Two
+    orientations of a symmetric pattern can cover the same squares in a
+    different order; both are kept, as the order decides the table index.
+    Returns:
+        A list of (pattern name, tuple of square indices) and the offset of
+        each pattern's table in the flat weight vector.
+    """
+    instances = []
+    offsets = {}
+    offset = 0
+    for name, squares in PATTERNS.items():
+        seen = set()
+        transformed = [symmetries(x, y) for x, y in squares]
+        for symmetry in range(8):
+            instance = tuple(square[symmetry][0] + 8 * square[symmetry][1] for square in transformed)
+            if instance in seen:
+                continue
+            seen.add(instance)
+            instances.append((name, instance))
+        offsets[name] = offset
+        offset += 3 ** len(squares)
+    offsets['bias'] = offset
+    return instances, offsets
+
+INSTANCES, OFFSETS = create_instances()
+FEATURE_COUNT = OFFSETS['bias'] + 1
+
+
+def create_index_matrix():
+    """
+    Build the matrix that turns the 128 bits of a position (black's 64 squares,
+    then white's) into the table index of every pattern instance, plus an
+    always-zero row for the bias. Empty counts 0, black 1 and white 2.
+    Returns:
+        The matrix and the offset of each row's table in the weight vector.
+    """
+    matrix = np.zeros((len(INSTANCES) + 1, 128), dtype=np.int32)
+    for row, (_, squares) in enumerate(INSTANCES):
+        for power, square in enumerate(squares):
+            matrix[row, square] = 3 ** power
+            matrix[row, 64 + square] = 2 * 3 ** power
+    offsets = np.array([OFFSETS[name] for name, _ in INSTANCES] + [OFFSETS['bias']], dtype=np.intp)
+    return matrix, offsets
+
+INDEX_MATRIX, INDEX_OFFSETS = create_index_matrix()
+# Float matrix products go through BLAS and are exact for these small integers
+_INDEX_MATRIX_FLOAT = INDEX_MATRIX.astype(np.float64)
+
+
+def unpack_positions(black_bitboards, white_bitboards):
+    """
+    Expand arrays of bitboards to an (n, 128) array of bits: black's squares, then white's.
+    """
+    black_bitboards = np.ascontiguousarray(black_bitboards, dtype='<u8')
+    white_bitboards = np.ascontiguousarray(white_bitboards, dtype='<u8')
+    packed = np.concatenate((black_bitboards.view(np.uint8).reshape(-1, 8),
+                             white_bitboards.view(np.uint8).reshape(-1, 8)), axis=1)
+    return np.unpackbits(packed, axis=1, bitorder='little')
+
+def feature_indices(black_bitboards, white_bitboards):
+    """
+    Compute the weight indices of a batch of positions.
+    Args:
+        black_bitboards: Array (or sequence) of black bitboards.
+        white_bitboards: Array of white bitboards.
+    Returns:
+        An (n, features per position) array of indices into a phase's weight
+        vector, and the (n,) array of phases.
+    """
+    bits = unpack_positions(black_bitboards, white_bitboards)
+    indices = (bits @ _INDEX_MATRIX_FLOAT.T).astype(np.intp) + INDEX_OFFSETS
+    empties = 64 - bits.sum(axis=1, dtype=np.int32)
+    return indices, np.minimum(np.maximum(empties - 1, 0) // PHASE_EMPTIES, PHASE_COUNT - 1)
+
+def phase_of(black_bitboard:int, white_bitboard:int) -> int:
+    empties = 64 - (black_bitboard | white_bitboard).bit_count()
+    return min(max(empties - 1, 0) // PHASE_EMPTIES, PHASE_COUNT - 1)
+
+
+class PatternEvaluator:
+    """
+    Evaluate positions with the pattern weight tables.
+    Scores are from black's point of view, in discs of final margin.
+    """
+    def __init__(self, weights):
+        """
+        Args:
+            weights: A (PHASE_COUNT, FEATURE_COUNT) array of weights.
+        Raises:
+            ValueError: If the weights don't match the patterns of this module.
+        """
+        weights = np.asarray(weights, dtype=np.float32)
+        if weights.shape != (PHASE_COUNT, FEATURE_COUNT):
+            raise ValueError(f'Expected pattern weights of shape {(PHASE_COUNT, FEATURE_COUNT)}, got {weights.shape}')
+        self.weights = weights
+
+    @classmethod
+    def load(cls, path:str=PATTERN_WEIGHTS_FILE):
+        with np.load(path) as data:
+            return cls(data['weights'])
+
+    def save(self, path:str=PATTERN_WEIGHTS_FILE):
+        # Half precision is plenty for weights measured in discs and halves the file
+        np.savez_compressed(path, weights=self.weights.astype(np.float16), patterns=np.array(list(PATTERNS)))
+
+    def __call__(self, black_bitboard:int, white_bitboard:int) -> float:
+        bits = np.unpackbits(np.frombuffer((black_bitboard | white_bitboard << 64).to_bytes(16, 'little'), np.uint8),
+                             bitorder='little')
+        indices = (_INDEX_MATRIX_FLOAT @ bits).astype(np.intp) + INDEX_OFFSETS
+        # Summed in double precision, where the half precision weights of the file add up exactly in any order
+        return float(self.weights[phase_of(black_bitboard, white_bitboard)].take(indices).sum(dtype=np.float64))
+
+    def evaluate_batch(self, black_bitboards, white_bitboards):
+        """
+        Evaluate an array of positions at once.
+        Returns:
+            A float64 array of scores from black's point of view.
+        """
+        indices, position_phases = feature_indices(black_bitboards, white_bitboards)
+        return self.weights[position_phases[:, None], indices].sum(axis=1, dtype=np.float64)
+
+
+_default_evaluator = None
+
+def load_default_evaluator():
+    """
+    Return the evaluator for PATTERN_WEIGHTS_FILE, loading it on first use.
+    """
+    global _default_evaluator
+    if _default_evaluator is None:
+        _default_evaluator = PatternEvaluator.load()
+    return _default_evaluator
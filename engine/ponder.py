@@ -0,0 +1,105 @@
+"""
+Pondering: searching the position in a background thread while the interface waits for input.
+
+The ponder search fills a transposition table that the next real search of
+the position, or of any position after one of its moves, shares. It polls a
+stop flag every PONDER_CHECK_INTERVAL nodes, so it gives way within a few
+milliseconds when a command arrives. While input() blocks the main thread
+the ponder thread has the interpreter to itself.
+"""
+import threading
+
+from engine.cache import EvalCache
+from engine.search import Search
+from engine.settings import EVAL_CACHE_SIZE
+
+
+PONDER_CHECK_INTERVAL = 16  # Nodes between polls of the stop flag
+PONDER_MAX_DEPTH = 60  # Iterations stop here if the ponder search is never interrupted
+
+
+class Ponderer:
+    """
+    Runs at most one background search at a time and keeps track of how often
+    the position it pondered on was the one that came up.
+    Stats:
+        ponders: Background searches started.
+        hits: Pondered positions whose predicted best move was the one played.
+        misses: Pondered positions where another move was played.
+        reuses: Pondered positions that were then searched themselves.
+        nodes: Nodes searched while pondering.
+    """
+    def __init__(self, transposition_table, evaluate, symmetry=False, eval_cache_size=EVAL_CACHE_SIZE):
+        """
+        Args:
+            transposition_table: The table shared with the real searches.
+            evaluate: The evaluation function of the real searches; their table
+                entries are only useful to each other with the same evaluation.
+            symmetry: Whether the real searches key the table on canonical positions.
+            eval_cache_size: Entries in the ponder search's own evaluation cache (0 disables it).
+        """
+        self.tt = transposition_table
+        self.evaluate = evaluate
+        self.symmetry = symmetry
+        self.eval_cache = EvalCache(eval_cache_size) if eval_cache_size > 0 else None
+        self.thread = None
+        self.position = None
+        self.search = None
+        self.result = None
+        self.stopping = False
+        self.stats = {'ponders': 0, 'hits': 0, 'misses': 0, 'reuses': 0, 'nodes': 0}
+
+    @property
+    def active(self) -> bool:
+        return self.thread is not None
+
+    def start(self, black_bitboard:int, white_bitboard:int, color):
+        """
+        Stop any search in progress and start pondering on a position.
+        """
+        self.stop()
+        self.position = (black_bitboard, white_bitboard, color)
+        self.stopping = False
+        self.result = None
+        self.search = Search(self.tt, self.evaluate, eval_cache=self.eval_cache,
+                             evaluate_batch=getattr(self.evaluate, 'evaluate_batch', None), symmetry=self.symmetry,
+                             check_interval=PONDER_CHECK_INTERVAL)
+        self.thread = threading.Thread(target=self.run, args=self.position, daemon=True)
+        self.stats['ponders'] += 1
+        self.thread.start()
+
+    def run(self, black_bitboard, white_bitboard, color):
+        self.result = self.search.iterative_deepening(black_bitboard, white_bitboard, color, PONDER_MAX_DEPTH,
+                                                      should_stop=lambda: self.stopping)
+
+    def stop(self):
+        """
+        Stop pondering and wait for the thread to finish.
+        Returns:
+            The pondered position as (black, white, color) and the best move
+            found (a single-bit bitboard, 0 for a pass, None if no iteration
+            finished), or (None, None) if nothing was being pondered.
+        """
+        if self.thread is None:
+            return None, None
+        self.stopping = True
+        self.thread.join()
+        self.thread = None
+        self.stats['nodes'] += self.search.nodes
+        move = None if self.result is None or not self.result['depth'] else self.result['move']
+        position = self.position
+        self.position = self.search = self.result = None
+        return position, move
+
+    def record(self, hit:bool):
+        self.stats['hits' if hit else 'misses'] += 1
+
+    def record_reuse(self):
+        self.stats['reuses'] += 1
+
+    def report(self) -> dict:
+        """
+        Return the stats with the hit rate (hits among hits and misses) added.
+        """
+        guesses = self.stats['hits'] + self.stats['misses']
+        return dict(self.stats, hit_rate=self.stats['hits'] / guesses if guesses else 0.0)
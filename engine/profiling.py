@@ -0,0 +1,221 @@
+"""
+Profile the engine's search and report where the time goes.
+
+Two profilers are available. The deterministic one records every function call
+and return with sys.setprofile, which is exact but slows the search down
+several times. The sampling one reads the search thread's stack from a
+background thread at a fixed interval, which barely slows it down but only
+sees where the search happened to be. Both only record the frames below the
+profiled call, so whatever called it (the interface's input loop, for
+example) never shows up.
+
+Results are collapsed stacks, one 'outer;...;inner value' line per distinct
+stack, as read by flamegraph.pl, speedscope and similar tools. The value is
+self time in microseconds for the deterministic profiler and a sample count
+for the sampling one.
+
+Usage: py -m engine.profiling [--fen FEN] [--color b] [--depth 6] [--mode sampling] [--output FILE] [--top 20]
+"""
+import argparse
+import os
+import sys
+import threading
+from collections import Counter
+from time import perf_counter_ns
+
+from othello.board import Board
+from engine.engine import ai_move_iterative, EVALUATORS
+from engine.settings import DEFAULT_EVALUATOR
+
+
+DETERMINISTIC = 'deterministic'
+SAMPLING = 'sampling'
+MODES = (DETERMINISTIC, SAMPLING)
+SAMPLE_INTERVAL = 0.001  # Seconds between samples
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def frame_name(code) -> str:
+    """
+    Name a code object 'module:qualified name', with the module relative to the repository when it is in it.
+    """
+    path = os.path.abspath(code.co_filename)
+    if path.startswith(ROOT + os.sep):
+        module = os.path.splitext(os.path.relpath(path, ROOT))[0].replace(os.sep, '.')
+    else:
+        module = os.path.splitext(os.path.basename(path))[0]
+    return f'{module}:{getattr(code, "co_qualname", code.co_name)}'
+
+def builtin_name(function) -> str:
+    return f'builtins:{getattr(function, "__qualname__", None) or getattr(function, "__name__", repr(function))}'
+
+
+def trace_stacks(function):
+    """
+    Call function under the deterministic profiler.
+    Returns:
+        function's return value and a Counter of self time in microseconds per collapsed stack.
+    """
+    nanoseconds = Counter()
+    names = {}
+    keys = []  # Collapsed stack of every open frame
+    last = [0]
+
+    def tracer(frame, event, arg):
+        now = perf_counter_ns()
+        if keys:
+            nanoseconds[keys[-1]] += now - last[0]
+        if event == 'call' or event == 'c_call':
+            code = frame.f_code if event == 'call' else arg
+            name = names.get(code)
+            if name is None:
+                name = names[code] = frame_name(code) if event == 'call' else builtin_name(code)
+            keys.append(f'{keys[-1]};{name}' if keys else name)
+        elif keys:
+            keys.pop()
+        last[0] = perf_counter_ns()  # Leave the tracer's own time out
+
+    sys.setprofile(tracer)
+    try:
+        result = function()
+    finally:
+        sys.setprofile(None)
+    stacks = Counter({key: value // 1000 for key, value in nanoseconds.items() if value >= 1000})
+    return result, stacks
+
+def sample_stacks(function, interval:float=SAMPLE_INTERVAL):
+    """
+    Call function under the sampling profiler.
+    Returns:
+        function's return value and a Counter of samples per collapsed stack.
+    """
+    stacks = Counter()
+    thread_id = threading.get_ident()
+    done = threading.Event()
+    names = {}
+
+    def profiled():
+        return function()
+    entry = profiled.__code__
+
+    def sample():
+        while not done.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None and frame.f_code is not entry:
+                code = frame.f_code
+                name = names.get(code)
+                if name is None:
+                    name = names[code] = frame_name(code)
+                stack.append(name)
+                frame = frame.f_back
+            if frame is not None and stack:  # Only samples taken inside the profiled call
+                stacks[';'.join(reversed(stack))] += 1
+
+    # The sampler only runs when it gets the GIL, so hand it over at least once per interval
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(min(switch_interval, interval))
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        result = profiled()
+    finally:
+        done.set()
+        sampler.join()
+        sys.setswitchinterval(switch_interval)
+    return result, stacks
+
+
+def profile_search(board:Board, color, depth:int, mode:str=SAMPLING, interval:float=SAMPLE_INTERVAL, **options):
+    """
+    Profile one search of a position.
+    Args:
+        board: The position to search.
+        color: The color to move.
+        depth: The deepest iteration to search.
+        mode: DETERMINISTIC or SAMPLING.
+        interval: Seconds between samples in SAMPLING mode.
+        options: Passed on to ai_move_iterative (time_limit, evaluator, ...).
+            The search runs in this process without the opening book unless
+            book is given explicitly.
+    Raises:
+        ValueError: If mode is unknown.
+    Returns:
+        A dict with the search result ('result', as returned by
+        ai_move_iterative), the collapsed stacks ('stacks', a Counter) and
+        their unit ('unit': 'us' or 'samples').
+    """
+    options.setdefault('time_limit', None)
+    options.setdefault('book', None)
+    options['workers'] = 1  # Worker processes are out of the profiler's reach
+
+    def search():
+        return ai_move_iterative(board, color, depth, **options)
+
+    if mode == DETERMINISTIC:
+        result, stacks = trace_stacks(search)
+        unit = 'us'
+    elif mode == SAMPLING:
+        result, stacks = sample_stacks(search, interval)
+        unit = 'samples'
+    else:
+        raise ValueError(f'Unknown profiling mode {mode}, expected one of {", ".join(MODES)}')
+    return {'result': result, 'stacks': stacks, 'unit': unit}
+
+def write_collapsed(stacks:Counter, path:str):
+    """
+    Write collapsed stacks, one 'frame;frame;frame value' line each, heaviest first.
+    """
+    with open(path, 'w') as f:
+        f.writelines(f'{stack} {value}\n' for stack, value in stacks.most_common())
+
+def top_functions(stacks:Counter, count:int=20):
+    """
+    Rank functions by self value (time or samples in the function itself).
+    A function's total value counts every stack it appears in once, however
+    often it recurses in it.
+    Returns:
+        Up to count (function, self value, total value) tuples.
+    """
+    own = Counter()
+    total = Counter()
+    for stack, value in stacks.items():
+        frames = stack.split(';')
+        own[frames[-1]] += value
+        for name in set(frames):
+            total[name] += value
+    return [(name, value, total[name]) for name, value in own.most_common(count)]
+
+def format_top(stacks:Counter, unit:str, count:int=20) -> str:
+    grand_total = sum(stacks.values()) or 1
+    lines = [f'{"self":>10} {"self %":>7} {"total":>10} {"total %":>7}  function ({unit})']
+    for name, own, total in top_functions(stacks, count):
+        lines.append(f'{own:>10} {own / grand_total:>7.1%} {total:>10} {total / grand_total:>7.1%}  {name}')
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--fen', help='Position to search (default: the start position)')
+    parser.add_argument('--color', default='b')
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--mode', default=SAMPLING, choices=MODES)
+    parser.add_argument('--interval', type=float, default=SAMPLE_INTERVAL, help='Seconds between samples')
+    parser.add_argument('--eval', default=DEFAULT_EVALUATOR, choices=EVALUATORS)
+    parser.add_argument('--output', help='Write the collapsed stacks to this file')
+    parser.add_argument('--top', type=int, default=20, help='Functions in the hot function table')
+    args = parser.parse_args()
+
+    board = Board(args.fen) if args.fen else Board()
+    profile = profile_search(board, args.color, args.depth, args.mode, args.interval, evaluator=args.eval)
+    move, score, report = profile['result']
+    print(f'{move} [{score}] at depth {report["depth"]}')
+    print(format_top(profile['stacks'], profile['unit'], args.top))
+    if args.output:
+        write_collapsed(profile['stacks'], args.output)
+        print(f'Wrote {len(profile["stacks"])} stacks to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,415 @@
+from time import time
+
+from othello.bitboard import find_legal_moves_bitboard, compute_flips
+from engine.tt import EXACT, LOWER, UPPER, NO_MOVE
+from engine.zobrist import zobrist_hash, WHITE_TO_MOVE_KEY
+from engine.settings import TIME_CHECK_INTERVAL
+from othello.symmetry import canonical, transform_move, untransform_move
+
+
+INFINITY = float('inf')
+MAX_PLY = 128
+WIN_SCORE = 10**6  # Larger than any evaluation, so a decided game outscores every heuristic score
+NULL_WINDOW = 1e-6
+ASPIRATION_WINDOW = 10
+
+CORNERS = 0x8100000000000081
+
+# Move ordering keys, from most to least important
+PV_MOVE_KEY = 1 << 41
+TT_MOVE_KEY = 1 << 40
+CORNER_KEY = 1 << 30
+KILLER_KEY = 1 << 25
+MOBILITY_KEY = 1 << 20  # Subtracted per opponent reply (fastest-first)
+HISTORY_LIMIT = (1 << 20) - 1
+
+
+class SearchAbort(Exception):
+    """
+    Raised inside the search when it runs out of time or is told to stop.
+    The iteration in progress is discarded.
+    """
+
+
+class Search:
+    """
+    Principal variation search (negamax with null windows) over bitboards.
+    Positions are passed as (player, opponent) bitboards from the point of view
+    of the side to move, and scores are returned from that side's point of view.
+    Moves are ordered by the transposition table move, corners, killer moves,
+    the opponent's mobility after the move (fewest replies first) and the
+    history table.
+    """
+    def __init__(self, transposition_table, evaluate, time_limit=None, eval_cache=None, evaluate_batch=None,
+                 symmetry=False, soft_limit=None, check_interval=TIME_CHECK_INTERVAL):
+        """
+        Args:
+            transposition_table: The TranspositionTable to use.
+            evaluate: A function (black_bitboard, white_bitboard) -> score from black's point of view.
+            time_limit: Absolute time (as returned by time()) at which to abort the
+                iteration in progress (the hard limit).
+            eval_cache: Optional EvalCache for leaf evaluations.
+            evaluate_batch: Optional function (black_bitboards, white_bitboards) -> array of
+                scores from black's point of view. When given, all the children of a
+                depth 1 node are evaluated with one call instead of being searched.
+            symmetry: Key the transposition table and evaluation cache on the
+                canonical form of each position, so rotated and mirrored positions
+                share entries. Evaluation cache hits are only exact if the
+                evaluation itself is symmetric.
+            soft_limit: Absolute time after which no new iteration is started.
+            check_interval: Nodes searched between checks of time_limit and should_stop.
+        """
+        self.tt = transposition_table
+        self.evaluate = evaluate
+        self.eval_cache = eval_cache
+        self.evaluate_batch = evaluate_batch
+        self.symmetry = symmetry
+        self.time_limit = time_limit
+        self.soft_limit = soft_limit
+        self.check_interval = check_interval
+        self.check_countdown = check_interval
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = {'b': [0] * 64, 'w': [0] * 64}
+        self.nodes = 0
+        self.pv_table = [[] for _ in range(MAX_PLY + 1)]
+        self.pv = []  # Principal variation of the last completed iteration
+        self.follow_pv = False
+        self.should_stop = None
+
+    def iterative_deepening(self, black_bitboard, white_bitboard, color, max_depth, start_depth=1, rotation=0, should_stop=None):
+        """
+        Search one iteration deeper at a time, reusing the transposition table,
+        killers, history and principal variation of the previous iterations.
+        An iteration interrupted by the time limit or should_stop is thrown
+        away and no iteration starts after the soft limit; the first iteration
+        always runs to completion.
+        Args:
+            black_bitboard: Black's bitboard.
+            white_bitboard: White's bitboard.
+            color: The color to move.
+            max_depth: The deepest iteration to search.
+            start_depth: The first iteration to search.
+            rotation: Passed on to root to spread parallel workers over the root moves.
+            should_stop: Optional callable polled during the search.
+        Returns:
+            A dict with the best move (single-bit bitboard) and score (from the
+            side to move) of the last completed iteration, the depth reached,
+            the principal variation and a list of per-iteration results.
+        """
+        result = {'move': 0, 'score': None, 'depth': 0, 'pv': [], 'iterations': []}
+        time_limit = self.time_limit
+        for depth in range(start_depth, max_depth + 1):
+            iteration_start = time()
+            if result['depth'] and self.soft_limit is not None and iteration_start >= self.soft_limit:
+                break
+            nodes = self.nodes
+            # Without one completed iteration there would be nothing to return
+            self.time_limit = time_limit if result['depth'] else None
+            self.should_stop = should_stop if result['depth'] else None
+            self.follow_pv = True
+            try:
+                move, score = self.search_root(black_bitboard, white_bitboard, color, depth, result['score'], rotation)
+            except SearchAbort:
+                break
+            finally:
+                self.time_limit = time_limit
+                self.should_stop = None
+            self.pv = self.pv_table[0]
+            result.update(move=move, score=score, depth=depth, pv=self.pv)
+            result['iterations'].append({
+                'depth': depth,
+                'move': move,
+                'score': score,
+                'nodes': self.nodes - nodes,
+                'time': time() - iteration_start,
+            })
+            if abs(score) >= WIN_SCORE:
+                break  # The game is decided within the horizon
+        return result
+
+    def search_root(self, black_bitboard, white_bitboard, color, depth, guess=None, rotation=0):
+        """
+        Search the root position, using an aspiration window around guess when given.
+        Args:
+            black_bitboard: Black's bitboard.
+            white_bitboard: White's bitboard.
+            color: The color to move.
+            depth: The search depth.
+            guess: The expected score (from the side to move), e.g. from the previous iteration.
+            rotation: Rotate the ordered root moves by this many moves, so parallel
+                workers start on different subtrees.
+        Raises:
+            SearchAbort: If the time limit passes or should_stop returns True.
+        Returns:
+            The best move as a single-bit bitboard (0 if the side to move must
+            pass) and its score from the side to move's point of view.
+        """
+        if color == 'b':
+            player, opponent = black_bitboard, white_bitboard
+        else:
+            player, opponent = white_bitboard, black_bitboard
+
+        if guess is None or depth < 3 or abs(guess) >= WIN_SCORE:
+            return self.root(player, opponent, color, depth, -INFINITY, INFINITY, rotation)
+
+        alpha, beta = guess - ASPIRATION_WINDOW, guess + ASPIRATION_WINDOW
+        while True:
+            move, score = self.root(player, opponent, color, depth, alpha, beta, rotation)
+            if score <= alpha:
+                alpha = -INFINITY
+            elif score >= beta:
+                beta = INFINITY
+            else:
+                return move, score
+
+    def root(self, player, opponent, color, depth, alpha, beta, rotation=0):
+        other = 'w' if color == 'b' else 'b'
+        self.pv_table[0] = []
+        legal_moves = find_legal_moves_bitboard(player, opponent, 'b')
+        if not legal_moves:
+            score = -self.negamax(opponent, player, other, depth, -beta, -alpha, 1)
+            self.pv_table[0] = [0] + self.pv_table[1]
+            return 0, score
+
+        key, symmetry = self.position_key(player, opponent, color)
+        entry = self.tt.probe(key)
+        tt_move = NO_MOVE if entry is None else untransform_move(entry[3], symmetry)
+        ordered = self.order_moves(player, opponent, color, legal_moves, depth, 0, tt_move)
+        if rotation:
+            rotation %= len(ordered)
+            ordered = ordered[rotation:] + ordered[:rotation]
+
+        original_alpha = alpha
+        best_move = ordered[0][1]
+        best_score = -INFINITY
+        for index, (_, move, new_player, new_opponent) in enumerate(ordered):
+            if index == 0:
+                score = -self.negamax(new_opponent, new_player, other, depth - 1, -beta, -alpha, 1)
+            else:
+                score = -self.negamax(new_opponent, new_player, other, depth - 1, -alpha - NULL_WINDOW, -alpha, 1)
+                if alpha < score < beta:
+                    score = -self.negamax(new_opponent, new_player, other, depth - 1, -beta, -alpha, 1)
+            if index == 0:
+                self.follow_pv = False
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self.pv_table[0] = [move] + self.pv_table[1]
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.tt.store(key, depth, best_score, bound, transform_move(best_move.bit_length() - 1, symmetry))
+        return best_move, best_score
+
+    def negamax(self, player, opponent, color, depth, alpha, beta, ply):
+        self.nodes += 1
+        self.pv_table[ply] = []
+        key, symmetry = self.position_key(player, opponent, color)
+        entry = self.tt.probe(key)
+        tt_move = NO_MOVE
+        if entry is not None:
+            tt_score, tt_depth, tt_bound, tt_move = entry
+            tt_move = untransform_move(tt_move, symmetry)
+            if tt_depth >= depth:
+                if tt_bound == EXACT:
+                    return tt_score
+                if tt_bound == LOWER:
+                    alpha = max(alpha, tt_score)
+                else:
+                    beta = min(beta, tt_score)
+                if alpha >= beta:
+                    return tt_score
+
+        self.check_countdown -= 1
+        if not self.check_countdown:
+            self.check_limits()
+        if depth <= 0:
+            return self.evaluate_side(player, opponent, color, key)
+
+        other = 'w' if color == 'b' else 'b'
+        legal_moves = find_legal_moves_bitboard(player, opponent, 'b')
+        if not legal_moves:
+            if not find_legal_moves_bitboard(opponent, player, 'b'):
+                return final_score(player, opponent)
+            # Pass: the bounds carry over to the opponent and the depth isn't used up
+            score = -self.negamax(opponent, player, other, depth, -beta, -alpha, ply + 1)
+            self.pv_table[ply] = [0] + self.pv_table[ply + 1]
+            return score
+        if depth == 1 and self.evaluate_batch is not None:
+            return self.frontier(player, opponent, color, legal_moves, alpha, beta, ply, key, symmetry)
+
+        original_alpha = alpha
+        ordered = self.order_moves(player, opponent, color, legal_moves, depth, ply, tt_move)
+        best_move = ordered[0][1]
+        best_score = -INFINITY
+        for index, (_, move, new_player, new_opponent) in enumerate(ordered):
+            if index == 0:
+                score = -self.negamax(new_opponent, new_player, other, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                score = -self.negamax(new_opponent, new_player, other, depth - 1, -alpha - NULL_WINDOW, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self.negamax(new_opponent, new_player, other, depth - 1, -beta, -alpha, ply + 1)
+            if index == 0:
+                self.follow_pv = False
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.update_cutoff(move, color, depth, ply)
+                        break
+                    self.pv_table[ply] = [move] + self.pv_table[ply + 1]
+
+        if best_score <= original_alpha:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.tt.store(key, depth, best_score, bound, transform_move(best_move.bit_length() - 1, symmetry))
+        return best_score
+
+    def frontier(self, player, opponent, color, legal_moves, alpha, beta, ply, key, symmetry=0):
+        """
+        Score a depth 1 node by evaluating all of its children in one batch.
+        Every child is evaluated, so the score is exact rather than a bound, and
+        the children skip the table probe and the evaluation cache.
+        """
+        moves = []
+        players = []
+        opponents = []
+        while legal_moves:
+            move = legal_moves & -legal_moves
+            legal_moves ^= move
+            flips = compute_flips(move, player, opponent)
+            moves.append(move)
+            players.append(player | flips | move)
+            opponents.append(opponent & ~flips)
+        self.nodes += len(moves)
+        self.follow_pv = False
+        if color == 'b':
+            scores = self.evaluate_batch(players, opponents).tolist()
+        else:
+            scores = [-score for score in self.evaluate_batch(opponents, players).tolist()]
+
+        best_score = max(scores)
+        best_move = moves[scores.index(best_score)]
+        if best_score > alpha:
+            self.pv_table[ply] = [best_move]
+        if best_score >= beta:
+            self.update_cutoff(best_move, color, 1, ply)
+        self.tt.store(key, 1, best_score, EXACT, transform_move(best_move.bit_length() - 1, symmetry))
+        return best_score
+
+    def check_limits(self):
+        """
+        Raise SearchAbort if the time limit has passed or should_stop returns
+        True. Called every check_interval nodes, since reading the clock at
+        every node would cost more than it saves.
+        """
+        self.check_countdown = self.check_interval
+        if self.time_limit is not None and time() > self.time_limit:
+            raise SearchAbort()
+        if self.should_stop is not None and self.should_stop():
+            raise SearchAbort()
+
+    def order_moves(self, player, opponent, color, legal_moves, depth, ply, tt_move=NO_MOVE):
+        """
+        Make every legal move and sort the children, best candidates first.
+        Returns:
+            A list of (ordering key, move, new player bitboard, new opponent bitboard).
+        """
+        killers = self.killers[ply]
+        history = self.history[color]
+        pv_move = 0
+        if self.follow_pv:
+            # Only the leftmost path of the tree follows the previous principal variation
+            if ply < len(self.pv) and legal_moves & self.pv[ply]:
+                pv_move = self.pv[ply]
+            else:
+                self.follow_pv = False
+        ordered = []
+        while legal_moves:
+            move = legal_moves & -legal_moves
+            legal_moves ^= move
+            square = move.bit_length() - 1
+            flips = compute_flips(move, player, opponent)
+            new_player = player | flips | move
+            new_opponent = opponent & ~flips
+            if move == pv_move:
+                key = PV_MOVE_KEY
+            elif square == tt_move:
+                key = TT_MOVE_KEY
+            else:
+                key = min(history[square], HISTORY_LIMIT)
+                if move & CORNERS:
+                    key += CORNER_KEY
+                if move == killers[0] or move == killers[1]:
+                    key += KILLER_KEY
+                if depth > 1:
+                    key -= find_legal_moves_bitboard(new_opponent, new_player, 'b').bit_count() * MOBILITY_KEY
+            ordered.append((key, move, new_player, new_opponent))
+        ordered.sort(key=lambda child: child[0], reverse=True)
+        return ordered
+
+    def update_cutoff(self, move, color, depth, ply):
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[color][move.bit_length() - 1] += depth * depth
+
+    def evaluate_side(self, player, opponent, color, key=None):
+        cache = self.eval_cache
+        if cache is None or key is None:
+            score = self.evaluate(player, opponent) if color == 'b' else self.evaluate(opponent, player)
+        else:
+            # The evaluation doesn't depend on the side to move, so both sides share an entry
+            if color == 'w':
+                key ^= WHITE_TO_MOVE_KEY
+            score = cache.get(key)
+            if score is None:
+                score = self.evaluate(player, opponent) if color == 'b' else self.evaluate(opponent, player)
+                cache.put(key, score)
+        return score if color == 'b' else -score
+
+    def hash(self, player, opponent, color):
+        if color == 'b':
+            return zobrist_hash(player, opponent, color)
+        return zobrist_hash(opponent, player, color)
+
+    def position_key(self, player, opponent, color):
+        """
+        Return the table key of a position and the transform to the form it is
+        keyed on (always 0 unless symmetry is enabled). Moves are stored in the
+        table in that transformed form.
+        """
+        if not self.symmetry:
+            return self.hash(player, opponent, color), 0
+        if color == 'b':
+            black, white, symmetry = canonical(player, opponent)
+        else:
+            black, white, symmetry = canonical(opponent, player)
+        return zobrist_hash(black, white, color), symmetry
+
+
+def final_score(player, opponent):
+    """
+    Score a finished game: a win is worth more than any heuristic evaluation,
+    and larger margins score higher.
+    """
+    difference = player.bit_count() - opponent.bit_count()
+    if difference > 0:
+        return WIN_SCORE + difference
+    if difference < 0:
+        return -WIN_SCORE + difference
+    return 0
@@ -0,0 +1,196 @@
+"""
+A search session: the engine state worth keeping from one move to the next.
+
+Consecutive positions of a game share most of their search trees, so the
+Engine keeps the transposition table, the evaluation cache, the worker
+processes of the parallel search and the ponder thread alive between
+searches. Every search starts a new generation of the table, so entries from
+earlier moves stay usable but are the first to be replaced. Changing an
+option only rebuilds what depends on it.
+"""
+from othello.board import Board
+from engine.engine import get_evaluator, plan_time, search_position, solve_endgame, book_move, SYMMETRIC_EVALUATORS
+from engine.book import BOOK_FILE
+from engine.cache import EvalCache
+from engine.endgame import EXACT_MODE, count_empties
+from engine.parallel import WorkerPool
+from engine.ponder import Ponderer
+from engine.settings import TT_SIZE_MB, ENDGAME_EMPTIES, EVAL_CACHE_SIZE, DEFAULT_EVALUATOR
+from engine.tt import TranspositionTable
+
+
+class Engine:
+    """
+    Searches positions with a transposition table and caches that persist for the whole session.
+    With more than one worker the table lives in shared memory and the worker
+    processes stay attached to it, each keeping its own evaluation cache.
+    """
+    def __init__(self, hash_size:float=TT_SIZE_MB, workers:int=1, eval_cache_size:int=EVAL_CACHE_SIZE,
+                 evaluator:str=DEFAULT_EVALUATOR, symmetry:bool=False):
+        """
+        Args:
+            hash_size: Transposition table size in MB.
+            workers: Worker processes for the parallel search (1 searches in this process).
+            eval_cache_size: Evaluation cache entries (0 disables the cache).
+            evaluator: The name of the evaluation function (see engine.engine.get_evaluator).
+            symmetry: Key the table and cache on the canonical form of each position
+                (ignored unless the evaluator is in SYMMETRIC_EVALUATORS).
+        Raises:
+            ValueError, ImportError, OSError: See engine.engine.get_evaluator.
+        """
+        self.hash_size = hash_size
+        self.workers = workers
+        self.eval_cache_size = eval_cache_size
+        self.evaluator = evaluator
+        self.symmetry = symmetry and evaluator in SYMMETRIC_EVALUATORS
+        self.evaluate = get_evaluator(evaluator)
+        self.table = None
+        self.pool = None
+        self.ponderer = None
+        self.eval_cache = EvalCache(eval_cache_size) if eval_cache_size > 0 else None
+        self.build_table()
+
+    def build_table(self):
+        """
+        Create the table (and the worker pool attached to it) and the ponderer for the current options.
+        """
+        self.stop_pondering()
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        if self.workers > 1:
+            self.pool = WorkerPool(self.workers, self.hash_size, self.eval_cache_size, self.evaluator)
+            self.table = self.pool.table
+        else:
+            self.table = TranspositionTable(self.hash_size)
+        ponder_stats = None if self.ponderer is None else self.ponderer.stats
+        self.ponderer = Ponderer(self.table, self.evaluate, self.symmetry)
+        if ponder_stats is not None:
+            self.ponderer.stats = ponder_stats
+
+    def configure(self, hash_size:float=None, workers:int=None, eval_cache_size:int=None, evaluator:str=None,
+                  symmetry:bool=None):
+        """
+        Change options (None keeps an option as it is). Symmetry is turned off
+        for evaluators outside SYMMETRIC_EVALUATORS. Entries that the new
+        evaluator or symmetry setting would misread are cleared.
+        Raises:
+            ValueError, ImportError, OSError: See engine.engine.get_evaluator.
+        """
+        options = (self.hash_size, self.workers, self.eval_cache_size, self.evaluator, self.symmetry)
+        if hash_size is not None:
+            self.hash_size = hash_size
+        if workers is not None:
+            self.workers = workers
+        if eval_cache_size is not None:
+            self.eval_cache_size = eval_cache_size
+        if evaluator is not None and evaluator != self.evaluator:
+            self.evaluate = get_evaluator(evaluator)
+            self.evaluator = evaluator
+        if symmetry is not None:
+            self.symmetry = symmetry
+        self.symmetry = self.symmetry and self.evaluator in SYMMETRIC_EVALUATORS
+        if options == (self.hash_size, self.workers, self.eval_cache_size, self.evaluator, self.symmetry):
+            return
+
+        if (self.hash_size, self.workers) != options[:2] or (self.pool is not None and options[2:] != (
+                self.eval_cache_size, self.evaluator, self.symmetry)):
+            # The workers get their evaluator and cache size when they start
+            self.build_table()
+        elif (self.evaluator, self.symmetry) != options[3:]:
+            self.stop_pondering()
+            self.table.clear()
+            self.ponderer = Ponderer(self.table, self.evaluate, self.symmetry)
+        if self.eval_cache_size != options[2] or (self.evaluator, self.symmetry) != options[3:]:
+            self.eval_cache = EvalCache(self.eval_cache_size) if self.eval_cache_size > 0 else None
+
+    def search(self, board:Board, color, max_depth:int, time_limit:float=None, endgame_empties:int=ENDGAME_EMPTIES,
+               endgame_mode=EXACT_MODE, book:str=BOOK_FILE, stats:bool=False, clock=None):
+        """
+        Find a move like engine.engine.ai_move_iterative, with the session's table,
+        caches and workers. Pondering stops first; if it was on this position
+        that counts as a ponder reuse.
+        Returns:
+            The move in notation, its score from black's point of view and the
+            search report (see ai_move_iterative).
+        """
+        pondered, _ = self.stop_pondering()
+        if pondered == (board.black, board.white, color):
+            self.ponderer.record_reuse()
+        if book is not None:
+            result = book_move(board, color, book)
+            if result is not None:
+                return result
+
+        time_manager = plan_time(board, time_limit, clock, endgame_empties)
+        if count_empties(board.black, board.white) <= endgame_empties:
+            result = solve_endgame(board, color, endgame_mode, time_manager.endgame_deadline())
+            if result is not None:
+                return result
+            # The solver ran out of its share of the time; the search gets the rest
+            time_manager = time_manager.remainder()
+
+        if self.pool is not None:
+            return self.pool.search(board.black, board.white, color, max_depth, time_manager.remaining(),
+                                    self.symmetry, stats, time_manager.soft_remaining())
+        return search_position(board, color, max_depth, self.table, self.evaluate, time_manager, self.eval_cache,
+                               self.symmetry, stats)
+
+    def start_pondering(self, board:Board, color):
+        self.ponderer.start(board.black, board.white, color)
+
+    def stop_pondering(self):
+        """
+        Stop pondering.
+        Returns:
+            The pondered position and the predicted move (see Ponderer.stop).
+        """
+        if self.ponderer is None:
+            return None, None
+        return self.ponderer.stop()
+
+    def record_ponder(self, hit:bool):
+        self.ponderer.record(hit)
+
+    def new_game(self):
+        """
+        Forget everything learned about earlier positions. Worker processes
+        keep their evaluation caches, which hold exact evaluations.
+        """
+        self.stop_pondering()
+        if self.pool is not None:
+            self.pool.clear()
+        else:
+            self.table.clear()
+        if self.eval_cache is not None:
+            self.eval_cache.clear()
+
+    def resize(self, hash_size:float):
+        self.configure(hash_size=hash_size)
+
+    def clear(self):
+        self.new_game()
+
+    def info(self) -> dict:
+        """
+        Describe the session: table size, fill and generation, workers, evaluation cache and pondering statistics.
+        """
+        info = {
+            'hash_size': self.table.size_mb,
+            'entries': self.table.entries,
+            'usage': self.table.usage(),
+            'generation': self.table.generation,
+            'workers': self.workers,
+            'evaluator': self.evaluator,
+            'symmetry': self.symmetry,
+            'ponder': self.ponderer.report(),
+        }
+        if self.eval_cache is not None and self.pool is None:
+            info['eval_cache'] = self.eval_cache.stats()
+        return info
+
+    def close(self):
+        self.stop_pondering()
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
@@ -23,4 +23,17 @@ WEIGHTS = {
 
 """
 These weights were generated with a basic evolution model at depth=2
-"""
\ No newline at end of file
+"""
+
+# Penalty for discs on X and C squares next to an empty corner (engine.evaluation only), set by hand
+CORNER_CLOSENESS_WEIGHTS = {
+    'opening': 0.4,
+    'middlegame': 0.3,
+    'endgame': 0.1
+}
+
+TT_SIZE_MB = 16  # Default transposition table size
+ENDGAME_EMPTIES = 12  # Solve positions exactly with at most this many empty squares (about 0.1s each)
+EVAL_CACHE_SIZE = 2**18  # Leaf evaluations kept in the evaluation cache
+DEFAULT_EVALUATOR = 'classic'  # 'classic', 'table' or 'pattern' (needs NumPy)
+TIME_CHECK_INTERVAL = 64  # Nodes searched between checks of the clock and the stop signal
@@ -0,0 +1,162 @@
+"""
+Search instrumentation: node, evaluation, table and cutoff counters.
+
+InstrumentedSearch is a Search that fills a SearchStats object as it goes.
+The counting lives entirely in the subclass, so the plain Search used when no
+statistics are requested runs exactly the same code as before.
+"""
+from time import perf_counter
+
+from othello.bitboard import move_to_notation
+from engine.search import Search, MAX_PLY
+from engine.tt import NO_MOVE
+
+
+# Totals kept per iteration and for the whole search
+COUNTERS = (
+    'nodes', 'evals', 'eval_time', 'tt_probes', 'tt_hits', 'tt_stores',
+    'cutoffs', 'first_move_cutoffs', 'frontier_cutoffs', 'time',
+)
+
+
+class SearchStats:
+    """
+    Statistics of one search.
+    Attributes:
+        nodes: Nodes searched (every child of a batch-evaluated node counts as one).
+        evals: Positions passed to the evaluation function (cache hits excluded).
+        eval_time: Seconds spent in the evaluation function.
+        tt_probes, tt_hits, tt_stores: Transposition table accesses.
+        cutoffs: Beta cutoffs in the move loop.
+        first_move_cutoffs: The cutoffs caused by the first move searched.
+        frontier_cutoffs: Cutoffs at batch-evaluated depth 1 nodes, which have no move order.
+        time: Seconds spent searching (summed over combined searches).
+        iterations: The counters of every iteration, including an interrupted last one.
+        pv: The principal variation of the last completed iteration as move bitboards.
+        workers: The number of searches combined into these statistics.
+    """
+    def __init__(self):
+        for counter in COUNTERS:
+            setattr(self, counter, 0)
+        self.eval_time = 0.0
+        self.time = 0.0
+        self.iterations = []
+        self.pv = []
+        self.workers = 1
+
+    def totals(self) -> dict:
+        return with_rates({counter: getattr(self, counter) for counter in COUNTERS})
+
+    def to_dict(self) -> dict:
+        """
+        Return the statistics as plain data (moves in notation), ready for JSON.
+        """
+        return {
+            'total': self.totals(),
+            'iterations': [with_rates(iteration) for iteration in self.iterations],
+            'pv': [move_to_notation(move) for move in self.pv],
+            'workers': self.workers,
+        }
+
+
+def with_rates(counters:dict) -> dict:
+    """
+    Add the nodes per second, table hit rate, first move cutoff rate and evaluation time share to a dict of counters.
+    """
+    counters = dict(counters)
+    counters['nps'] = counters['nodes'] / counters['time'] if counters['time'] else 0.0
+    counters['tt_hit_rate'] = counters['tt_hits'] / counters['tt_probes'] if counters['tt_probes'] else 0.0
+    counters['first_move_cutoff_rate'] = (counters['first_move_cutoffs'] / counters['cutoffs']
+                                          if counters['cutoffs'] else 0.0)
+    counters['eval_time_share'] = counters['eval_time'] / counters['time'] if counters['time'] else 0.0
+    return counters
+
+def combine(stats_list) -> SearchStats:
+    """
+    Combine the statistics of parallel searches. Counters, including the time,
+    are summed, so rates are per search rather than per second of wall time;
+    the iterations and principal variation are the first search's.
+    """
+    combined = SearchStats()
+    for counter in COUNTERS:
+        setattr(combined, counter, sum(getattr(stats, counter) for stats in stats_list))
+    combined.iterations = stats_list[0].iterations
+    combined.pv = stats_list[0].pv
+    combined.workers = len(stats_list)
+    return combined
+
+
+class InstrumentedSearch(Search):
+    """
+    Search that records SearchStats. Takes the same arguments as Search, plus
+    the stats object to fill (a new one by default).
+    """
+    def __init__(self, *args, stats:SearchStats=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats = SearchStats() if stats is None else stats
+        self.first_moves = [0] * (MAX_PLY + 1)  # First move searched at every ply, None at batch-evaluated nodes
+
+        evaluate = self.evaluate
+        def timed_evaluate(black_bitboard, white_bitboard):
+            start_time = perf_counter()
+            score = evaluate(black_bitboard, white_bitboard)
+            stats.eval_time += perf_counter() - start_time
+            stats.evals += 1
+            return score
+        self.evaluate = timed_evaluate
+
+        evaluate_batch = self.evaluate_batch
+        if evaluate_batch is not None:
+            def timed_evaluate_batch(black_bitboards, white_bitboards):
+                start_time = perf_counter()
+                scores = evaluate_batch(black_bitboards, white_bitboards)
+                stats.eval_time += perf_counter() - start_time
+                stats.evals += len(black_bitboards)
+                return scores
+            self.evaluate_batch = timed_evaluate_batch
+
+    def iterative_deepening(self, *args, **kwargs):
+        result = super().iterative_deepening(*args, **kwargs)
+        self.stats.pv = result['pv']
+        return result
+
+    def search_root(self, black_bitboard, white_bitboard, color, depth, guess=None, rotation=0):
+        stats = self.stats
+        before = {counter: getattr(stats, counter) for counter in COUNTERS}
+        nodes = self.nodes
+        probes, hits, stores = self.tt.probes, self.tt.hits, self.tt.stores
+        start_time = perf_counter()
+        completed = False
+        try:
+            result = super().search_root(black_bitboard, white_bitboard, color, depth, guess, rotation)
+            completed = True
+            return result
+        finally:
+            stats.time += perf_counter() - start_time
+            stats.nodes += self.nodes - nodes
+            stats.tt_probes += self.tt.probes - probes
+            stats.tt_hits += self.tt.hits - hits
+            stats.tt_stores += self.tt.stores - stores
+            iteration = {counter: getattr(stats, counter) - before[counter] for counter in COUNTERS}
+            iteration['depth'] = depth
+            iteration['completed'] = completed
+            stats.iterations.append(iteration)
+
+    def frontier(self, player, opponent, color, legal_moves, alpha, beta, ply, key, symmetry=0):
+        self.first_moves[ply] = None
+        return super().frontier(player, opponent, color, legal_moves, alpha, beta, ply, key, symmetry)
+
+    def order_moves(self, player, opponent, color, legal_moves, depth, ply, tt_move=NO_MOVE):
+        ordered = super().order_moves(player, opponent, color, legal_moves, depth, ply, tt_move)
+        self.first_moves[ply] = ordered[0][1]
+        return ordered
+
+    def update_cutoff(self, move, color, depth, ply):
+        first_move = self.first_moves[ply]
+        if first_move is None:
+            self.stats.frontier_cutoffs += 1
+        else:
+            self.stats.cutoffs += 1
+            if move == first_move:
+                self.stats.first_move_cutoffs += 1
+        super().update_cutoff(move, color, depth, ply)
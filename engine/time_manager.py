@@ -0,0 +1,101 @@
+"""
+Time management: how long a search may take and when it has to stop.
+
+A search gets two limits. The soft limit is checked between the iterations
+of iterative deepening: once it has passed no new iteration starts. The hard
+limit aborts the iteration in progress, which is thrown away; the search
+checks it every TIME_CHECK_INTERVAL nodes rather than at every node. With a
+game clock both limits are derived from the time remaining, the increment and
+the number of empty squares left. The endgame solver may use ENDGAME_SHARE of
+the hard limit; if it can't finish, the search that takes over gets the rest.
+"""
+from time import time
+
+from engine.settings import ENDGAME_EMPTIES
+
+
+MOVE_OVERHEAD = 0.05  # Seconds kept back per move for everything around the search
+HARD_FACTOR = 3.0  # The hard limit as a multiple of the soft budget
+MAX_CLOCK_SHARE = 0.5  # Most of the remaining time one move may use
+ENDGAME_SHARE = 0.5  # Part of the hard limit the endgame solver may use before the search takes over
+
+
+def allocate_time(remaining:float, increment:float=0.0, empties:int=60, endgame_empties:int=ENDGAME_EMPTIES):
+    """
+    Split the time left on a clock over the moves still to be played.
+    The side to move plays about half of the empty squares, but once
+    endgame_empties are left the position is solved in one go, so the moves
+    after that don't need a budget of their own.
+    Args:
+        remaining: Seconds left on the side to move's clock.
+        increment: Seconds added to the clock after every move.
+        empties: Empty squares on the board.
+        endgame_empties: Empty squares from which the position is solved exactly.
+    Returns:
+        The soft and hard limits in seconds.
+    """
+    moves_to_go = max(empties - endgame_empties, 0) // 2 + 1
+    available = max(0.0, remaining - MOVE_OVERHEAD)
+    soft = available / moves_to_go + increment
+    # The increment only arrives after the move, so it can't be spent beyond what is on the clock
+    reserve = available * MAX_CLOCK_SHARE
+    hard = min(soft * HARD_FACTOR, reserve + min(increment, available - reserve))
+    return min(soft, hard), hard
+
+
+class TimeManager:
+    """
+    The soft and hard deadlines of one search, as absolute times (as returned by time()).
+    """
+    def __init__(self, soft_limit:float=None, hard_limit:float=None):
+        """
+        Args:
+            soft_limit: Seconds from now after which no new iteration starts, or None.
+            hard_limit: Seconds from now at which the search is aborted, or None.
+        """
+        self.start_time = time()
+        self.soft_deadline = None if soft_limit is None else self.start_time + soft_limit
+        self.hard_deadline = None if hard_limit is None else self.start_time + hard_limit
+
+    @classmethod
+    def for_clock(cls, remaining:float, increment:float=0.0, empties:int=60, endgame_empties:int=ENDGAME_EMPTIES):
+        """
+        Budget a move from a game clock (see allocate_time).
+        """
+        return cls(*allocate_time(remaining, increment, empties, endgame_empties))
+
+    def elapsed(self) -> float:
+        return time() - self.start_time
+
+    def remaining(self):
+        """
+        Return the seconds left until the hard deadline, or None without one.
+        """
+        return None if self.hard_deadline is None else max(0.0, self.hard_deadline - time())
+
+    def soft_remaining(self):
+        """
+        Return the seconds left until the soft deadline, or None without one.
+        """
+        return None if self.soft_deadline is None else max(0.0, self.soft_deadline - time())
+
+    def endgame_deadline(self):
+        """
+        Return the time at which the endgame solver gives up, or None without a hard deadline.
+        """
+        if self.hard_deadline is None:
+            return None
+        return self.start_time + (self.hard_deadline - self.start_time) * ENDGAME_SHARE
+
+    def remainder(self) -> 'TimeManager':
+        """
+        Plan the rest of the move for a search that takes over from the endgame
+        solver: the time left until the hard deadline, with the soft limit the
+        same share of it as in this plan.
+        """
+        hard_limit = self.remaining()
+        if hard_limit is None or self.soft_deadline is None:
+            return TimeManager(self.soft_remaining(), hard_limit)
+        budget = self.hard_deadline - self.start_time
+        share = (self.soft_deadline - self.start_time) / budget if budget > 0 else 1.0
+        return TimeManager(hard_limit * share, hard_limit)
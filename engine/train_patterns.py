@@ -0,0 +1,167 @@
+"""
+Fit the pattern evaluation weights to a set of scored positions.
+
+Positions come from a file with one '<fen> <score>' line per position (score
+from black's point of view, in discs), from self-play games labelled with
+their final disc difference (with the last empties played perfectly), or both. Each phase is fitted separately by
+gradient descent on the squared error, with every weight's step scaled by
+how often it occurs, so rare configurations don't swing the fit.
+
+Usage: py -m engine.train_patterns [--games 4000] [--data FILE] [--save-data FILE] [--epochs 50] [--output FILE]
+"""
+import argparse
+from random import Random
+from time import time
+
+import numpy as np
+
+from othello.bitboard import (
+    START_BLACK, START_WHITE, find_legal_moves_bitboard, make_move_bitboard, fen_to_bitboard, bitboard_to_fen
+)
+from engine.evaluation import evaluate
+from engine.endgame import EndgameSolver, count_empties, final_difference
+from engine.patterns import PatternEvaluator, feature_indices, PHASE_COUNT, FEATURE_COUNT, PATTERN_WEIGHTS_FILE
+
+
+MIN_COUNT = 8  # Weights seen fewer times than this take proportionally smaller steps
+
+
+def self_play_games(count, seed=1, random_moves=8, epsilon=0.02, solve_empties=10):
+    """
+    Play games where each side takes the move with the best static evaluation.
+    The first random_moves moves, and later moves with probability epsilon, are
+    random instead, and from solve_empties empty squares on both sides play
+    perfectly, so the last positions of each game are labelled exactly.
+    Returns:
+        Black bitboards, white bitboards and the final disc difference (black's
+        point of view, empty squares to the winner) of every position played.
+    """
+    rng = Random(seed)
+    solver = EndgameSolver()
+    blacks, whites, scores = [], [], []
+    for _ in range(count):
+        black, white, color = START_BLACK, START_WHITE, 'b'
+        start = len(blacks)
+        while True:
+            legal_moves = find_legal_moves_bitboard(black, white, color)
+            if not legal_moves:
+                color = 'w' if color == 'b' else 'b'
+                legal_moves = find_legal_moves_bitboard(black, white, color)
+                if not legal_moves:
+                    break
+            blacks.append(black)
+            whites.append(white)
+            moves = [1 << square for square in range(64) if legal_moves >> square & 1]
+            if count_empties(black, white) <= solve_empties:
+                move, _ = solver.solve(black, white, color)
+            elif len(blacks) - start < random_moves or rng.random() < epsilon:
+                move = rng.choice(moves)
+            else:
+                sign = 1 if color == 'b' else -1
+                move = max(moves, key=lambda move: sign * evaluate(*make_move_bitboard(black, white, color, move)))
+            black, white = make_move_bitboard(black, white, color, move)
+            color = 'w' if color == 'b' else 'b'
+        scores.extend([final_difference(black, white)] * (len(blacks) - start))
+    return blacks, whites, scores
+
+def read_positions(path):
+    blacks, whites, scores = [], [], []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            fen, score = line.split()
+            black, white = fen_to_bitboard(fen)
+            blacks.append(black)
+            whites.append(white)
+            scores.append(float(score))
+    return blacks, whites, scores
+
+def write_positions(path, blacks, whites, scores):
+    with open(path, 'w') as f:
+        f.writelines(f'{bitboard_to_fen(black, white)} {score}\n' for black, white, score in zip(blacks, whites, scores))
+
+def fit(indices, phases, scores, epochs=50, learning_rate=1.0):
+    """
+    Fit one weight vector per phase.
+    Positions from the neighbouring phases are included with the phase's own,
+    which smooths the tables of sparsely covered phases.
+    Args:
+        indices: (n, features per position) array from feature_indices.
+        phases: (n,) array of phases.
+        scores: (n,) array of target scores.
+        epochs: Gradient descent iterations per phase.
+        learning_rate: Step size, relative to the number of features per position.
+    Returns:
+        A (PHASE_COUNT, FEATURE_COUNT) float32 array.
+    """
+    weights = np.zeros((PHASE_COUNT, FEATURE_COUNT), dtype=np.float32)
+    features = indices.shape[1]
+    for phase in range(PHASE_COUNT):
+        selected = np.abs(phases - phase) <= 1
+        phase_indices = indices[selected]
+        phase_scores = scores[selected]
+        if not len(phase_scores):
+            continue
+        flat = phase_indices.ravel()
+        counts = np.bincount(flat, minlength=FEATURE_COUNT)
+        step = learning_rate / features / np.maximum(counts, MIN_COUNT)
+        w = np.zeros(FEATURE_COUNT)
+        for _ in range(epochs):
+            error = phase_scores - w[phase_indices].sum(axis=1)
+            w += step * np.bincount(flat, weights=np.repeat(error, features), minlength=FEATURE_COUNT)
+        error = phase_scores - w[phase_indices].sum(axis=1)
+        print(f'phase {phase}: {len(phase_scores)} positions, rms error {np.sqrt(np.mean(error ** 2)):.2f}')
+        weights[phase] = w
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--games', type=int, default=4000, help='Self-play games to generate')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--random-moves', type=int, default=8, help='Random moves at the start of each self-play game')
+    parser.add_argument('--epsilon', type=float, default=0.02, help='Chance of a random move later in self-play')
+    parser.add_argument('--solve-empties', type=int, default=10, help='Play perfectly from this many empty squares')
+    parser.add_argument('--data', help='File of "<fen> <score>" lines to train on')
+    parser.add_argument('--save-data', help='Write the training positions to this file')
+    parser.add_argument('--epochs', type=int, default=50)
+    parser.add_argument('--learning-rate', type=float, default=1.0)
+    parser.add_argument('--validation', type=float, default=0.1, help='Share of positions held out to measure the fit')
+    parser.add_argument('--output', default=PATTERN_WEIGHTS_FILE)
+    args = parser.parse_args()
+
+    start_time = time()
+    blacks, whites, scores = [], [], []
+    if args.data:
+        blacks, whites, scores = read_positions(args.data)
+    if args.games:
+        games = self_play_games(args.games, args.seed, args.random_moves, args.epsilon, args.solve_empties)
+        blacks += games[0]
+        whites += games[1]
+        scores += games[2]
+    print(f'{len(scores)} positions in {time() - start_time:.1f}s')
+    if args.save_data:
+        write_positions(args.save_data, blacks, whites, scores)
+
+    # The last positions (whole games for self-play data) are held out
+    split = len(scores) - int(len(scores) * args.validation)
+    black_array = np.array(blacks, dtype=np.uint64)
+    white_array = np.array(whites, dtype=np.uint64)
+    score_array = np.array(scores, dtype=np.float64)
+
+    # Every position also counts with the colors swapped
+    indices, phases = feature_indices(np.concatenate((black_array[:split], white_array[:split])),
+                                      np.concatenate((white_array[:split], black_array[:split])))
+    weights = fit(indices, phases, np.concatenate((score_array[:split], -score_array[:split])),
+                  args.epochs, args.learning_rate)
+    evaluator = PatternEvaluator(weights)
+    if split < len(scores):
+        error = score_array[split:] - evaluator.evaluate_batch(black_array[split:], white_array[split:])
+        print(f'validation: {len(scores) - split} positions, rms error {np.sqrt(np.mean(error ** 2)):.2f}')
+    evaluator.save(args.output)
+    print(f'Saved weights to {args.output} in {time() - start_time:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
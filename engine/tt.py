@@ -0,0 +1,138 @@
+import struct
+
+EXACT = 0
+LOWER = 1  # Score is a lower bound (the search failed high)
+UPPER = 2  # Score is an upper bound (the search failed low)
+NO_MOVE = 64
+
+ENTRY_SIZE = 24  # Verification key, score and packed data, 8 bytes each
+MAX_DEPTH = 254
+DOUBLE = struct.Struct('=d')
+BITS = struct.Struct('=Q')
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table stored in three flat arrays.
+    Entries live in buckets of two slots: the first slot keeps the deepest
+    result (unless it is from an older search), the second is always replaced.
+    Scores are kept as the bit patterns of their doubles, and each slot
+    stores key ^ data ^ score so an entry torn by another process writing the
+    same slot, or a colliding key, fails verification instead of returning
+    another position's result.
+    """
+    def __init__(self, size_mb:float=16, buffer=None):
+        self.entries = table_entries(size_mb)
+        if buffer is None:
+            buffer = bytearray(self.entries * ENTRY_SIZE)
+        self.buffer = buffer
+        self.view = view = memoryview(buffer)
+        n = self.entries * 8
+        self.keys = view[:n].cast('Q')
+        self.scores = view[n:2 * n].cast('Q')
+        self.data = view[2 * n:3 * n].cast('Q')
+        self.index_mask = (self.entries - 1) & ~1  # First slot of a bucket
+        self.generation = 0
+        self.reset_stats()
+
+    @property
+    def size_mb(self) -> float:
+        return self.entries * ENTRY_SIZE / 2**20
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.collisions = 0
+
+    def stats(self) -> dict:
+        return {
+            'entries': self.entries,
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+            'stores': self.stores,
+            'collisions': self.collisions,
+        }
+
+    def usage(self, sample:int=4096) -> float:
+        """
+        Estimate the share of slots in use from the first sample slots.
+        """
+        sample = min(sample, self.entries)
+        return sum(1 for slot in range(sample) if self.data[slot]) / sample
+
+    def new_search(self):
+        # Entries from earlier searches become the first to be replaced
+        self.generation = (self.generation + 1) & 255
+
+    def clear(self):
+        n = self.entries * 8
+        self.view[:3 * n] = bytes(3 * n)
+        self.generation = 0
+        self.reset_stats()
+
+    def close(self):
+        # Release the views so a shared memory buffer can be closed
+        for view in (self.keys, self.scores, self.data, self.view):
+            view.release()
+
+    def probe(self, key:int):
+        """
+        Look up a position.
+        Args:
+            key: The Zobrist key of the position.
+        Returns:
+            (score, depth, bound, move) or None if the position isn't stored.
+        """
+        self.probes += 1
+        index = key & self.index_mask
+        for slot in (index, index + 1):
+            data = self.data[slot]
+            score = self.scores[slot]
+            if data and self.keys[slot] ^ data ^ score == key:
+                self.hits += 1
+                # The verified bits are turned into the score, rather than reading it again
+                return DOUBLE.unpack(BITS.pack(score))[0], (data & 255) - 1, data >> 8 & 3, data >> 10 & 127
+        if self.data[index] or self.data[index + 1]:
+            self.collisions += 1
+        return None
+
+    def store(self, key:int, depth:int, score:float, bound:int, move:int=NO_MOVE):
+        """
+        Store a search result.
+        Args:
+            key: The Zobrist key of the position.
+            depth: The remaining depth the score was searched to.
+            score: The score of the position.
+            bound: EXACT, LOWER or UPPER.
+            move: The square index of the best move, or NO_MOVE.
+        """
+        self.stores += 1
+        index = key & self.index_mask
+        slot = index + 1
+        for candidate in (index, index + 1):
+            data = self.data[candidate]
+            if data and self.keys[candidate] ^ data ^ self.scores[candidate] == key:
+                slot = candidate
+                if move == NO_MOVE:
+                    move = data >> 10 & 127  # Keep the best move of a shallower result
+                break
+        else:
+            data = self.data[index]
+            if not data or (data >> 17) != self.generation or depth + 1 >= (data & 255):
+                slot = index
+
+        data = min(depth, MAX_DEPTH) + 1 | bound << 8 | move << 10 | self.generation << 17
+        score = BITS.unpack(DOUBLE.pack(score))[0]
+        self.scores[slot] = score
+        self.data[slot] = data
+        self.keys[slot] = key ^ data ^ score
+
+
+def table_entries(size_mb:float) -> int:
+    """
+    Return the number of entries (a power of two, at least one bucket) that fit in size_mb.
+    """
+    entries = max(2, int(size_mb * 2**20) // ENTRY_SIZE)
+    return 1 << (entries.bit_length() - 1)
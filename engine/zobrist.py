@@ -0,0 +1,44 @@
+from random import Random
+
+
+ZOBRIST_SEED = 0x5EED0CE110  # Fixed so hashes are stable between runs and processes
+
+def create_zobrist_tables(seed:int=ZOBRIST_SEED):
+    """
+    Create Zobrist keys for every (color, square) pair, folded into byte tables.
+    Each table maps the value of one 8-square row to the XOR of the keys of the
+    squares set in it, so a full hash costs 16 lookups instead of 64.
+    Returns:
+        Black's byte tables, white's byte tables and the key for white to move.
+    """
+    rng = Random(seed)
+    square_keys = [[rng.getrandbits(64) for _ in range(64)] for _ in range(2)]
+    tables = []
+    for keys in square_keys:
+        rows = []
+        for row in range(8):
+            table = [0] * 256
+            for value in range(1, 256):
+                low = value & -value
+                table[value] = table[value ^ low] ^ keys[row * 8 + low.bit_length() - 1]
+            rows.append(tuple(table))
+        tables.append(tuple(rows))
+    return tables[0], tables[1], rng.getrandbits(64)
+
+BLACK_KEYS, WHITE_KEYS, WHITE_TO_MOVE_KEY = create_zobrist_tables()
+_B0, _B1, _B2, _B3, _B4, _B5, _B6, _B7 = BLACK_KEYS
+_W0, _W1, _W2, _W3, _W4, _W5, _W6, _W7 = WHITE_KEYS
+
+def zobrist_hash(black_bitboard:int, white_bitboard:int, color) -> int:
+    """
+    Hash a position, including the side to move, into a 64-bit Zobrist key.
+    """
+    h = (_B0[black_bitboard & 255] ^ _B1[black_bitboard >> 8 & 255] ^ _B2[black_bitboard >> 16 & 255]
+         ^ _B3[black_bitboard >> 24 & 255] ^ _B4[black_bitboard >> 32 & 255] ^ _B5[black_bitboard >> 40 & 255]
+         ^ _B6[black_bitboard >> 48 & 255] ^ _B7[black_bitboard >> 56]
+         ^ _W0[white_bitboard & 255] ^ _W1[white_bitboard >> 8 & 255] ^ _W2[white_bitboard >> 16 & 255]
+         ^ _W3[white_bitboard >> 24 & 255] ^ _W4[white_bitboard >> 32 & 255] ^ _W5[white_bitboard >> 40 & 255]
+         ^ _W6[white_bitboard >> 48 & 255] ^ _W7[white_bitboard >> 56])
+    if color == 'w':
+        h ^= WHITE_TO_MOVE_KEY
+    return h
@@ -4,11 +4,15 @@ from time import time
 
 from othello.game import Game
 from othello.move import Move
+from othello.bitboard import notation_to_square
+from othello.pgn import read_game
 
 from options import options
 from settings_info import settings
 
 from engine.engine import *
+from engine.profiling import profile_search, write_collapsed, format_top, SAMPLING, SAMPLE_INTERVAL
+from engine.session import Engine
 
 
 class Runner:
@@ -17,23 +21,35 @@ class Runner:
         self.initialized = False
         self.playing = False
 
+        # The search state kept between moves: table, caches, worker processes and pondering.
+        # Created on first use, so importing or constructing a Runner starts no processes.
+        self._engine = None
+
         # Settings
         self.init_settings()
 
         if self.settings.get('auto_start_game'):
             self.new_game()
     
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            self._engine = Engine()
+        return self._engine
+
     def exit(self):
+        if self._engine is not None:
+            self._engine.close()
         with open('settings.json', 'w') as f:
             json.dump(self.settings, f)
         quit()
 
     def init_settings(self):
+        self.settings = {key: settings[key].get('default') for key in settings.keys()}
         if os.path.exists('settings.json'):
+            # Settings added since the file was saved keep their defaults
             with open('settings.json') as f:
-                self.settings = json.load(f)
-        else:
-            self.settings = {key: settings[key].get('default') for key in settings.keys()}
+                self.settings.update(json.load(f))
 
     def enable(self, **kwargs):
         for key in self.settings.keys():
@@ -51,21 +67,36 @@ class Runner:
         else:
             color = 'b'
 
-        pgn = kwargs.get('pgn', None)
-        if pgn is not None:
+        fen = kwargs.get('fen', None)
+        path = kwargs.get('pgn', None)
+        if path is not None:
+            # Files can hold many games; only the one asked for is played
+            index = int(kwargs.get('game', 1)) - 1
             try:
-                with open(pgn) as f:
-                    pgn = f.read()
-            except Exception as e:
+                game = read_game(path, index)
+            except OSError as e:
                 print(e)
+                return
+            if game is None:
+                print(f'{path} has no game {index + 1}.')
+                return
+            if fen is not None:
+                game.board.set_position(fen)
+                game.update_counts()
+                game.start_color = color
+                game.set_side_to_move(color)
+        else:
+            game = Game(None, fen, color)
 
-        fen = kwargs.get('fen', None)
-        self.game = Game(pgn, fen, color)
+        if self._engine is not None:
+            self._engine.new_game()
+        self.game = game
         self.initialized = True
-        self.playing = True
+        self.playing = not game.game_over
 
         print('New game started.')
         self.auto_display()
+        self.start_pondering()
 
     def ai_move(self, **kwargs):
         if not self.initialized:
@@ -76,12 +107,108 @@ class Runner:
             return
         
         depth = int(kwargs.get('depth', 6))
-        time_limit = float(kwargs.get('time', 999))
+        time_limit = float(kwargs['time']) if 'time' in kwargs else None
+        clock = None
+        if 'remaining' in kwargs:
+            clock = (float(kwargs['remaining']), float(kwargs.get('increment', 0)))
+        hash_size = float(kwargs['hash']) if 'hash' in kwargs else None
+        workers = int(kwargs['workers']) if 'workers' in kwargs else None
+        endgame_empties = int(kwargs.get('endgame', ENDGAME_EMPTIES))
+        endgame_mode = WLD_MODE if kwargs.get('wld', False) else EXACT_MODE
+        eval_cache_size = int(kwargs.get('cache', EVAL_CACHE_SIZE))
+        evaluator = kwargs.get('eval', DEFAULT_EVALUATOR)
+        symmetry = kwargs.get('symmetry', False)
+        if symmetry and evaluator not in SYMMETRIC_EVALUATORS:
+            print(f'The {evaluator} evaluator isn\'t symmetric, searching without -symmetry.')
+            symmetry = False
+        book = None if kwargs.get('nobook', False) else kwargs.get('book', BOOK_FILE)
+        verbose = kwargs.get('verbose', False)
+        as_json = kwargs.get('json', False)
+        self.engine.configure(hash_size, workers, eval_cache_size, evaluator, symmetry)
         start_time = time()
-        result = ai_move_iterative(self.game.board, self.game.color, depth, time_limit)
+        result = self.engine.search(self.game.board, self.game.color, depth, time_limit, endgame_empties,
+                                    endgame_mode, book, verbose or as_json, clock)
         execution_time = time() - start_time
 
-        print(f'The computer on depth={depth} recommends {result[0]} [{str(result[1])[:5]}]\nExecution time: {execution_time}')
+        info = result[2]
+        if self.settings.get('ponder'):
+            info['ponder'] = self.engine.ponderer.report()
+        self.start_pondering()
+        if as_json:
+            report = {'move': result[0], 'score': result[1], 'time': execution_time, **info}
+            if 'stats' in info:
+                report['stats'] = info['stats'].to_dict()
+            print(json.dumps(report, indent=2))
+            return
+        for iteration in info.get('iterations', []):
+            print(f'\tdepth={iteration['depth']} {iteration['move']} [{str(iteration['score'])[:5]}] '
+                  f'nodes={iteration['nodes']} time={iteration['time']:.3f}s')
+        if info.get('book'):
+            print(f'The computer plays {result[0]} from the book ({info['book']['games']} games, value {info['book']['value']:.3f})\nExecution time: {execution_time}')
+        elif info.get('endgame'):
+            print(f'The computer solved the endgame ({info['endgame']}) and recommends {result[0]} [{result[1]}]\nExecution time: {execution_time}')
+        else:
+            print(f'The computer on depth={info['depth']} recommends {result[0]} [{str(result[1])[:5]}]\nExecution time: {execution_time}')
+        if info.get('eval_cache'):
+            cache = info['eval_cache']
+            print(f'Evaluation cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.1%})')
+        if verbose and 'stats' in info:
+            print_search_stats(info['stats'])
+        if info.get('ponder'):
+            ponder = info['ponder']
+            print(f'Pondering: {ponder['hits']} hits, {ponder['misses']} misses ({ponder['hit_rate']:.1%}), '
+                  f'{ponder['reuses']} reused, {ponder['nodes']} nodes in {ponder['ponders']} searches')
+
+    def position(self):
+        return self.game.board.black, self.game.board.white, self.game.color
+
+    def start_pondering(self):
+        # Positions the endgame solver takes over aren't worth pondering: it keeps its own table
+        if not self.settings.get('ponder') or not self.playing:
+            return
+        board = self.game.board
+        if count_empties(board.black, board.white) <= ENDGAME_EMPTIES:
+            return
+        self.engine.start_pondering(board, self.game.color)
+
+    def stop_pondering(self):
+        if self._engine is None:
+            return None, None
+        return self._engine.stop_pondering()
+
+    def hash(self, **kwargs):
+        if 'size' in kwargs:
+            self.engine.resize(float(kwargs['size']))
+        if kwargs.get('clear', False):
+            self.engine.clear()
+        info = self.engine.info()
+        print(f'Transposition table: {info['hash_size']:.1f} MB, {info['entries']} entries, '
+              f'{info['usage']:.1%} used, generation {info['generation']}, {info['workers']} worker(s)')
+        if info.get('eval_cache'):
+            cache = info['eval_cache']
+            print(f'Evaluation cache: {cache['size']} entries, {cache['hits']} hits, {cache['misses']} misses '
+                  f'({cache['hit_rate']:.1%})')
+
+    def profile(self, **kwargs):
+        if not self.initialized:
+            print('Game not initialized. Try using \'new-game\' first.')
+            return
+
+        depth = int(kwargs.get('depth', 6))
+        mode = kwargs.get('mode', SAMPLING)
+        interval = float(kwargs.get('interval', SAMPLE_INTERVAL))
+        evaluator = kwargs.get('eval', DEFAULT_EVALUATOR)
+        top = int(kwargs.get('top', 20))
+        output = kwargs.get('output', None)
+        self.stop_pondering()
+        profile = profile_search(self.game.board, self.game.color, depth, mode, interval, evaluator=evaluator)
+        self.start_pondering()
+        move, score, info = profile['result']
+        print(f'The computer on depth={info['depth']} recommends {move} [{str(score)[:5]}]')
+        print(format_top(profile['stacks'], profile['unit'], top))
+        if output is not None:
+            write_collapsed(profile['stacks'], output)
+            print(f'Collapsed stacks written to {output}')
 
     def auto_display(self):
         if self.settings.get('auto_display_board'):
@@ -105,6 +232,9 @@ class Runner:
             print('Game over. Use \'new-game\' to start a new game.')
             return
         
+        pondered, predicted = self.stop_pondering()
+        position = self.position()
+        move_count = len(self.game.board.moves)
         if 'color' in kwargs.keys():
             for key in kwargs.keys():
                 if key == 'color':
@@ -113,13 +243,41 @@ class Runner:
         else:
             for key in kwargs.keys():
                 result = self.game.make_move(key)
+        if pondered == position and len(self.game.board.moves) > move_count:
+            # Did the ponder search predict the move that was played?
+            played = 1 << notation_to_square(self.game.board.moves[move_count].notation)
+            self.engine.record_ponder(predicted == played)
         if not result:
             print('Illegal move')
+            self.start_pondering()
             return
         if self.game.game_over:
             self.game_over()
         self.auto_display()
         print(f'{['Black', 'White']['bw'.find(self.game.color)]} to move...')
+        self.start_pondering()
+
+    def undo(self, **kwargs):
+        self.step_moves(self.game.undo if self.initialized else None, int(kwargs.get('count', 1)), 'taken back')
+
+    def redo(self, **kwargs):
+        self.step_moves(self.game.redo if self.initialized else None, int(kwargs.get('count', 1)), 'replayed')
+
+    def step_moves(self, step, count, label):
+        if step is None:
+            print('Game not initialized. Try using \'new-game\' first.')
+            return
+        self.stop_pondering()
+        steps = 0
+        while steps < count and step():
+            steps += 1
+        if steps == 0:
+            print(f'No move to be {label}.')
+        else:
+            self.playing = not self.game.game_over
+            self.auto_display()
+            print(f'{steps} move(s) {label}. {['Black', 'White']['bw'.find(self.game.color)]} to move...')
+        self.start_pondering()
 
     def resign(self, **kwargs):
         if not self.initialized:
@@ -131,6 +289,7 @@ class Runner:
             winner = ['black', 'white']['wb'.find(self.game.color)]
         self.game.result = f'{winner} wins by resignation'
         self.playing = False
+        self.stop_pondering()
         self.print_result()
         self.auto_display()
 
@@ -140,6 +299,7 @@ class Runner:
             return
         self.game.result = 'draw'
         self.playing = False
+        self.stop_pondering()
         self.print_result()
         self.auto_display()
     
@@ -161,6 +321,15 @@ class Runner:
             self.game.print_pgn()
 
 
+def print_search_stats(stats):
+    stats = stats.to_dict()
+    print('\tdepth      nodes      evals  tt hits  cutoffs  first    nodes/s  eval time')
+    for row in stats['iterations'] + [dict(stats['total'], depth='total', completed=True)]:
+        depth = row['depth'] if row['completed'] else f'{row['depth']}*'
+        print(f'\t{depth:>5} {row['nodes']:>10} {row['evals']:>10} {row['tt_hit_rate']:>8.1%} {row['cutoffs']:>8} '
+              f'{row['first_move_cutoff_rate']:>6.1%} {row['nps']:>10.0f} {row['eval_time_share']:>10.1%}')
+    print(f'\tPrincipal variation: {' '.join(stats['pv'])}')
+
 def print_help(command:str=None):
     s = ''
     if command is None:
@@ -185,45 +354,49 @@ def print_settings(settings_dict):
         s += f'\tfunction: {settings[key].get('hint')}\n'
     print(s)
 
-print('Welcome to the python-othello interface!\nType \'help\' to learn how to use the program.')
-runner = Runner()
-while True:
-    text = input('> ')
-    command = text.split()
-    key = command[0]
-    args = command[1:]
-
-    try:
-        if key == 'help':
-            print_help()
-            continue
-        elif key == 'settings':
-            print_settings(runner.settings)
+def main():
+    print('Welcome to the python-othello interface!\nType \'help\' to learn how to use the program.')
+    runner = Runner()
+    while True:
+        text = input('> ')
+        command = text.split()
+        key = command[0]
+        args = command[1:]
+
+        try:
+            if key == 'help':
+                print_help()
+                continue
+            elif key == 'settings':
+                print_settings(runner.settings)
+                continue
+            else:
+                func_name = options[key]['function']
+                func = getattr(runner, options[key]['function'])
+        except Exception as e:
+            print(f'{key} is not a valid command.')
             continue
-        else:
-            func_name = options[key]['function']
-            func = getattr(runner, options[key]['function'])
-    except Exception as e:
-        print(f'{key} is not a valid command.')
-        continue
-
-    kwargs = {}
-    index = 0
-    while index < len(args):
-        arg_value = True
-        if args[index].find('-') == 0: # key
-            if args[index].find('--') == 0: # arg is string
-                arg_value = args[index+1]
-        
-        arg_name = args[index].lstrip('-')
-        kwargs[arg_name] = arg_value
 
-        if args[index].find('--') == 0:
-            index += 2
-        else:
-            index += 1
-    try:
-        func(**kwargs)
-    except Exception as e:
-        print(e)
-    
\ No newline at end of file
+        kwargs = {}
+        index = 0
+        while index < len(args):
+            arg_value = True
+            if args[index].find('-') == 0: # key
+                if args[index].find('--') == 0: # arg is string
+                    arg_value = args[index+1]
+
+            arg_name = args[index].lstrip('-')
+            kwargs[arg_name] = arg_value
+
+            if args[index].find('--') == 0:
+                index += 2
+            else:
+                index += 1
+        try:
+            func(**kwargs)
+        except Exception as e:
+            print(e)
+
+
+if __name__ == '__main__':
+    main()
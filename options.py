@@ -13,7 +13,11 @@ options = {
         'arguments': [
             {
                 'label': '--pgn',
-                'usage': 'Initialize a game with a pgn.'
+                'usage': 'Initialize a game with a pgn file.'
+            },
+            {
+                'label': '--game',
+                'usage': 'Which game of the pgn file to load. (Default is 1)'
             },
             {
                 'label': '--fen',
@@ -45,7 +49,123 @@ options = {
             },
             {
                 'label': '--time',
-                'usage': 'Maximum execution time'
+                'usage': 'Maximum search time in seconds; the iteration in progress is discarded when it runs out. (Default is no limit)'
+            },
+            {
+                'label': '--remaining',
+                'usage': 'Seconds left on the clock of the side to move; the search budgets its time from it and the empty squares.'
+            },
+            {
+                'label': '--increment',
+                'usage': 'Seconds added to the clock per move, used with --remaining. (Default is 0)'
+            },
+            {
+                'label': '--hash',
+                'usage': 'Transposition table size in MB, kept for later moves. (Default is 16)'
+            },
+            {
+                'label': '--workers',
+                'usage': 'Number of worker processes sharing the search, kept for later moves. (Default is 1)'
+            },
+            {
+                'label': '--endgame',
+                'usage': 'Solve the position exactly with at most this many empty squares. (Default is 12)'
+            },
+            {
+                'label': '-wld',
+                'usage': 'Only solve endgames for win/loss/draw instead of the exact disc difference.'
+            },
+            {
+                'label': '--cache',
+                'usage': 'Evaluation cache size in entries, 0 to disable. (Default is 262144)'
+            },
+            {
+                'label': '--eval',
+                'usage': 'Evaluation function: classic, table or pattern (needs numpy). (Default is classic)'
+            },
+            {
+                'label': '-symmetry',
+                'usage': 'Share table and cache entries between rotated and mirrored positions (table and pattern evaluators only).'
+            },
+            {
+                'label': '--book',
+                'usage': 'Opening book file. (Default is book.bin, built with py -m engine.book build)'
+            },
+            {
+                'label': '-nobook',
+                'usage': 'Search even if the position is in the opening book.'
+            },
+            {
+                'label': '-verbose',
+                'usage': 'Print search statistics per iteration: nodes, evaluations, table hit rate, cutoffs and speed.'
+            },
+            {
+                'label': '-json',
+                'usage': 'Print the result, search report and statistics as JSON.'
+            }
+        ]
+    },
+    'profile': {
+        'function': 'profile',
+        'usage': 'Profile a search of the current position and print the functions taking the most time.',
+        'arguments': [
+            {
+                'label': '--depth',
+                'usage': 'Search depth. (Default is 6)'
+            },
+            {
+                'label': '--mode',
+                'usage': 'sampling (low overhead) or deterministic (every call, slower). (Default is sampling)'
+            },
+            {
+                'label': '--interval',
+                'usage': 'Seconds between samples in sampling mode. (Default is 0.001)'
+            },
+            {
+                'label': '--eval',
+                'usage': 'Evaluation function: classic, table or pattern (needs numpy). (Default is classic)'
+            },
+            {
+                'label': '--top',
+                'usage': 'Number of functions to list. (Default is 20)'
+            },
+            {
+                'label': '--output',
+                'usage': 'Write collapsed stacks for flamegraph tools to this file.'
+            }
+        ]
+    },
+    'undo': {
+        'function': 'undo',
+        'usage': 'Take back the last move.',
+        'arguments': [
+            {
+                'label': '--count',
+                'usage': 'Take back this many moves. (Default is 1)'
+            }
+        ]
+    },
+    'redo': {
+        'function': 'redo',
+        'usage': 'Replay a move that was taken back.',
+        'arguments': [
+            {
+                'label': '--count',
+                'usage': 'Replay this many moves. (Default is 1)'
+            }
+        ]
+    },
+    'hash': {
+        'function': 'hash',
+        'usage': 'Display the transposition table kept between moves.',
+        'arguments': [
+            {
+                'label': '--size',
+                'usage': 'Resize the table to this many MB, dropping its entries.'
+            },
+            {
+                'label': '-clear',
+                'usage': 'Clear the table and the evaluation cache.'
             }
         ]
     },
@@ -0,0 +1,241 @@
+"""
+Binary game archive: many games in one file, any of them readable without parsing the others.
+
+Every move is one byte: the square index (a1 = 0, h8 = 63), with PASS_FLAG
+set when the mover's opponent had to pass first, so the colors of the moves
+are known without replaying them. A file is laid out as
+
+    header: magic, record size, game count, offset of the record table
+    for every game, its moves and then its headers as UTF-8 'key<TAB>value' lines
+    the record table: one fixed-size record per game
+
+and is read through mmap, so fetching a game is one record lookup and two slices.
+
+Usage:
+    py -m othello.archive pack GAMES.pgn [GAMES.pgn ...] --output games.oga
+    py -m othello.archive unpack games.oga --output games.pgn
+    py -m othello.archive show games.oga [--game 1]
+"""
+import argparse
+import mmap
+import struct
+
+from othello.bitboard import (
+    START_BLACK, START_WHITE, find_legal_moves_bitboard, make_move_bitboard, notation_to_square
+)
+from othello.game import Game, write_pgns
+from othello.move import Move
+from othello.pgn import read_pgn, SQUARE_NAMES
+
+
+MAGIC = b'OGA1'
+HEADER = struct.Struct('<4sIQQ')  # Magic, record size, game count, record table offset
+RECORD = struct.Struct('<QQIHBB')  # Moves offset, headers offset, headers length, move count, black discs, white discs
+PASS_FLAG = 0x40
+SQUARE_MASK = 0x3F
+
+
+class GameArchive:
+    """
+    Read-only view of an archive file. The file is mapped, not loaded.
+    """
+    def __init__(self, path:str):
+        """
+        Raises:
+            OSError: If the file can't be opened.
+            ValueError: If the file isn't a game archive.
+        """
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, record_size, count, table = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or record_size != RECORD.size or table + count * RECORD.size > len(self.map):
+            self.map.close()
+            raise ValueError(f'{path} is not a game archive')
+        self.count = count
+        self.table = table
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.metadata(index), self.moves(index)
+
+    def close(self):
+        self.map.close()
+
+    def record(self, index:int):
+        """
+        Returns:
+            The (moves offset, headers offset, headers length, move count, black discs, white discs) of a game.
+        Raises:
+            IndexError: If there is no game at index.
+        """
+        if not 0 <= index < self.count:
+            raise IndexError(f'No game {index} in an archive of {self.count}')
+        return RECORD.unpack_from(self.map, self.table + index * RECORD.size)
+
+    def moves(self, index:int) -> bytes:
+        """
+        Return the encoded moves of a game, one byte each (see PASS_FLAG).
+        """
+        offset, _, _, move_count, _, _ = self.record(index)
+        return self.map[offset:offset + move_count]
+
+    def metadata(self, index:int) -> dict:
+        _, offset, length, _, _, _ = self.record(index)
+        return decode_metadata(self.map[offset:offset + length])
+
+    def score(self, index:int) -> tuple[int, int]:
+        # The final disc counts, black's first
+        return self.record(index)[4:]
+
+    def game(self, index:int) -> Game:
+        """
+        Return a game with its moves played.
+        """
+        game = Game()
+        game.metadata = self.metadata(index)
+        for move in self.moves(index):
+            game.make_move(SQUARE_NAMES[move & SQUARE_MASK])
+        return game
+
+
+def encode_moves(moves:bytes):
+    """
+    Replay a compact move list (see othello.pgn) from the start position,
+    stopping at the first illegal move like create_board, and flag the moves
+    that follow a pass.
+    Returns:
+        The encoded moves and the final black and white disc counts.
+    """
+    black, white, color = START_BLACK, START_WHITE, 'b'
+    encoded = bytearray()
+    for square in moves:
+        flag = 0
+        if not find_legal_moves_bitboard(black, white, color):
+            color = 'w' if color == 'b' else 'b'
+            flag = PASS_FLAG
+        move = 1 << square
+        if not find_legal_moves_bitboard(black, white, color) & move:
+            break
+        encoded.append(square | flag)
+        black, white = make_move_bitboard(black, white, color, move)
+        color = 'w' if color == 'b' else 'b'
+    return bytes(encoded), black.bit_count(), white.bit_count()
+
+def decode_moves(encoded:bytes) -> list[Move]:
+    """
+    Turn encoded moves into Move objects, the colors following from the pass flags.
+    """
+    moves = []
+    color = 'b'
+    for move in encoded:
+        if move & PASS_FLAG:
+            color = 'w' if color == 'b' else 'b'
+        moves.append(Move(SQUARE_NAMES[move & SQUARE_MASK], color))
+        color = 'w' if color == 'b' else 'b'
+    return moves
+
+def encode_metadata(metadata:dict) -> bytes:
+    lines = [key if value is None else f'{key}\t{value}' for key, value in metadata.items()]
+    return '\n'.join(lines).encode('utf-8')
+
+def decode_metadata(data:bytes) -> dict:
+    metadata = {}
+    if not data:
+        return metadata
+    for line in data.decode('utf-8').split('\n'):
+        key, tab, value = line.partition('\t')
+        metadata[key] = value if tab else None
+    return metadata
+
+
+def write_archive(games, path:str) -> int:
+    """
+    Write games to an archive file. Every game is written as it comes, so the
+    games can be streamed from read_pgn; only the records are kept until the end.
+    Args:
+        games: An iterable of Game objects or (metadata, compact moves) pairs as read_pgn yields them.
+        path: The archive file to write.
+    Returns:
+        The number of games written.
+    """
+    records = []
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, RECORD.size, 0, 0))
+        for game in games:
+            if isinstance(game, Game):
+                metadata = game.metadata
+                encoded, black_discs, white_discs = encode_game(game)
+            else:
+                metadata = game[0]
+                encoded, black_discs, white_discs = encode_moves(game[1])
+            text = encode_metadata(metadata)
+            offset = f.tell()
+            records.append(RECORD.pack(offset, offset + len(encoded), len(text), len(encoded), black_discs, white_discs))
+            f.write(encoded)
+            f.write(text)
+        table = f.tell()
+        f.writelines(records)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, RECORD.size, len(records), table))
+    return len(records)
+
+def encode_game(game:Game):
+    # A Game's moves carry their colors, so the passes are read off them
+    encoded = bytearray()
+    last_color = 'w'
+    for move in game.board.moves:
+        encoded.append(notation_to_square(move.notation) | (PASS_FLAG if move.color == last_color else 0))
+        last_color = move.color
+    return bytes(encoded), game.board.get_score('b'), game.board.get_score('w')
+
+def pgn_to_archive(pgn_paths, path:str) -> int:
+    """
+    Convert PGN files to one archive, streaming the games. Returns the number of games.
+    """
+    def games():
+        for pgn_path in pgn_paths:
+            yield from read_pgn(pgn_path)
+    return write_archive(games(), path)
+
+def archive_to_pgn(archive_path:str, path:str) -> int:
+    """
+    Write every game of an archive to a PGN file. Returns the number of games.
+    """
+    archive = GameArchive(archive_path)
+    try:
+        with open(path, 'w') as f:
+            return write_pgns(((metadata, decode_moves(moves)) for metadata, moves in archive), f)
+    finally:
+        archive.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    pack = subparsers.add_parser('pack', help='Convert PGN files to an archive')
+    pack.add_argument('pgn', nargs='+')
+    pack.add_argument('--output', required=True)
+    unpack = subparsers.add_parser('unpack', help='Convert an archive to a PGN file')
+    unpack.add_argument('archive')
+    unpack.add_argument('--output', required=True)
+    show = subparsers.add_parser('show', help='Print a game of an archive')
+    show.add_argument('archive')
+    show.add_argument('--game', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        print(f'Wrote {pgn_to_archive(args.pgn, args.output)} games to {args.output}')
+    elif args.command == 'unpack':
+        print(f'Wrote {archive_to_pgn(args.archive, args.output)} games to {args.output}')
+    else:
+        archive = GameArchive(args.archive)
+        print(f'{len(archive)} games in archive')
+        print(archive.game(args.game - 1).pgn)
+        archive.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+from typing import Literal
+
+
+FULL_MASK = 0xFFFFFFFFFFFFFFFF
+INNER_FILES = 0x7E7E7E7E7E7E7E7E  # Every file except A and H
+COLUMNS = 'abcdefgh'
+ROWS = '12345678'
+START_BLACK = (1 << 28) | (1 << 35)  # e4, d5
+START_WHITE = (1 << 27) | (1 << 36)  # d4, e5
+
+def board_to_bitboard(board):
+    black = 0
+    white = 0
+    
+    for x in range(8):
+        for y in range(8):
+            bit_index = x + y * 8  # No need to reverse the coordinates
+            if board[x][y] == 'b':
+                black |= 1 << bit_index  # Set bit for black
+            elif board[x][y] == 'w':
+                white |= 1 << bit_index  # Set bit for white
+    
+    return black, white
+
+def find_legal_moves_bitboard(black_bitboard, white_bitboard, color):
+    """
+    Find every legal move for a color using masked directional shifts.
+    Each direction is resolved with the same fixed number of shift-and-mask
+    steps (a move can bracket at most six opponent discs), so the cost does not
+    depend on how many squares are empty.
+    Args:
+        black_bitboard: Black's bitboard.
+        white_bitboard: White's bitboard.
+        color: The color to move.
+    Returns:
+        A bitboard with a bit set for every legal move.
+    """
+    if color == 'b':
+        player = black_bitboard
+        opponent = white_bitboard
+    else:
+        player = white_bitboard
+        opponent = black_bitboard
+    empty = ~(player | opponent) & FULL_MASK
+    # Discs on the A and H files can't be bracketed horizontally or diagonally
+    inner = opponent & INNER_FILES
+    legal_moves_bitboard = 0
+
+    for shift, mask in ((1, inner), (8, opponent), (7, inner), (9, inner)):
+        # Towards higher bit indices
+        flood = mask & (player << shift)
+        flood |= mask & (flood << shift)
+        flood |= mask & (flood << shift)
+        flood |= mask & (flood << shift)
+        flood |= mask & (flood << shift)
+        flood |= mask & (flood << shift)
+        legal_moves_bitboard |= flood << shift
+
+        # Towards lower bit indices
+        flood = mask & (player >> shift)
+        flood |= mask & (flood >> shift)
+        flood |= mask & (flood >> shift)
+        flood |= mask & (flood >> shift)
+        flood |= mask & (flood >> shift)
+        flood |= mask & (flood >> shift)
+        legal_moves_bitboard |= flood >> shift
+
+    return legal_moves_bitboard & empty
+
+def create_ray_tables():
+    """
+    Precompute, for every square, the mask of squares along each of the eight
+    directions up to the edge of the board.
+    Returns:
+        Two lists indexed by square: rays running towards higher bit indices and
+        rays running towards lower bit indices. Empty rays are left out.
+    """
+    rays_up = [[] for _ in range(64)]
+    rays_down = [[] for _ in range(64)]
+    for square in range(64):
+        x, y = square % 8, square // 8
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1)):
+            ray = 0
+            cx, cy = x + dx, y + dy
+            while 0 <= cx < 8 and 0 <= cy < 8:
+                ray |= 1 << (cx + cy * 8)
+                cx += dx
+                cy += dy
+            if ray == 0:
+                continue
+            if dx + dy * 8 > 0:
+                rays_up[square].append(ray)
+            else:
+                rays_down[square].append(ray)
+    return [tuple(rays) for rays in rays_up], [tuple(rays) for rays in rays_down]
+
+RAYS_UP, RAYS_DOWN = create_ray_tables()
+
+def make_move_bitboard(black, white, color, move):
+    if color == 'b':
+        player = black
+        opponent = white
+    else:
+        player = white
+        opponent = black
+    flips = compute_flips(move, player, opponent)
+
+    # Update bitboards
+    player |= flips | move  # Add flipped pieces and the move to the player
+    opponent &= ~flips      # Remove flipped pieces from the opponent
+
+    if color == 'b':
+        return player, opponent
+    else:
+        return opponent, player
+
+def compute_flips(move, player, opponent):
+    """
+    Compute the pieces flipped by a move in all eight directions.
+    Along each precomputed ray the first square that isn't an opponent disc is
+    found with a single bit trick; if it belongs to the player, every square
+    before it on the ray is flipped.
+    Args:
+        move: A single-bit bitboard representing the move (0 for a pass).
+        player: The bitboard of the player making the move.
+        opponent: The bitboard of the other player.
+    Returns:
+        A bitboard of the flipped pieces.
+    """
+    if not move:
+        return 0  # A pass flips nothing; bit_length() - 1 would index h8's rays
+    square = move.bit_length() - 1
+    flips = 0
+    for ray in RAYS_UP[square]:
+        blockers = ray & ~opponent
+        first = blockers & -blockers  # Nearest blocker has the lowest index
+        if first & player:
+            flips |= ray & (first - 1)
+    for ray in RAYS_DOWN[square]:
+        blockers = ray & ~opponent
+        if blockers:
+            first = 1 << (blockers.bit_length() - 1)  # Nearest blocker has the highest index
+            if first & player:
+                flips |= ray & -(first << 1)
+    return flips
+
+
+def move_to_notation(move:int):
+    """
+    Convert a single-bit bitboard move to Othello notation (e.g., A1, H8).
+    Args:
+        move: A single-bit bitboard representing the move.
+    Returns:
+        A string in Othello notation (e.g., "E3").
+    """
+    if move == 0:
+        return "Pass"  # If no move is made
+
+    index = move.bit_length() - 1  # Get the index of the single '1' bit
+    row = index // 8               # Calculate 0-indexed row
+    col = index % 8                # Calculate 0-indexed column
+
+    # Convert to Othello notation
+    return f"{chr(col + ord('A'))}{row + 1}"
+
+def notation_to_square(coordinate:str) -> int | None:
+    """
+    Convert Othello notation (e.g., "e3" or "E3") to a bit index.
+    Args:
+        coordinate: The square in Othello notation.
+    Returns:
+        The bit index of the square, or None if the notation isn't a square.
+    """
+    if len(coordinate) != 2:
+        return None
+    c = COLUMNS.find(coordinate[0].lower())
+    r = ROWS.find(coordinate[1])
+    if c < 0 or r < 0:
+        return None
+    return c + r * 8
+
+def bitboard_to_fen(black:int, white:int) -> str:
+    rows = []
+    for row in range(8):
+        line = ''
+        whitespace = 0
+        for col in range(8):
+            bit = 1 << (col + row * 8)
+            if black & bit:
+                char = 'd'
+            elif white & bit:
+                char = 'D'
+            else:
+                whitespace += 1
+                continue
+            if whitespace > 0:
+                line += str(whitespace)
+                whitespace = 0
+            line += char
+        if whitespace > 0:
+            line += str(whitespace)
+        rows.append(line)
+    return '/'.join(rows)
+
+def fen_to_bitboard(fen:str) -> tuple[int, int]:
+    """
+    Parse a FEN (one line per row, 'd' for black, 'D' for white, digits for
+    empty squares) into bitboards.
+    Raises:
+        ValueError: If the FEN doesn't describe an 8x8 board.
+    """
+    lines = fen.split('/')
+    if len(lines) != 8:
+        raise ValueError(f'Expected 8 rows in fen, found {len(lines)}')
+    black = 0
+    white = 0
+    for y, line in enumerate(lines):
+        x = 0
+        for char in line:
+            match char:
+                case 'd':
+                    black |= 1 << (x + y * 8)
+                    x += 1
+                case 'D':
+                    white |= 1 << (x + y * 8)
+                    x += 1
+                case _:
+                    x += int(char)
+            if x > 8:
+                raise ValueError(f'Row {y + 1} of fen is longer than 8 squares')
+    return black, white
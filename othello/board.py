@@ -1,4 +1,8 @@
 from othello.move import Move
+from othello.bitboard import (
+    START_BLACK, START_WHITE, find_legal_moves_bitboard, compute_flips, notation_to_square, bitboard_to_fen,
+    fen_to_bitboard
+)
 from typing import Literal
 
 
@@ -6,32 +10,96 @@ class Board:
     def __init__(self, fen=None):
         # Init variables
         self.moves = []
-        self.board = init_board()
-        if fen is None:
-            self.fen = create_fen(self.board)
-        else:
+        # One (move bitboard, flipped discs, black before, white before) entry per
+        # move in moves since the position was last set, and the (Move, entry)
+        # pairs taken back by undo, most recent last
+        self.history = []
+        self.undone = []
+        # The bitboards are the source of truth; the list board and fen are rendered on demand
+        self.black = START_BLACK
+        self.white = START_WHITE
+        self.legal_moves = {}  # Cached legal move bitboards by color
+        self._fen = None
+        # The movetext of every move in moves, rendered when the pgn is first asked
+        # for and kept until the move is taken back, with the move number after it
+        self._pgn_parts = []
+        self._pgn_numbers = []
+        self._pgn = ''
+        if fen is not None:
             self.set_position(fen)
     
     def __str__(self):
         s = ''
         for row in range(8):
             for col in range(8):
-                val = self.board[col][row]
-                if val == '':
-                    s += '⛶'
+                bit = 1 << (col + row * 8)
+                if self.black & bit:
+                    s += '○'
+                elif self.white & bit:
+                    s += '●'
                 else:
-                    s += '○●'['bw'.find(val)]
+                    s += '⛶'
                 s += ' '
             s += '\n'
         return s
+
+    @property
+    def board(self) -> list[list[str]]:
+        board = [['' for _ in range(8)] for _ in range(8)]
+        for x in range(8):
+            for y in range(8):
+                bit = 1 << (x + y * 8)
+                if self.black & bit:
+                    board[x][y] = 'b'
+                elif self.white & bit:
+                    board[x][y] = 'w'
+        return board
+
+    @property
+    def fen(self) -> str:
+        if self._fen is None:
+            self._fen = bitboard_to_fen(self.black, self.white)
+        return self._fen
+
+    @property
+    def pgn(self) -> str:
+        """
+        The movetext of the moves made, in the format of othello.game.create_pgn.
+        Only moves made since the last call are rendered.
+        """
+        parts = self._pgn_parts
+        if len(parts) < len(self.moves):
+            numbers = self._pgn_numbers
+            last_color = self.moves[len(parts) - 1].color if parts else 'w'
+            move_num = numbers[-1] if numbers else 1
+            start = len(parts)
+            for move in self.moves[start:]:
+                text, move_num = move_text(move, last_color, move_num)
+                parts.append(text)
+                numbers.append(move_num)
+                last_color = move.color
+            self._pgn += ''.join(parts[start:])
+        return self._pgn
+
+    def truncate_pgn(self):
+        # Drop the rendered text of moves that were taken back
+        count = len(self.moves)
+        if len(self._pgn_parts) > count:
+            del self._pgn_parts[count:]
+            del self._pgn_numbers[count:]
+            self._pgn = ''.join(self._pgn_parts)
+
+    def get_legal_moves(self, color:Literal['b', 'w']) -> int:
+        legal_moves = self.legal_moves.get(color)
+        if legal_moves is None:
+            legal_moves = find_legal_moves_bitboard(self.black, self.white, color)
+            self.legal_moves[color] = legal_moves
+        return legal_moves
     
     def get_score(self, color:Literal['b', 'w']) -> int:
-        count = 0
-        for col in range(8):
-            for row in range(8):
-                if self.board[col][row] == color:
-                    count += 1
-        return count
+        if color == 'b':
+            return self.black.bit_count()
+        return self.white.bit_count()
     
     def game_over(self) -> bool:
         for color in 'bw':
@@ -40,132 +108,176 @@ class Board:
         return True
     
     def legal_move_count(self, color:Literal['b', 'w']) -> int:
-        count = 0
-        for col in 'abcdefgh':
-            for row in '1234567':
-                if is_legal(self.board, col+row, color):
-                    count += 1
-        return count
+        return self.get_legal_moves(color).bit_count()
     
     def has_legal_moves(self, color:Literal['b', 'w']) -> bool:
-        for col in 'abcdefgh':
-            for row in '1234567':
-                if is_legal(self.board, col+row, color):
-                    return True
-        return False
+        return self.get_legal_moves(color) != 0
     
     def set_position(self, fen:str) -> bool:
-        lines = fen.split('/')
-        if len(lines) != 8:
-            return False
-        board = [['' for _ in range(8)] for _ in range(8)]
         try:
-            for y, line in enumerate(lines):
-                x = 0
-                for char in line:
-                    match char:
-                        case 'd':
-                            board[x][y] = 'b'
-                            x += 1
-                        case 'D':
-                            board[x][y] = 'w'
-                            x += 1
-                        case _:
-                            x += int(char)
-            self.board = board
-            self.update_fen()
+            self.black, self.white = fen_to_bitboard(fen)
         except Exception as e:
             print(e)
             return False
+        self.legal_moves = {}
+        self._fen = None
+        # The new position starts a new line: earlier moves can't be taken back or written out
+        self.moves = []
+        self.history = []
+        self.undone = []
+        self._pgn_parts = []
+        self._pgn_numbers = []
+        self._pgn = ''
         return True
     
     def update_fen(self) -> bool:
-        try:
-            self.fen = create_fen(self.board)
-            return True
-        except:
-            return False
+        # The fen is rendered lazily, so there is nothing to rebuild
+        self._fen = None
+        return True
 
     def make_move(self, coordinate:str, color:Literal['b', 'w'], update_fen:bool=True, update_pgn=True, update_move_list:bool=True) -> bool:
-        if not is_legal(self.board, coordinate, color):
+        # update_fen and update_pgn are kept for compatibility; both are rendered lazily
+        square = notation_to_square(coordinate)
+        if square is None or not self.get_legal_moves(color) >> square & 1:
             return False
 
-        c = 'abcdefgh'.find(coordinate[0].lower())
-        r = int(coordinate[1])-1
-        other_color = 'wb'['bw'.find(color)]
-        for dx in [1, 0, -1]:
-            for dy in [1, 0, -1]:
-                if dx == 0 and dy == 0:
-                    continue
-                coordinates = []
-                cursor_col = c + dx
-                cursor_row = r + dy
-                if not legal_coordinate(cursor_col, cursor_row):
-                    continue
-                if self.board[cursor_col][cursor_row] == '':
-                    continue
-                while self.board[cursor_col][cursor_row] == other_color:
-                    coordinates.append((cursor_col, cursor_row))
-                    cursor_col += dx
-                    cursor_row += dy
-                    if not legal_coordinate(cursor_col, cursor_row):
-                        coordinates = []
-                        break
-                    if self.board[cursor_col][cursor_row] == color:
-                        for coord in coordinates:
-                            self.board[coord[0]][coord[1]] = color
-                        self.board[c][r] = color
-                        break
-        if update_fen:
-            self.fen = create_fen(self.board)
+        move = 1 << square
+        black, white = self.black, self.white
+        if color == 'b':
+            flips = compute_flips(move, black, white)
+        else:
+            flips = compute_flips(move, white, black)
+        self.apply(move, flips, color)
         if update_move_list:
             self.moves.append(Move(coordinate, color))
-        if update_pgn:
-            self = create_pgn(self.moves)
+            self.history.append((move, flips, black, white))
+            if self.undone:
+                self.undone = []  # A new move starts a new line
         return True
-    
-    def is_legal(self, coordinate:str, color:Literal['b', 'w']) -> bool:
-        c = 'abcdefgh'.find(coordinate[0].lower())
-        r = int(coordinate[1])-1
-        other_color = 'wb'['bw'.find(color)]
 
-        if not legal_coordinate(c, r):
+    def apply(self, move:int, flips:int, color:Literal['b', 'w']):
+        if color == 'b':
+            self.black |= move | flips
+            self.white &= ~flips
+        else:
+            self.white |= move | flips
+            self.black &= ~flips
+        self.legal_moves = {}
+        self._fen = None
+
+    @property
+    def ply(self) -> int:
+        # Moves made since the position was last set
+        return len(self.history)
+
+    @property
+    def line_length(self) -> int:
+        # Moves made plus moves that can be redone
+        return len(self.history) + len(self.undone)
+
+    def undo(self) -> bool:
+        """
+        Take back the last move, keeping it to be redone.
+        Returns:
+            False if there is no move to take back.
+        """
+        if not self.history:
             return False
-        
-        if self.board[c][r] != '':
+        entry = self.history.pop()
+        self.undone.append((self.moves.pop(), entry))
+        self.black, self.white = entry[2], entry[3]
+        self.legal_moves = {}
+        self._fen = None
+        self.truncate_pgn()
+        return True
+
+    def redo(self) -> bool:
+        """
+        Replay the last move taken back from its recorded flips.
+        Returns:
+            False if there is no move to redo.
+        """
+        if not self.undone:
             return False
-            
-        for dx in [1, 0, -1]:
-            for dy in [1, 0, -1]:
-                if dx == 0 and dy == 0:
-                    continue
-                cursor_col = c + dx
-                cursor_row = r + dy
-                if not legal_coordinate(cursor_col, cursor_row):
-                    continue
-                while self.board[cursor_col][cursor_row] == other_color:
-                    cursor_col += dx
-                    cursor_row += dy
-                    if not legal_coordinate(cursor_col, cursor_row):
-                        break
-                    if self.board[cursor_col][cursor_row] == color:
-                        return True
-        return False
+        move, entry = self.undone.pop()
+        self.black, self.white = entry[2], entry[3]
+        self.apply(entry[0], entry[1], move.color)
+        self.moves.append(move)
+        self.history.append(entry)
+        return True
+
+    def goto(self, ply:int) -> bool:
+        """
+        Jump to the position after ply moves of the current line. The position
+        is restored from a single recorded entry, without replaying the moves
+        in between.
+        Returns:
+            False if ply is outside the line.
+        """
+        if ply < 0 or ply > self.line_length:
+            return False
+        if ply < len(self.history):
+            entry = self.history[ply]
+            count = len(self.history) - ply
+            self.undone.extend(zip(reversed(self.moves[-count:]), reversed(self.history[ply:])))
+            del self.moves[-count:]
+            del self.history[ply:]
+            self.truncate_pgn()
+            self.black, self.white = entry[2], entry[3]
+        elif ply > len(self.history):
+            count = ply - len(self.history)
+            redone = self.undone[-count:]
+            del self.undone[-count:]
+            redone.reverse()
+            self.moves.extend(move for move, _ in redone)
+            self.history.extend(entry for _, entry in redone)
+            move, entry = redone[-1]
+            self.black, self.white = entry[2], entry[3]
+            self.apply(entry[0], entry[1], move.color)
+            return True
+        self.legal_moves = {}
+        self._fen = None
+        return True
+    
+    def is_legal(self, coordinate:str, color:Literal['b', 'w']) -> bool:
+        square = notation_to_square(coordinate)
+        if square is None:
+            return False
+        return bool(self.get_legal_moves(color) >> square & 1)
                     
 
-def create_pgn(moves:list[Move]):
-    s = ''
+def create_pgn(moves:list[Move]) -> str:
+    """
+    Render the movetext of a list of moves (see othello.game.create_pgn).
+    """
+    return ''.join(iter_move_text(moves))
+
+def iter_move_text(moves:list[Move]):
+    last_color = 'w'
     move_num = 1
-    last_move = 'w'
-    for move_num, move in enumerate(moves, start=1):
-        if move.color == 'b':
-            s += f'{move_num}. {move.notation}'
-            if last_move == 'b':
-                s += '..\n'
-        else:
-            if last_move == 'w':
-                s += f'{move_num}. ..'
-            s += f' {move.notation}\n'
+    for move in moves:
+        text, move_num = move_text(move, last_color, move_num)
+        yield text
+        last_color = move.color
+
+def move_text(move:Move, last_color:Literal['b', 'w'], move_num:int) -> tuple[str, int]:
+    """
+    Render one move of a movetext: black moves open a numbered line that white
+    moves close, and a pass fills the missing half with '..'.
+    Args:
+        move: The move.
+        last_color: The color of the move before it ('w' for the first move).
+        move_num: The current move number.
+    Returns:
+        The text of the move and the move number after it.
+    """
+    if move.color == 'b':
+        if last_color == 'b':
+            return f'..\n{move_num + 1}. {move.notation} ', move_num + 1
+        return f'{move_num}. {move.notation} ', move_num
+    if last_color == 'w':
+        return f'{move_num}. .. {move.notation}\n', move_num + 1
+    return f'{move.notation}\n', move_num + 1
 
 def is_legal(board:list[list[str]], coordinate:str, color:Literal['b', 'w']) -> bool:
     c = 'abcdefgh'.find(coordinate[0].lower())
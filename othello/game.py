@@ -1,21 +1,27 @@
 from othello.move import Move
-from othello.board import Board
+from othello.board import Board, iter_move_text
 from typing import Literal
 
 
+PGN_BUFFER_PIECES = 8192  # Pieces of pgn text write_pgns gathers between writes
+
+
 class Game:
     def __init__(self, pgn:str=None, fen:str=None, color='b'):
         # Handle PGN
         self.metadata = create_metadata(pgn)
         self.board = create_board(pgn=pgn, fen=fen)
-        self.pgn = create_pgn(self.metadata, self.board.moves)
 
         # Init Variables
-        self.color = color
-        self.game_over = False
-        self.black_count = 2
-        self.white_count = 2
+        # Side to move before the first move that can be taken back; after the
+        # moves of a pgn it is the opponent of whoever moved last
+        moves = self.board.moves
+        self.start_color = moves[0].color if moves else color
         self.result = None
+        # Kept up to date by every move: disc counts, side to move, its legal moves and whether the other side passed
+        self.black_count = self.board.get_score('b')
+        self.white_count = self.board.get_score('w')
+        self.set_side_to_move('bw'['wb'.find(moves[-1].color)] if moves else color)
 
     def print_board(self):
         print(str(self.board))
@@ -25,7 +31,12 @@ class Game:
     
     def print_pgn(self):
         if len(self.board.moves) > 0:
-            print(create_pgn({}, self.board.moves))
+            print(self.board.pgn)
+
+    @property
+    def pgn(self) -> str:
+        # The headers are short; the movetext is cached by the board
+        return create_header(self.metadata) + self.board.pgn
     
     def __str__(self):
         return self.pgn
@@ -46,21 +57,90 @@ class Game:
         if self.result is not None:
             return False
         if type(move) is str:
-            success = self.board.make_move(move, self.color)
+            color = self.color
+            success = self.board.make_move(move, color)
         else:
-            success = self.board.make_move(move.notation, move.color)
+            color = move.color
+            success = self.board.make_move(move.notation, color)
         
         if not success:
             return False
 
-        # Update counts
-        self.color = 'bw'['wb'.find(self.color)]
-        if not self.board.has_legal_moves(self.color):
-            self.color = 'bw'['wb'.find(self.color)]
-        self.game_over = self.board.game_over()
+        # Update counts from the discs the move flipped
+        flipped = self.board.history[-1][1].bit_count()
+        if color == 'b':
+            self.black_count += flipped + 1
+            self.white_count -= flipped
+        else:
+            self.white_count += flipped + 1
+            self.black_count -= flipped
+        self.set_side_to_move('bw'['wb'.find(color)])
+        return True
+
+    def set_side_to_move(self, color:Literal['b', 'w']):
+        # color moves next, unless it has to pass; the legal moves found here are
+        # the ones the board checks the next move against
+        legal_moves = self.board.get_legal_moves(color)
+        self.passed = not legal_moves
+        if not legal_moves:
+            color = 'bw'['wb'.find(color)]
+            legal_moves = self.board.get_legal_moves(color)
+        self.color = color
+        self.legal_moves = legal_moves
+        self.game_over = not legal_moves
+
+    def moved_twice(self) -> bool:
+        # Whether the side to move also made the last move, its opponent having passed
+        moves = self.board.moves
+        return bool(self.board.history) and moves[-1].color == self.color
+
+    def update_counts(self):
         self.black_count = self.board.get_score('b')
         self.white_count = self.board.get_score('w')
 
+    def undo(self) -> bool:
+        """
+        Take back the last move. A result (resignation, draw) is taken back with it.
+        Returns:
+            False if there is no move to take back.
+        """
+        if not self.board.undo():
+            return False
+        self.result = None
+        self.update_counts()
+        self.set_side_to_move(self.board.undone[-1][0].color)
+        self.passed = self.moved_twice()
+        return True
+
+    def redo(self) -> bool:
+        """
+        Replay the last move taken back.
+        Returns:
+            False if there is no move to redo.
+        """
+        if not self.board.redo():
+            return False
+        self.update_counts()
+        self.set_side_to_move('bw'['wb'.find(self.board.moves[-1].color)])
+        return True
+
+    def goto(self, ply:int) -> bool:
+        """
+        Jump to the position after ply moves of the current line (see Board.goto).
+        Returns:
+            False if ply is outside the line.
+        """
+        if not self.board.goto(ply):
+            return False
+        self.result = None
+        self.update_counts()
+        if self.board.undone:
+            self.set_side_to_move(self.board.undone[-1][0].color)
+            self.passed = self.moved_twice()
+        elif self.board.history:
+            self.set_side_to_move('bw'['wb'.find(self.board.moves[-1].color)])
+        else:
+            self.set_side_to_move(self.start_color)
         return True
 
     def get_metadata(self, key:str=None) -> any:
@@ -118,26 +198,50 @@ def create_metadata(pgn:str, left:str='[', right:str=']', bound:str='"') -> dict
     return metadata
 
 def create_pgn(metadata:dict={}, moves:list[Move]=[], left:str='[', right:str=']', bound:str='"') -> str:
-    text = ''
+    return ''.join(iter_pgn(metadata, moves, left, right, bound))
+
+def create_header(metadata:dict, left:str='[', right:str=']', bound:str='"') -> str:
+    return ''.join(iter_header(metadata, left, right, bound))
+
+def iter_header(metadata:dict, left:str='[', right:str=']', bound:str='"'):
     for key, value in metadata.items():
-        text += f'{left}{key}'
         if value is None:
-            text += f'{right}\n'
+            yield f'{left}{key}{right}\n'
         else:
-            text += f' {bound}{value}{bound}{right}\n'
-
-    move_num = 1
-    last_color = 'w'
-    for move in moves:
-        if move.color == 'b':
-            if last_color == 'b':
-                text += f'..\n'
-                move_num += 1
-            text += f'{move_num}. {move.notation} '
+            yield f'{left}{key} {bound}{value}{bound}{right}\n'
+
+def iter_pgn(metadata:dict={}, moves:list[Move]=[], left:str='[', right:str=']', bound:str='"'):
+    """
+    Yield the pieces of a pgn: one line per header, then the text of every move.
+    """
+    yield from iter_header(metadata, left, right, bound)
+    yield from iter_move_text(moves)
+
+def write_pgns(games, stream, separator:str='\n', buffer_pieces:int=PGN_BUFFER_PIECES) -> int:
+    """
+    Write games to a text stream as pgns. The pieces of the games are gathered
+    and written together every buffer_pieces pieces, without building the text
+    of each game on its own.
+    Args:
+        games: An iterable of Game objects or (metadata, moves) pairs.
+        stream: A writable text stream.
+        separator: Written after every game.
+        buffer_pieces: Pieces (header lines, moves) gathered between writes.
+    Returns:
+        The number of games written.
+    """
+    count = 0
+    pieces = []
+    for game in games:
+        if isinstance(game, Game):
+            metadata, moves = game.metadata, game.board.moves
         else:
-            if last_color == 'w':
-                text += f'{move_num}. .. '
-            text += f'{move.notation}\n'
-            move_num += 1
-        last_color = move.color
-    return text
+            metadata, moves = game
+        pieces.extend(iter_pgn(metadata, moves))
+        pieces.append(separator)
+        count += 1
+        if len(pieces) >= buffer_pieces:
+            stream.write(''.join(pieces))
+            pieces.clear()
+    stream.write(''.join(pieces))
+    return count
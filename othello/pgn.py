@@ -0,0 +1,163 @@
+"""
+Streaming reader for files holding many games in PGN.
+
+Games are read one at a time from a file or a memory map and yielded as their
+headers and a compact move list: a bytes object with one square index (a1 = 0,
+h8 = 63) per move, passes left out as in the movetext. Moves are only played
+on a Game when asked for, and read_pgn_parallel splits a file into chunks that
+start on game boundaries and parses them in worker processes.
+
+A game ends where the next one's header starts. Header lines are the ones with
+both brackets; any other whitespace separated two character token that names a
+square is a move, whatever the case, like othello.game.create_board reads them.
+"""
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat, takewhile
+
+from othello.game import Game, create_metadata
+
+
+SQUARE_NAMES = [column + row for row in '12345678' for column in 'abcdefgh']
+MOVE_PATTERN = re.compile(rb'(?<!\S)[a-hA-H][1-8](?!\S)')
+SQUARES = {name.encode(): square for square, name in enumerate(SQUARE_NAMES)}
+SQUARES.update({name.upper().encode(): square for square, name in enumerate(SQUARE_NAMES)})
+CHUNK_SIZE = 4 * 1024 * 1024  # Bytes of file per task in read_pgn_parallel
+
+
+def read_pgn(source, use_mmap:bool=False, as_games:bool=False):
+    """
+    Read the games of a PGN file one at a time.
+    Args:
+        source: A path, or a file object opened in binary mode.
+        use_mmap: Read a path through a memory map instead of buffered reads.
+        as_games: Yield Game objects with the moves played instead of move lists.
+    Yields:
+        (metadata, moves) for every game, moves being a bytes object of square
+        indices, or a Game with as_games.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        yield from parse_lines(iter(source.readline, b''), as_games)
+        return
+    with open(source, 'rb') as f:
+        if use_mmap and os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield from parse_lines(iter(mm.readline, b''), as_games)
+        else:
+            yield from parse_lines(f, as_games)
+
+def read_game(path:str, index:int=0, as_games:bool=True):
+    """
+    Return the game at index (from 0) of a PGN file, or None if the file has fewer games.
+    """
+    # The games before it are only split off, not played
+    game = next(islice(read_pgn(path), index, None), None)
+    if game is None or not as_games:
+        return game
+    return to_game(*game)
+
+def parse_lines(lines, as_games:bool=False):
+    headers = []
+    movetext = []
+    for line in lines:
+        if b'[' in line and b']' in line:
+            if movetext:
+                yield make_game(headers, movetext, as_games)
+                headers, movetext = [], []
+            headers.append(line)
+        elif not line.isspace():
+            movetext.append(line)
+    if movetext or headers:
+        yield make_game(headers, movetext, as_games)
+
+def make_game(headers, movetext, as_games:bool=False):
+    metadata = create_metadata(b''.join(headers).decode('utf-8', 'replace')) if headers else {}
+    moves = bytes(map(SQUARES.__getitem__, MOVE_PATTERN.findall(b''.join(movetext))))
+    if as_games:
+        return to_game(metadata, moves)
+    return metadata, moves
+
+def to_game(metadata:dict, moves:bytes) -> Game:
+    """
+    Play a compact move list from the start position, stopping at the first illegal move like create_board.
+    """
+    game = Game()
+    game.metadata = metadata
+    for square in moves:
+        if not game.make_move(SQUARE_NAMES[square]):
+            break
+    return game
+
+
+def read_pgn_parallel(path:str, workers:int=None, chunk_size:int=CHUNK_SIZE, as_games:bool=False):
+    """
+    Read the games of a PGN file with several processes, each parsing chunks
+    of about chunk_size bytes that start and end on game boundaries.
+    Args:
+        path: The PGN file.
+        workers: Worker processes (default: one per CPU).
+        chunk_size: Bytes of file per task.
+        as_games: See read_pgn; the games are played in the worker processes.
+    Yields:
+        The games in file order, as read_pgn does.
+    """
+    ranges = split_games(path, chunk_size)
+    if not ranges:
+        return
+    starts, ends = zip(*ranges)
+    with ProcessPoolExecutor(workers) as executor:
+        for games in executor.map(parse_chunk, repeat(path), starts, ends, repeat(as_games)):
+            yield from games
+
+def split_games(path:str, chunk_size:int=CHUNK_SIZE):
+    """
+    Split a PGN file into (start, end) byte ranges of about chunk_size bytes that each hold whole games.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        ranges = []
+        start = 0
+        while start < size:
+            end = game_start(mm, start + chunk_size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def game_start(mm, offset:int) -> int:
+    """
+    Find the first game that starts at or after offset: the first header line
+    that follows a line of movetext. Returns the size of the file if there is none.
+    """
+    if offset >= len(mm):
+        return len(mm)
+    # Start from a line boundary
+    if offset > 0 and mm[offset - 1:offset] != b'\n':
+        offset = mm.find(b'\n', offset)
+        if offset < 0:
+            return len(mm)
+        offset += 1
+    after_moves = False
+    position = offset
+    while position < len(mm):
+        end = mm.find(b'\n', position)
+        end = len(mm) if end < 0 else end + 1
+        line = mm[position:end]
+        if b'[' in line and b']' in line:
+            if after_moves:
+                return position
+        elif not line.isspace():
+            after_moves = True
+        position = end
+    return len(mm)
+
+def parse_chunk(path:str, start:int, end:int, as_games:bool=False) -> list:
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        mm.seek(start)
+        lines = iter(mm.readline, b'')
+        if end < len(mm):
+            lines = takewhile(lambda line: mm.tell() <= end, lines)
+        return list(parse_lines(lines, as_games))
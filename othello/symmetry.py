@@ -0,0 +1,99 @@
+"""
+The 8 symmetries of the board (rotations and reflections) applied to bitboards.
+
+Transforms are numbered 0-7: bit 0 mirrors the files (a <-> h), bit 1 flips
+the rows (1 <-> 8) and bit 2 then transposes along the a1-h8 diagonal, so
+transform t is applied as mirror, flip, transpose in that order.
+"""
+
+
+def flip_vertical(bitboard:int) -> int:
+    # Rows 1 <-> 8: reverse the bytes
+    return int.from_bytes(bitboard.to_bytes(8, 'little'), 'big')
+
+def mirror_horizontal(bitboard:int) -> int:
+    # Files a <-> h: reverse the bits of every byte
+    bitboard = ((bitboard >> 1) & 0x5555555555555555) | ((bitboard & 0x5555555555555555) << 1)
+    bitboard = ((bitboard >> 2) & 0x3333333333333333) | ((bitboard & 0x3333333333333333) << 2)
+    return ((bitboard >> 4) & 0x0F0F0F0F0F0F0F0F) | ((bitboard & 0x0F0F0F0F0F0F0F0F) << 4)
+
+def flip_diagonal(bitboard:int) -> int:
+    # Transpose along the a1-h8 diagonal by swapping blocks around it
+    t = 0x0F0F0F0F00000000 & (bitboard ^ (bitboard << 28))
+    bitboard ^= t ^ (t >> 28)
+    t = 0x3333000033330000 & (bitboard ^ (bitboard << 14))
+    bitboard ^= t ^ (t >> 14)
+    t = 0x5500550055005500 & (bitboard ^ (bitboard << 7))
+    return bitboard ^ t ^ (t >> 7)
+
+def transform(bitboard:int, symmetry:int) -> int:
+    """
+    Apply one of the 8 symmetries to a bitboard.
+    """
+    if symmetry & 1:
+        bitboard = mirror_horizontal(bitboard)
+    if symmetry & 2:
+        bitboard = flip_vertical(bitboard)
+    if symmetry & 4:
+        bitboard = flip_diagonal(bitboard)
+    return bitboard
+
+def variants(bitboard:int) -> tuple:
+    """
+    Return the bitboard under all 8 symmetries, indexed by transform.
+    """
+    mirrored = mirror_horizontal(bitboard)
+    flipped = flip_vertical(bitboard)
+    rotated = flip_vertical(mirrored)
+    return (
+        bitboard, mirrored, flipped, rotated,
+        flip_diagonal(bitboard), flip_diagonal(mirrored), flip_diagonal(flipped), flip_diagonal(rotated),
+    )
+
+def create_square_tables():
+    """
+    Map every square through every transform and back.
+    Returns:
+        The forward tables and the inverse tables, each indexed [transform][square].
+    """
+    forward = tuple(tuple(transform(1 << square, symmetry).bit_length() - 1 for square in range(64)) for symmetry in range(8))
+    inverse = []
+    for table in forward:
+        inverted = [0] * 64
+        for square, image in enumerate(table):
+            inverted[image] = square
+        inverse.append(tuple(inverted))
+    return forward, tuple(inverse)
+
+TRANSFORM_SQUARE, INVERSE_SQUARE = create_square_tables()
+
+
+def canonical(black_bitboard:int, white_bitboard:int):
+    """
+    Find the canonical form of a position: the variant with the smallest (black, white) pair.
+    Returns:
+        The canonical black and white bitboards and the transform that produces
+        them. A square s of the canonical position is square
+        INVERSE_SQUARE[transform][s] of the original.
+    """
+    blacks = variants(black_bitboard)
+    whites = variants(white_bitboard)
+    best = 0
+    best_black, best_white = black_bitboard, white_bitboard
+    for symmetry in range(1, 8):
+        black = blacks[symmetry]
+        if black < best_black or (black == best_black and whites[symmetry] < best_white):
+            best, best_black, best_white = symmetry, black, whites[symmetry]
+    return best_black, best_white, best
+
+def transform_move(move:int, symmetry:int) -> int:
+    """
+    Map a square index into the transformed position (NO_MOVE-style values of 64 or more pass through).
+    """
+    return TRANSFORM_SQUARE[symmetry][move] if move < 64 else move
+
+def untransform_move(move:int, symmetry:int) -> int:
+    """
+    Map a square index of the transformed position back to the original.
+    """
+    return INVERSE_SQUARE[symmetry][move] if move < 64 else move
@@ -22,5 +22,11 @@ settings = {
         'default': False,
         'type': bool,
         'hint': 'Display a PGN representation of the current game when changes are made.'
+    },
+    'ponder':
+    {
+        'default': False,
+        'type': bool,
+        'hint': 'Search the current position in the background while waiting for a command, sharing the table with ai-move.'
     }
 }
\ No newline at end of file
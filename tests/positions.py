@@ -0,0 +1,80 @@
+"""
+Positions shared by the tests: seeded random positions and games, and
+endgame positions with known exact values.
+"""
+from random import Random
+
+from othello.bitboard import START_BLACK, START_WHITE, find_legal_moves_bitboard, make_move_bitboard, move_to_notation
+
+
+# Endgame positions (name, board from a1 to h8 with X black / O white / - empty,
+# color to move, exact final disc difference for the side to move).
+# ffo-40 is position #40 of the FFO endgame suite (a2, +38); the others follow
+# its principal variation, so their values are +-38 as well.
+ENDGAME_POSITIONS = [
+    ('ffo-40', 'O--OOOOX-OOOOOOXOOXXOOOXOOXOOOXXOOOOOOXX---OOOOX----O--X--------', 'b', 38),
+    ('ffo-40+7', 'OOXXXXXXXOXXXXXXOOXOXOOXOOXXOOXXOOXOOOXX-X-OOOOXX-O-O--X--------', 'w', -38),
+    ('ffo-40+8', 'OOXXXXXXXOXXXXXXOOXOXOOXOOXXOOXXOOXOOOXX-O-OOOOXXOO-O--X--------', 'b', 38),
+    ('ffo-40+9', 'OOXXXXXXXOXXXXXXOOXOXOXXOOXXOXXXOOXOXOXX-O-XOOOXXOX-O--X-X------', 'w', -38),
+    ('ffo-40+10', 'OOXXXXXXXOXXXXXXOOXOXOXXOOXXOXXXOOXOXOXX-O-OOOOXXOOOO--X-X------', 'b', 38),
+]
+
+
+def parse_board(text):
+    # One character per square from a1 to h8: X for black, O for white, - for empty
+    black = white = 0
+    for square, char in enumerate(text):
+        if char == 'X':
+            black |= 1 << square
+        elif char == 'O':
+            white |= 1 << square
+    return black, white
+
+def random_positions(count, seed=1):
+    """
+    Play seeded random games and collect every position reached.
+    Returns:
+        A list of count (black_bitboard, white_bitboard, color to move) tuples.
+    """
+    rng = Random(seed)
+    positions = []
+    while True:
+        black, white, color = START_BLACK, START_WHITE, 'b'
+        while True:
+            legal_moves = find_legal_moves_bitboard(black, white, color)
+            if not legal_moves:
+                color = 'w' if color == 'b' else 'b'
+                legal_moves = find_legal_moves_bitboard(black, white, color)
+                if not legal_moves:
+                    break
+            positions.append((black, white, color))
+            if len(positions) == count:
+                return positions
+            moves = [1 << square for square in range(64) if legal_moves >> square & 1]
+            black, white = make_move_bitboard(black, white, color, rng.choice(moves))
+            color = 'w' if color == 'b' else 'b'
+
+def random_games(count, seed=1):
+    """
+    Play seeded random games to the end.
+    Returns:
+        A list of count games, each a list of moves in lowercase notation (passes left out).
+    """
+    rng = Random(seed)
+    games = []
+    for _ in range(count):
+        black, white, color = START_BLACK, START_WHITE, 'b'
+        moves = []
+        while True:
+            legal_moves = find_legal_moves_bitboard(black, white, color)
+            if not legal_moves:
+                color = 'w' if color == 'b' else 'b'
+                legal_moves = find_legal_moves_bitboard(black, white, color)
+                if not legal_moves:
+                    break
+            move = rng.choice([1 << square for square in range(64) if legal_moves >> square & 1])
+            moves.append(move_to_notation(move).lower())
+            black, white = make_move_bitboard(black, white, color, move)
+            color = 'w' if color == 'b' else 'b'
+        games.append(moves)
+    return games
@@ -0,0 +1,84 @@
+"""
+Check that games written to a binary archive come back with the same moves,
+colors (through passes), headers and scores, and convert back to the same PGN.
+"""
+import os
+
+import pytest
+
+from othello.archive import (
+    GameArchive, PASS_FLAG, write_archive, encode_moves, decode_moves, pgn_to_archive, archive_to_pgn
+)
+from othello.bitboard import notation_to_square
+from othello.game import Game, write_pgns
+from positions import random_games
+
+
+def create_games(count, seed=27):
+    games = []
+    for number, moves in enumerate(random_games(count, seed), start=1):
+        game = Game()
+        game.metadata = {'Event': 'test', 'Round': str(number), 'Unrated': None}
+        for move in moves:
+            game.make_move(move)
+        games.append(game)
+    return games
+
+def move_list(moves):
+    return [(move.notation, move.color) for move in moves]
+
+
+def test_games_come_back_unchanged(tmp_path):
+    games = create_games(40)
+    path = os.path.join(tmp_path, 'games.oga')
+    assert write_archive(games, path) == len(games)
+    archive = GameArchive(path)
+    try:
+        assert len(archive) == len(games)
+        passes = 0
+        for index, game in enumerate(games):
+            moves = decode_moves(archive.moves(index))
+            assert move_list(moves) == move_list(game.board.moves)
+            passes += sum(move & PASS_FLAG != 0 for move in archive.moves(index))
+            assert archive.metadata(index) == game.metadata
+            assert archive.score(index) == (game.black_count, game.white_count)
+            read = archive.game(index)
+            assert (read.board.black, read.board.white) == (game.board.black, game.board.white)
+            assert read.pgn == game.pgn
+        # Some of the games have to go through a pass for the colors to be tested
+        assert passes
+        assert [metadata for metadata, _ in archive] == [game.metadata for game in games]
+        with pytest.raises(IndexError):
+            archive.record(len(games))
+    finally:
+        archive.close()
+
+def test_pgn_round_trip(tmp_path):
+    games = create_games(20)
+    pgn_path = os.path.join(tmp_path, 'games.pgn')
+    with open(pgn_path, 'w') as f:
+        write_pgns(games, f)
+    # Compact move lists from the reader encode to the same file as the games
+    from_games, from_pgn = os.path.join(tmp_path, 'games.oga'), os.path.join(tmp_path, 'pgn.oga')
+    write_archive(games, from_games)
+    assert pgn_to_archive([pgn_path], from_pgn) == len(games)
+    with open(from_games, 'rb') as first, open(from_pgn, 'rb') as second:
+        assert first.read() == second.read()
+
+    out_path = os.path.join(tmp_path, 'out.pgn')
+    assert archive_to_pgn(from_pgn, out_path) == len(games)
+    with open(pgn_path) as first, open(out_path) as second:
+        assert first.read() == second.read()
+
+def test_encoding_stops_at_an_illegal_move():
+    moves = bytes(notation_to_square(square) for square in ('f5', 'd6', 'a1', 'c3'))
+    encoded, black_discs, white_discs = encode_moves(moves)
+    assert move_list(decode_moves(encoded)) == [('f5', 'b'), ('d6', 'w')]
+    assert (black_discs, white_discs) == (3, 3)
+
+def test_other_files_are_rejected(tmp_path):
+    path = os.path.join(tmp_path, 'games.pgn')
+    with open(path, 'w') as f:
+        write_pgns(create_games(1), f)
+    with pytest.raises(ValueError):
+        GameArchive(path)
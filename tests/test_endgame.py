@@ -0,0 +1,71 @@
+"""
+Check the endgame solver's exact scores on known positions and against a
+plain minimax on random positions, and that a search takes over, within the
+time limit, when the solver can't finish.
+"""
+from time import time
+
+from othello.bitboard import bitboard_to_fen, find_legal_moves_bitboard, make_move_bitboard, notation_to_square
+from othello.board import Board
+from engine.endgame import EndgameSolver, WLD_MODE, count_empties, final_difference
+from engine.engine import ai_move_iterative
+from positions import ENDGAME_POSITIONS, parse_board, random_positions
+
+
+MAX_EMPTIES = 14  # Positions with more empties take too long to solve in a test
+
+
+def minimax(black, white, color, passed=False):
+    # Every line to the end, scored like the solver: the final disc difference for color
+    legal_moves = find_legal_moves_bitboard(black, white, color)
+    other = 'w' if color == 'b' else 'b'
+    if not legal_moves:
+        if passed:
+            return final_difference(black, white) if color == 'b' else final_difference(white, black)
+        return -minimax(black, white, other, True)
+    best_score = -65
+    while legal_moves:
+        move = legal_moves & -legal_moves
+        legal_moves ^= move
+        best_score = max(best_score, -minimax(*make_move_bitboard(black, white, color, move), other))
+    return best_score
+
+
+def solvable_positions():
+    for name, board, color, expected in ENDGAME_POSITIONS:
+        black, white = parse_board(board)
+        if count_empties(black, white) <= MAX_EMPTIES:
+            yield name, black, white, color, expected
+
+
+def test_exact_scores():
+    positions = list(solvable_positions())
+    assert positions
+    for name, black, white, color, expected in positions:
+        move, score = EndgameSolver().solve(black, white, color)
+        assert score == expected, name
+        assert find_legal_moves_bitboard(black, white, color) & move, name
+
+def test_random_positions_match_minimax():
+    # Up to 7 empties covers the dedicated paths for the last squares and passes at every depth
+    positions = [position for position in random_positions(6000, seed=8) if count_empties(*position[:2]) <= 7]
+    assert len(positions) > 40
+    for black, white, color in positions[::2]:
+        _, score = EndgameSolver().solve(black, white, color)
+        assert score == minimax(black, white, color), bitboard_to_fen(black, white)
+
+def test_win_loss_draw():
+    for name, black, white, color, expected in solvable_positions():
+        _, score = EndgameSolver().solve(black, white, color, WLD_MODE)
+        assert (score > 0, score < 0) == (expected > 0, expected < 0), name
+
+def test_search_takes_over_from_the_solver():
+    # ffo-40 has 20 empties: far more than the solver can do in the time given
+    _, text, color, _ = ENDGAME_POSITIONS[0]
+    board = Board(bitboard_to_fen(*parse_board(text)))
+    start_time = time()
+    move, _, report = ai_move_iterative(board, color, 60, time_limit=1.0, endgame_empties=20, book=None)
+    assert time() - start_time < 2.0
+    # With no time left over it would stop after the first couple of iterations
+    assert 'endgame' not in report and report['depth'] >= 3
+    assert find_legal_moves_bitboard(board.black, board.white, color) >> notation_to_square(move) & 1
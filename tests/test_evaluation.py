@@ -0,0 +1,13 @@
+"""
+Check that the table-driven evaluation stays within the range its terms are scaled to.
+"""
+from engine.evaluation import evaluate
+from engine.settings import WEIGHTS, CORNER_CLOSENESS_WEIGHTS
+from positions import random_positions
+
+
+def test_evaluation_is_bounded():
+    bound = 100 * max(sum(weights.values()) + CORNER_CLOSENESS_WEIGHTS[phase] for phase, weights in WEIGHTS.items())
+    for black, white, _ in random_positions(3000, seed=3):
+        assert abs(evaluate(black, white)) <= bound
+        assert abs(evaluate(white, black)) <= bound
@@ -0,0 +1,70 @@
+"""
+Check compute_flips, make_move_bitboard and Board.make_move move by move
+against the list-board flipping Board.make_move used before the bitboards.
+"""
+from copy import deepcopy
+
+from othello.bitboard import (
+    START_BLACK, START_WHITE, board_to_bitboard, compute_flips, find_legal_moves_bitboard, make_move_bitboard,
+    move_to_notation, notation_to_square
+)
+from othello.board import Board, init_board, legal_coordinate
+from positions import random_games
+
+
+def flip_list_board(board, coordinate, color):
+    # The previous Board.make_move: walk each direction and flip bracketed discs
+    c = 'abcdefgh'.find(coordinate[0].lower())
+    r = int(coordinate[1]) - 1
+    other_color = 'wb'['bw'.find(color)]
+    for dx in [1, 0, -1]:
+        for dy in [1, 0, -1]:
+            if dx == 0 and dy == 0:
+                continue
+            coordinates = []
+            cursor_col = c + dx
+            cursor_row = r + dy
+            if not legal_coordinate(cursor_col, cursor_row):
+                continue
+            while board[cursor_col][cursor_row] == other_color:
+                coordinates.append((cursor_col, cursor_row))
+                cursor_col += dx
+                cursor_row += dy
+                if not legal_coordinate(cursor_col, cursor_row):
+                    break
+                if board[cursor_col][cursor_row] == color:
+                    for coord in coordinates:
+                        board[coord[0]][coord[1]] = color
+                    break
+    board[c][r] = color
+
+
+def test_random_games():
+    for moves in random_games(100, seed=5):
+        black, white, color = START_BLACK, START_WHITE, 'b'
+        board = Board()
+        list_board = init_board()
+        for notation in moves:
+            if not find_legal_moves_bitboard(black, white, color):
+                color = 'w' if color == 'b' else 'b'
+            player, opponent = (black, white) if color == 'b' else (white, black)
+
+            # Every legal move of the position flips what the list board flips
+            legal_moves = find_legal_moves_bitboard(black, white, color)
+            for square in range(64):
+                if legal_moves >> square & 1:
+                    flipped = deepcopy(list_board)
+                    flip_list_board(flipped, move_to_notation(1 << square), color)
+                    flipped_black, flipped_white = board_to_bitboard(flipped)
+                    expected = (flipped_black if color == 'b' else flipped_white) & ~(player | 1 << square)
+                    assert compute_flips(1 << square, player, opponent) == expected
+
+            black, white = make_move_bitboard(black, white, color, 1 << notation_to_square(notation))
+            assert board.make_move(notation, color)
+            flip_list_board(list_board, notation, color)
+            assert (board.black, board.white) == (black, white) == board_to_bitboard(list_board)
+            color = 'w' if color == 'b' else 'b'
+
+def test_pass_flips_nothing():
+    assert compute_flips(0, START_BLACK, START_WHITE) == 0
+    assert make_move_bitboard(START_BLACK, START_WHITE, 'b', 0) == (START_BLACK, START_WHITE)
@@ -0,0 +1,158 @@
+"""
+Check the move stack of Board and Game (undo, redo and goto, through passes
+and on games loaded from a pgn), the state Game keeps up to date move by move
+and the cached pgn and fen text.
+"""
+from io import StringIO
+from random import Random
+
+from othello.bitboard import bitboard_to_fen, move_to_notation
+from othello.board import Board
+from othello.game import Game, create_pgn, write_pgns
+from positions import random_games
+
+
+def state(game):
+    return (game.board.black, game.board.white, game.color, game.passed, game.game_over, game.black_count,
+            game.white_count, game.legal_moves, len(game.board.moves), game.board.pgn)
+
+def games_with_passes(count):
+    # Games where some side had to pass, found by one color moving twice in a row
+    found = []
+    for moves in random_games(400, seed=21):
+        game = Game()
+        colors = []
+        for move in moves:
+            game.make_move(move)
+            colors.append(game.board.moves[-1].color)
+        if any(first == second for first, second in zip(colors, colors[1:])):
+            found.append(moves)
+            if len(found) == count:
+                return found
+    return found
+
+def played(moves, game=None):
+    # The game and its state after every ply, from the start
+    game = game or Game()
+    states = [state(game)]
+    for move in moves:
+        assert game.make_move(move)
+        states.append(state(game))
+    return game, states
+
+
+def test_counts_and_side_to_move_follow_every_move():
+    for moves in random_games(30, seed=22):
+        game = Game()
+        for move in moves:
+            game.make_move(move)
+            assert game.black_count == game.board.get_score('b')
+            assert game.white_count == game.board.get_score('w')
+            assert game.legal_moves == game.board.get_legal_moves(game.color)
+        assert game.game_over
+
+def test_undo_and_redo_through_passes():
+    games = games_with_passes(3)
+    assert games
+    for moves in games:
+        game, states = played(moves)
+        for ply in range(len(moves), 0, -1):
+            assert game.undo()
+            assert state(game) == states[ply - 1]
+        assert not game.undo()
+        for ply in range(1, len(moves) + 1):
+            assert game.redo()
+            assert state(game) == states[ply]
+        assert not game.redo()
+
+def test_goto_through_passes():
+    rng = Random(23)
+    for moves in games_with_passes(3):
+        game, states = played(moves)
+        for ply in rng.sample(range(len(moves) + 1), len(moves) + 1):
+            assert game.goto(ply)
+            assert state(game) == states[ply]
+        assert not game.goto(len(moves) + 1)
+        assert not game.goto(-1)
+
+def test_game_loaded_from_pgn():
+    for moves in games_with_passes(3):
+        game, states = played(moves)
+        pgn = create_pgn({'Event': 'test'}, game.board.moves)
+        for color in 'bw':
+            # The side to move follows the moves, whatever color is given
+            loaded = Game(pgn, color=color)
+            assert loaded.start_color == 'b'
+            assert state(loaded)[:8] == states[-1][:8]
+            middle = len(moves) // 2
+            assert loaded.goto(middle)
+            assert state(loaded)[:8] == states[middle][:8]
+            assert loaded.goto(0)
+            assert state(loaded)[:8] == states[0][:8]
+            while loaded.redo():
+                pass
+            while loaded.undo():
+                pass
+            assert state(loaded)[:8] == states[0][:8]
+
+def test_set_position_starts_a_new_line():
+    board = Board()
+    for move, color in (('f5', 'b'), ('d6', 'w'), ('c3', 'b')):
+        assert board.make_move(move, color)
+    assert board.pgn
+    board.undo()
+    assert board.set_position('8/8/8/3Dd3/3dD3/8/8/8')
+    assert board.moves == [] and board.pgn == ''
+    assert not board.undo() and not board.redo()
+    assert board.make_move('c4', 'b')
+    assert board.pgn == '1. c4 '
+
+def test_game_with_a_fen_after_a_pgn():
+    game = Game('1. f5 d6 2. c3', fen='8/8/8/3Dd3/3dD3/8/8/8', color='w')
+    assert game.board.moves == [] and game.start_color == 'w' and game.color == 'w'
+    assert (game.black_count, game.white_count) == (2, 2)
+
+def check_text(game):
+    # The cached text against the text rendered from scratch
+    assert game.board.pgn == create_pgn({}, game.board.moves)
+    assert game.pgn == create_pgn(game.metadata, game.board.moves)
+    assert game.board.fen == bitboard_to_fen(game.board.black, game.board.white)
+
+def test_cached_text_follows_the_moves():
+    rng = Random(24)
+    for moves in games_with_passes(3):
+        game = Game()
+        game.metadata = {'Event': 'test', 'Round': None}
+        for move in moves:
+            assert game.make_move(move)
+            check_text(game)
+        for _ in range(20):
+            rng.choice((game.undo, game.redo))()
+            check_text(game)
+            assert game.goto(rng.randrange(len(moves) + 1))
+            check_text(game)
+        # A different move after taking some back starts a new line
+        assert game.goto(len(moves) // 2)
+        other_moves = game.legal_moves & ~game.board.undone[-1][1][0]
+        if other_moves:
+            assert game.make_move(move_to_notation(other_moves & -other_moves).lower())
+            assert not game.board.undone
+            check_text(game)
+
+def test_write_pgns_matches_create_pgn():
+    games = []
+    for number, moves in enumerate(random_games(5, seed=25), start=1):
+        game = Game()
+        game.metadata = {'Event': 'test', 'Round': str(number)}
+        for move in moves:
+            game.make_move(move)
+        games.append(game)
+    expected = ''.join(create_pgn(game.metadata, game.board.moves) + '\n' for game in games)
+    for buffer_pieces in (1, 7, 10000):
+        stream = StringIO()
+        assert write_pgns(games, stream, buffer_pieces=buffer_pieces) == len(games)
+        assert stream.getvalue() == expected
+    # (metadata, moves) pairs are written the same way
+    stream = StringIO()
+    write_pgns([(game.metadata, game.board.moves) for game in games], stream)
+    assert stream.getvalue() == expected
@@ -0,0 +1,65 @@
+"""
+Check the shift-based legal move generator against the per-square scan it
+replaced and against othello.board.is_legal, on seeded random positions.
+"""
+from othello.bitboard import START_BLACK, START_WHITE, find_legal_moves_bitboard, move_to_notation
+from othello.board import is_legal
+from positions import random_positions
+
+
+DIRECTIONS = [-1, 1, -8, 8, -7, 7, -9, 9]
+# Stepping in these directions from a square on the given file wraps around the board
+WRAPS = {-1: 7, 1: 0, -7: 0, 7: 7, -9: 7, 9: 0}
+
+
+def scan_legal_moves(black_bitboard, white_bitboard, color):
+    # The previous generator: walk every direction from every empty square
+    if color == 'b':
+        player, opponent = black_bitboard, white_bitboard
+    else:
+        player, opponent = white_bitboard, black_bitboard
+    legal_moves_bitboard = 0
+    for i in range(64):
+        if (player | opponent) & (1 << i):
+            continue
+        for direction in DIRECTIONS:
+            pos = i + direction
+            jumping = False
+            while 0 <= pos < 64 and pos % 8 != WRAPS.get(direction):
+                if (opponent >> pos) & 1:
+                    pos += direction
+                    jumping = True
+                else:
+                    if (player >> pos) & 1 and jumping:
+                        legal_moves_bitboard |= 1 << i
+                    break
+    return legal_moves_bitboard
+
+def list_board(black_bitboard, white_bitboard):
+    board = [['' for _ in range(8)] for _ in range(8)]
+    for square in range(64):
+        if black_bitboard >> square & 1:
+            board[square % 8][square // 8] = 'b'
+        elif white_bitboard >> square & 1:
+            board[square % 8][square // 8] = 'w'
+    return board
+
+
+def test_start_position():
+    legal_moves = find_legal_moves_bitboard(START_BLACK, START_WHITE, 'b')
+    assert sorted(move_to_notation(1 << square) for square in range(64) if legal_moves >> square & 1) == [
+        'C4', 'D3', 'E6', 'F5']
+
+def test_matches_per_square_scan():
+    for black, white, color in random_positions(3000, seed=7):
+        for side in 'bw':
+            assert find_legal_moves_bitboard(black, white, side) == scan_legal_moves(black, white, side)
+
+def test_matches_is_legal():
+    for black, white, color in random_positions(500, seed=11):
+        board = list_board(black, white)
+        for side in 'bw':
+            legal_moves = find_legal_moves_bitboard(black, white, side)
+            for square in range(64):
+                notation = move_to_notation(1 << square)
+                assert bool(is_legal(board, notation, side)) == bool(legal_moves >> square & 1), (notation, side)
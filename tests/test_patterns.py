@@ -0,0 +1,27 @@
+"""
+Check that the pattern evaluation scores rotated and mirrored positions the same.
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from engine.patterns import load_default_evaluator
+from othello.symmetry import transform
+from positions import random_positions
+
+
+def test_symmetric_positions_score_the_same():
+    evaluate = load_default_evaluator()
+    for black, white, _ in random_positions(300, seed=9):
+        score = evaluate(black, white)
+        for symmetry in range(8):
+            assert evaluate(transform(black, symmetry), transform(white, symmetry)) == score
+
+def test_batch_matches_single_evaluations():
+    evaluate = load_default_evaluator()
+    positions = random_positions(200, seed=10)
+    blacks = np.array([black for black, _, _ in positions], dtype=np.uint64)
+    whites = np.array([white for _, white, _ in positions], dtype=np.uint64)
+    scores = evaluate.evaluate_batch(blacks, whites)
+    for (black, white, _), score in zip(positions, scores):
+        assert evaluate(black, white) == score
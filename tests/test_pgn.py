@@ -0,0 +1,80 @@
+"""
+Check the streaming PGN reader against the games written with write_pgns:
+buffered, memory mapped, from a file object, one game by index and split into
+chunks for worker processes.
+"""
+import os
+
+from othello.bitboard import notation_to_square
+from othello.game import Game, write_pgns
+from othello.pgn import read_pgn, read_game, read_pgn_parallel, split_games, parse_chunk
+from positions import random_games
+
+
+def create_games(count, seed=26):
+    games = []
+    for number, moves in enumerate(random_games(count, seed), start=1):
+        game = Game()
+        game.metadata = {'Event': 'test', 'Round': str(number), 'Unrated': None}
+        for move in moves:
+            game.make_move(move)
+        games.append(game)
+    return games
+
+def compact(game):
+    # A game as read_pgn yields it
+    return game.metadata, bytes(notation_to_square(move.notation) for move in game.board.moves)
+
+def write_file(directory, games):
+    path = os.path.join(directory, 'games.pgn')
+    with open(path, 'w') as f:
+        write_pgns(games, f)
+    return path
+
+
+def test_read_pgn_returns_the_games_written(tmp_path):
+    games = create_games(20)
+    path = write_file(tmp_path, games)
+    expected = [compact(game) for game in games]
+    assert list(read_pgn(path)) == expected
+    assert list(read_pgn(path, use_mmap=True)) == expected
+    with open(path, 'rb') as f:
+        assert list(read_pgn(f)) == expected
+
+def test_read_pgn_plays_the_games(tmp_path):
+    games = create_games(5)
+    path = write_file(tmp_path, games)
+    for game, read in zip(games, read_pgn(path, as_games=True), strict=True):
+        assert (read.board.black, read.board.white) == (game.board.black, game.board.white)
+        assert read.metadata == game.metadata and read.pgn == game.pgn
+
+def test_read_game_by_index(tmp_path):
+    games = create_games(5)
+    path = write_file(tmp_path, games)
+    assert read_game(path, 3).pgn == games[3].pgn
+    assert read_game(path, 3, as_games=False) == compact(games[3])
+    assert read_game(path, 5) is None
+
+def test_moves_in_any_case_and_without_headers(tmp_path):
+    path = os.path.join(tmp_path, 'games.pgn')
+    with open(path, 'w') as f:
+        f.write('1. F5 d6 2. C3\n\n[Event "second"]\n1. f5 1-0\n')
+    assert list(read_pgn(path)) == [({}, bytes([37, 43, 18])), ({'Event': 'second'}, bytes([37]))]
+
+def test_empty_file(tmp_path):
+    path = os.path.join(tmp_path, 'games.pgn')
+    open(path, 'w').close()
+    assert list(read_pgn(path)) == [] and list(read_pgn(path, use_mmap=True)) == []
+    assert split_games(path) == []
+
+def test_chunks_hold_whole_games(tmp_path):
+    games = create_games(30)
+    path = write_file(tmp_path, games)
+    expected = list(read_pgn(path))
+    for chunk_size in (1, 300, 5000, os.path.getsize(path)):
+        ranges = split_games(path, chunk_size)
+        # The ranges cover the file without gaps or overlaps
+        assert ranges[0][0] == 0 and ranges[-1][1] == os.path.getsize(path)
+        assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+        assert [game for start, end in ranges for game in parse_chunk(path, start, end)] == expected
+    assert list(read_pgn_parallel(path, workers=2, chunk_size=1000)) == expected
@@ -0,0 +1,36 @@
+"""
+Check that the search tells heuristic scores from decided games.
+"""
+from engine.engine import eval_bitboard
+from engine.evaluation import evaluate as eval_tables
+from engine.search import Search, WIN_SCORE, final_score
+from engine.tt import TranspositionTable
+from positions import random_positions
+
+
+def midgame_positions(count, seed):
+    return [position for position in random_positions(count * 4, seed)
+            if 12 <= (position[0] | position[1]).bit_count() <= 44][:count]
+
+
+def test_large_evaluations_are_not_wins():
+    # Heuristic scores far above any real evaluation must not end the iterations
+    def evaluate(black, white):
+        return 5000.0 + 100 * (black.bit_count() - white.bit_count())
+
+    for black, white, color in midgame_positions(5, seed=2):
+        result = Search(TranspositionTable(1), evaluate).iterative_deepening(black, white, color, 3)
+        assert result['depth'] == 3
+
+def test_midgame_searches_deepen():
+    for evaluate in (eval_bitboard, eval_tables):
+        for black, white, color in midgame_positions(20, seed=4):
+            result = Search(TranspositionTable(1), evaluate).iterative_deepening(black, white, color, 3)
+            assert result['depth'] == 3
+            assert abs(result['score']) < WIN_SCORE
+
+def test_won_endings_outscore_evaluations():
+    # A one-disc win beats any evaluation, a one-disc loss is worse than any
+    assert final_score(0b11, 0b100) == WIN_SCORE + 1
+    assert final_score(0b100, 0b11) == -WIN_SCORE - 1
+    assert final_score(0b1, 0b10) == 0
@@ -0,0 +1,40 @@
+"""
+Check that every evaluator listed as symmetric is, since canonical table and
+cache keys hand one orientation's scores to the others, and that searches
+keyed on canonical positions agree across orientations.
+"""
+import pytest
+
+from engine.engine import SYMMETRIC_EVALUATORS, get_evaluator
+from engine.search import Search
+from engine.tt import TranspositionTable
+from othello.symmetry import canonical, transform
+from positions import random_positions
+
+
+@pytest.mark.parametrize('name', SYMMETRIC_EVALUATORS)
+def test_symmetric_evaluators(name):
+    if name == 'pattern':
+        pytest.importorskip('numpy')
+    evaluate = get_evaluator(name)
+    for black, white, _ in random_positions(300, seed=12):
+        score = evaluate(black, white)
+        for symmetry in range(8):
+            assert evaluate(transform(black, symmetry), transform(white, symmetry)) == score, symmetry
+
+def test_canonical_is_shared_by_all_orientations():
+    for black, white, _ in random_positions(200, seed=13):
+        expected = canonical(black, white)[:2]
+        for symmetry in range(8):
+            assert canonical(transform(black, symmetry), transform(white, symmetry))[:2] == expected
+
+def test_symmetric_search_scores_every_orientation_the_same():
+    evaluate = get_evaluator('table')
+    for black, white, color in random_positions(60, seed=14)[20:]:
+        table = TranspositionTable(1)
+        expected = Search(table, evaluate, symmetry=True).iterative_deepening(black, white, color, 3)['score']
+        for symmetry in range(1, 8):
+            # The table is kept, so later orientations are answered from the first one's entries
+            result = Search(table, evaluate, symmetry=True).iterative_deepening(
+                transform(black, symmetry), transform(white, symmetry), color, 3)
+            assert result['score'] == expected
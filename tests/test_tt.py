@@ -0,0 +1,89 @@
+"""
+Check the transposition table: store and probe round trips, replacement and
+the verification of entries.
+"""
+from random import Random
+
+from engine.tt import TranspositionTable, EXACT, LOWER, UPPER, NO_MOVE, DOUBLE, BITS
+
+
+def keys(count, seed=1):
+    rng = Random(seed)
+    return [rng.getrandbits(64) for _ in range(count)]
+
+
+def test_round_trip():
+    table = TranspositionTable(1)
+    entries = {}
+    # One key per bucket, so nothing is replaced
+    buckets = {key & table.index_mask: key for key in keys(300)}
+    for number, key in enumerate(buckets.values()):
+        entry = (number * 1.25 - 100, number % 30, (EXACT, LOWER, UPPER)[number % 3], number % 64)
+        entries[key] = entry
+        table.store(key, entry[1], entry[0], entry[2], entry[3])
+    for key, entry in entries.items():
+        assert table.probe(key) == entry
+
+def test_scores_keep_every_bit():
+    table = TranspositionTable(1)
+    for key, score in zip(keys(5, seed=2), (0.1 + 0.2, -1e-300, 1000064.0, float('inf'), -float('inf'))):
+        table.store(key, 3, score, EXACT)
+        assert table.probe(key)[0] == score
+
+def test_missing_and_colliding_keys():
+    table = TranspositionTable(1)
+    key = keys(1, seed=3)[0]
+    assert table.probe(key) is None
+    table.store(key, 4, 1.0, EXACT)
+    # Same slot, different key
+    assert table.probe(key ^ 1 << 63) is None
+
+def test_shallow_result_keeps_best_move():
+    table = TranspositionTable(1)
+    key = keys(1, seed=4)[0]
+    table.store(key, 6, 2.0, LOWER, 19)
+    table.store(key, 2, 3.0, UPPER)
+    assert table.probe(key) == (3.0, 2, UPPER, 19)
+
+def test_deepest_result_stays_in_bucket():
+    table = TranspositionTable(1)
+    # Three keys of one bucket: the deep entry stays, the always-replace slot turns over
+    deep = keys(1, seed=5)[0]
+    shallow = deep ^ 1 << 40
+    other = deep ^ 1 << 41
+    table.store(deep, 8, 1.0, EXACT)
+    table.store(shallow, 1, 2.0, EXACT)
+    table.store(other, 1, 3.0, EXACT)
+    assert table.probe(deep) == (1.0, 8, EXACT, NO_MOVE)
+    assert table.probe(shallow) is None
+    assert table.probe(other) == (3.0, 1, EXACT, NO_MOVE)
+
+def test_old_generation_is_replaced():
+    table = TranspositionTable(1)
+    deep = keys(1, seed=6)[0]
+    table.store(deep, 8, 1.0, EXACT)
+    table.new_search()
+    # A shallow result of the new search takes the slot of the deep one from the last search
+    newer = deep ^ 1 << 40
+    table.store(newer, 1, 2.0, EXACT)
+    assert table.probe(newer) == (2.0, 1, EXACT, NO_MOVE)
+    assert table.probe(deep) is None
+
+def test_torn_score_fails_verification():
+    # Another process overwriting the score of a slot between reads must not pass the key check
+    table = TranspositionTable(1)
+    key = keys(1, seed=7)[0]
+    table.store(key, 5, 12.5, EXACT, 10)
+    slot = next(slot for slot in range(table.entries) if table.data[slot])
+    table.scores[slot] = BITS.unpack(DOUBLE.pack(-40.0))[0]
+    assert table.probe(key) is None
+
+def test_tables_on_one_buffer_share_entries():
+    buffer = bytearray(TranspositionTable(1).entries * 24)
+    first = TranspositionTable(1, buffer=buffer)
+    second = TranspositionTable(1, buffer=buffer)
+    key = keys(1, seed=8)[0]
+    first.store(key, 3, -7.5, UPPER, 42)
+    assert second.probe(key) == (-7.5, 3, UPPER, 42)
+    second.clear()
+    assert first.probe(key) is None